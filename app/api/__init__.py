@@ -1,6 +1,15 @@
+from app.core.async_routes import asyncify_router
 from .auth import router as auth_router
 from .blog import router as blog_router
 from .resume import router as resume_router
 from .admin import router as admin_router
 
-__all__ = ["auth_router", "blog_router", "resume_router", "admin_router"]
\ No newline at end of file
+# 异步栈路由（settings.database_async启用时使用）
+async_blog_router = asyncify_router(blog_router)
+async_resume_router = asyncify_router(resume_router)
+async_admin_router = asyncify_router(admin_router)
+
+__all__ = [
+    "auth_router", "blog_router", "resume_router", "admin_router",
+    "async_blog_router", "async_resume_router", "async_admin_router"
+]
@@ -1,27 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from datetime import datetime, timedelta
-from typing import Dict, List
-from app.database import get_db
+from sqlalchemy import desc, update, delete
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+from app.database import get_db, query_counter, replica_set
 from app.core.security import get_current_active_user
 from app.models.user import User
 from app.models.blog import Comment, BlogPost
 from app.models.message import Message
-from app.schemas.blog import Comment as CommentSchema
+from app.core.loaders import post_list_options
+from app.core.cache import response_cache
+from app.core.versions import POSTS, bump_versions
+from app.core.principals import principal_cache
+from app.core.comment_queue import comment_queue
+from app.core.site_stats import (
+    TOTAL_POSTS, TOTAL_COMMENTS, TOTAL_MESSAGES, TOTAL_VIEWS, adjust_stats, get_stats
+)
+from app.core.view_analytics import SITE_TOTAL, daily_views, trending_posts
+from app.core.fast_json import ResponseRoute
+from app.utils.pool_metrics import pool_metrics
+from app.schemas.blog import (
+    Comment as CommentSchema, BlogPostList, CommentBulkIds, CommentBulkFilter, CommentBulkResult,
+    TrendingPosts, DailyViewSeries
+)
 from app.schemas.message import Message as MessageSchema
 
-router = APIRouter(prefix="/api/admin", tags=["管理"])
+router = APIRouter(prefix="/api/admin", tags=["管理"], route_class=ResponseRoute)
+
+# 批量审核评论时每条UPDATE/DELETE语句处理的评论数，每批单独提交以缩短锁持有时间
+MODERATION_CHUNK_SIZE = 500
+
+# 访问统计接口允许查询的最长日期范围（天）
+ANALYTICS_MAX_DAYS = 3660
 
 
 @router.get("/dashboard")
 def get_admin_dashboard(db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     """获取管理后台仪表板数据"""
-    # 统计信息
-    total_posts = db.query(BlogPost).count()
-    total_comments = db.query(Comment).count()
-    total_messages = db.query(Message).count()
-    total_views = db.query(func.sum(BlogPost.view_count)).scalar() or 0
+    # 统计信息由写操作增量维护，一次查询读取
+    stats = get_stats(db)
     
     # 近期评论（未审批的）
     recent_comments = db.query(Comment)\
@@ -37,24 +54,85 @@ def get_admin_dashboard(db: Session = Depends(get_db), current_user: User = Depe
                        .limit(10)\
                        .all()
     
-    # 最近7天的访问统计
-    seven_days_ago = datetime.now() - timedelta(days=7)
-    recent_posts = db.query(BlogPost)\
-                    .filter(BlogPost.published_at >= seven_days_ago)\
-                    .order_by(desc(BlogPost.view_count))\
-                    .limit(5)\
-                    .all()
+    # 最近7天的访问统计：访问量最高的文章与每天的全站访问量
+    today = date.today()
+    week_start = today - timedelta(days=6)
     
     return {
         "stats": {
-            "total_posts": total_posts,
-            "total_comments": total_comments,
-            "total_messages": total_messages,
-            "total_views": total_views
+            "total_posts": stats[TOTAL_POSTS],
+            "total_comments": stats[TOTAL_COMMENTS],
+            "total_messages": stats[TOTAL_MESSAGES],
+            "total_views": stats[TOTAL_VIEWS]
         },
         "recent_comments": recent_comments,
         "recent_messages": recent_messages,
-        "recent_posts": recent_posts
+        "recent_posts": _trending_items(db, week_start, today, 5),
+        "recent_views": daily_views(db, week_start, today)
+    }
+
+
+def _analytics_window(start: Optional[date], end: Optional[date], days: int) -> tuple:
+    """解析访问统计的日期范围：默认截止今天，未指定开始日期时取截止日期及之前共days天"""
+    end = end or date.today()
+    start = start or end - timedelta(days=days - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="开始日期不能晚于结束日期")
+    if (end - start).days >= ANALYTICS_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"日期范围不能超过{ANALYTICS_MAX_DAYS}天")
+    return start, end
+
+
+def _trending_items(db: Session, start: date, end: date, limit: int) -> list:
+    """日期范围内访问量最高的文章及其访问量，已删除的文章不返回"""
+    ranked = trending_posts(db, start, end, limit)
+    if not ranked:
+        return []
+    posts = {
+        post.id: post
+        for post in db.query(BlogPost).options(*post_list_options())
+                      .filter(BlogPost.id.in_([post_id for post_id, _ in ranked]))
+    }
+    return [
+        {"post": BlogPostList.model_validate(posts[post_id]), "views": views}
+        for post_id, views in ranked if post_id in posts
+    ]
+
+
+@router.get("/analytics/trending", response_model=TrendingPosts)
+def get_trending_posts(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    days: int = Query(7, ge=1, le=ANALYTICS_MAX_DAYS),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """获取日期范围内访问量最高的文章"""
+    start, end = _analytics_window(start, end, days)
+    return {"start": start, "end": end, "items": _trending_items(db, start, end, limit)}
+
+
+@router.get("/analytics/daily", response_model=DailyViewSeries)
+def get_daily_views(
+    post_id: Optional[int] = Query(None, ge=1),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    days: int = Query(30, ge=1, le=ANALYTICS_MAX_DAYS),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """获取全站或单篇文章每天的访问量与来源分布"""
+    start, end = _analytics_window(start, end, days)
+    if post_id is not None and db.query(BlogPost.id).filter(BlogPost.id == post_id).scalar() is None:
+        raise HTTPException(status_code=404, detail="文章未找到")
+    series = daily_views(db, start, end, post_id or SITE_TOTAL)
+    return {
+        "post_id": post_id,
+        "start": start,
+        "end": end,
+        "total": sum(day["views"] for day in series),
+        "series": series
     }
 
 
@@ -68,6 +146,101 @@ def get_pending_comments(db: Session = Depends(get_db), current_user: User = Dep
     return comments
 
 
+def _chunks_by_ids(db: Session, ids: List[int], conditions: list) -> Iterator[list]:
+    """按给定ID分批，返回每批中满足条件的(id, post_id)"""
+    ids = sorted(set(ids))
+    for start in range(0, len(ids), MODERATION_CHUNK_SIZE):
+        chunk = ids[start:start + MODERATION_CHUNK_SIZE]
+        yield db.query(Comment.id, Comment.post_id).filter(Comment.id.in_(chunk), *conditions).all()
+
+
+def _chunks_by_filter(db: Session, conditions: list) -> Iterator[list]:
+    """按ID顺序定位（WHERE id > 上一批最大ID）分批，返回每批满足条件的(id, post_id)"""
+    last_id = 0
+    while True:
+        rows = db.query(Comment.id, Comment.post_id)\
+                 .filter(Comment.id > last_id, *conditions)\
+                 .order_by(Comment.id)\
+                 .limit(MODERATION_CHUNK_SIZE)\
+                 .all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def _moderate_comments(db: Session, action: str, chunks: Iterator[list], conditions: list) -> Dict[str, int]:
+    """对每批评论执行一条UPDATE或DELETE，全部完成后统一更新版本号并使相关文章缓存失效"""
+    affected = 0
+    post_ids = set()
+    for rows in chunks:
+        if not rows:
+            continue
+        chunk_ids = [row.id for row in rows]
+        # 再次带上筛选条件，避免选出后被其他请求修改的评论被误处理
+        if action == "approve":
+            stmt = update(Comment).where(Comment.id.in_(chunk_ids), *conditions).values(is_approved=True)
+        else:
+            stmt = delete(Comment).where(Comment.id.in_(chunk_ids), *conditions)
+        result = db.execute(stmt, execution_options={"synchronize_session": False})
+        if action == "delete":
+            adjust_stats(db, {TOTAL_COMMENTS: -result.rowcount})
+        db.commit()
+        affected += result.rowcount
+        post_ids.update(row.post_id for row in rows)
+
+    if affected:
+        bump_versions(db, POSTS)
+        db.commit()
+        response_cache.invalidate(*(f"post:{post_id}" for post_id in post_ids))
+    return {"affected": affected, "posts": len(post_ids)}
+
+
+# 批量接口需注册在/comments/{comment_id}/approve之前，否则bulk会被当作评论ID匹配
+@router.post("/comments/bulk/approve", response_model=CommentBulkResult)
+def bulk_approve_comments(
+    payload: CommentBulkIds,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """批量审批通过评论，返回实际审批的评论数"""
+    conditions = [Comment.is_approved == False]
+    return _moderate_comments(db, "approve", _chunks_by_ids(db, payload.ids, conditions), conditions)
+
+
+@router.post("/comments/bulk/delete", response_model=CommentBulkResult)
+def bulk_delete_comments(
+    payload: CommentBulkIds,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """批量删除评论，返回实际删除的评论数"""
+    return _moderate_comments(db, "delete", _chunks_by_ids(db, payload.ids, []), [])
+
+
+@router.post("/comments/bulk/filter", response_model=CommentBulkResult)
+def bulk_moderate_comments_by_filter(
+    payload: CommentBulkFilter,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """按条件批量审批或删除评论，如审批某邮箱的全部评论、删除N天前仍未审批的评论"""
+    conditions = []
+    if payload.author_email is not None:
+        conditions.append(Comment.author_email == payload.author_email)
+    if payload.post_id is not None:
+        conditions.append(Comment.post_id == payload.post_id)
+    if payload.is_approved is not None:
+        conditions.append(Comment.is_approved == payload.is_approved)
+    if payload.older_than_days is not None:
+        conditions.append(Comment.created_at < datetime.now() - timedelta(days=payload.older_than_days))
+    if not conditions:
+        raise HTTPException(status_code=400, detail="至少需要指定一个筛选条件")
+    if payload.action == "approve":
+        conditions.append(Comment.is_approved == False)
+    return _moderate_comments(db, payload.action, _chunks_by_filter(db, conditions), conditions)
+
+
 @router.post("/comments/{comment_id}/approve")
 def approve_comment(comment_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     """审批通过评论"""
@@ -75,8 +248,11 @@ def approve_comment(comment_id: int, db: Session = Depends(get_db), current_user
     if not comment:
         raise HTTPException(status_code=404, detail="评论未找到")
     
+    post_id = comment.post_id
     comment.is_approved = True
+    bump_versions(db, POSTS)
     db.commit()
+    response_cache.invalidate(f"post:{post_id}")
     
     return {"message": "评论已审批通过"}
 
@@ -88,12 +264,40 @@ def delete_comment(comment_id: int, db: Session = Depends(get_db), current_user:
     if not comment:
         raise HTTPException(status_code=404, detail="评论未找到")
     
+    post_id = comment.post_id
     db.delete(comment)
+    adjust_stats(db, {TOTAL_COMMENTS: -1})
+    bump_versions(db, POSTS)
     db.commit()
+    response_cache.invalidate(f"post:{post_id}")
     
     return {"message": "评论删除成功"}
 
 
+@router.get("/cache/stats")
+def get_cache_stats(current_user: User = Depends(get_current_active_user)):
+    """获取响应缓存命中统计"""
+    return response_cache.stats()
+
+
+@router.get("/metrics/pool")
+def get_pool_metrics(current_user: User = Depends(get_current_active_user)):
+    """获取数据库连接池状态与按接口汇总的连接等待时间"""
+    return pool_metrics.snapshot()
+
+
+@router.get("/metrics/database")
+def get_database_metrics(current_user: User = Depends(get_current_active_user)):
+    """获取主库与各从库执行的SQL语句数及从库可用状态"""
+    return {"queries": query_counter.snapshot(), "replicas": replica_set.status()}
+
+
+@router.get("/metrics/comment-queue")
+def get_comment_queue_metrics(current_user: User = Depends(get_current_active_user)):
+    """获取评论写入队列的排队数与批量写入统计"""
+    return comment_queue.stats()
+
+
 @router.get("/messages", response_model=List[MessageSchema])
 def get_messages(db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     """获取留言列表"""
@@ -125,6 +329,7 @@ def delete_message(message_id: int, db: Session = Depends(get_db), current_user:
         raise HTTPException(status_code=404, detail="留言未找到")
     
     db.delete(message)
+    adjust_stats(db, {TOTAL_MESSAGES: -1})
     db.commit()
     
     return {"message": "留言删除成功"}
@@ -158,7 +363,9 @@ def toggle_user_active(user_id: int, db: Session = Depends(get_db), current_user
         raise HTTPException(status_code=404, detail="用户未找到")
     
     user.is_active = not user.is_active
+    is_active, username = user.is_active, user.username
     db.commit()
+    principal_cache.invalidate(username)
     
-    status = "启用" if user.is_active else "禁用"
+    status = "启用" if is_active else "禁用"
     return {"message": f"用户 {status} 成功"}
\ No newline at end of file
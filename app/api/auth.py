@@ -1,28 +1,38 @@
 from datetime import timedelta
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.core.security import (
     get_current_active_user, 
-    create_access_token, 
-    verify_password
+    create_access_token
 )
+from app.core.hashing import password_hasher
+from app.core.fast_json import ResponseRoute
 from app.schemas.user import User, Token, UserLogin
 from app.models.user import User as UserModel
 from app.config import settings
 
-router = APIRouter(prefix="/api/auth", tags=["认证"])
+router = APIRouter(prefix="/api/auth", tags=["认证"], route_class=ResponseRoute)
 
 
-@router.post("/login", response_model=Token)
-def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
-):
-    """用户登录获取访问令牌"""
-    user = db.query(UserModel).filter(UserModel.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+def _get_credentials(db: Session, username: str) -> Optional[Row]:
+    """查询登录所需字段后立即归还数据库连接，bcrypt计算期间不占用连接池"""
+    try:
+        return db.query(UserModel.username, UserModel.password_hash, UserModel.is_active)\
+                 .filter(UserModel.username == username)\
+                 .first()
+    finally:
+        db.close()
+
+
+async def _authenticate(db: Session, username: str, password: str) -> Row:
+    """校验用户名密码；查询在线程池中执行，bcrypt交给密码校验执行器"""
+    user = await run_in_threadpool(_get_credentials, db, username)
+    if not user or not await password_hasher.verify(password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误",
@@ -34,6 +44,16 @@ def login_for_access_token(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail="用户已禁用"
         )
+    return user
+
+
+@router.post("/login", response_model=Token)
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db)
+):
+    """用户登录获取访问令牌"""
+    user = await _authenticate(db, form_data.username, form_data.password)
     
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
@@ -44,24 +64,12 @@ def login_for_access_token(
 
 
 @router.post("/login/json", response_model=Token)
-def login_with_json(
+async def login_with_json(
     user_login: UserLogin,
     db: Session = Depends(get_db)
 ):
     """使用JSON格式的用户名密码登录"""
-    user = db.query(UserModel).filter(UserModel.username == user_login.username).first()
-    if not user or not verify_password(user_login.password, user.password_hash):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="用户名或密码错误",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, 
-            detail="用户已禁用"
-        )
+    user = await _authenticate(db, user_login.username, user_login.password)
     
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
@@ -1,34 +1,126 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import Optional
-from app.database import get_db
+from sqlalchemy import and_, or_, func
+from typing import Optional, Union
+from app.database import SessionLocal, get_db, get_read_db, is_replica
 from app.core.dependencies import get_pagination_params, get_current_admin_user
 from app.core.security import get_current_active_user
-from app.models.blog import BlogPost, BlogCategory, Comment
+from app.core.counters import get_published_count, track_published_change
+from app.core.view_counter import view_counter
+from app.core.comment_queue import comment_queue
+from app.core.view_analytics import delete_post_views, view_analytics
+from app.core.site_stats import TOTAL_POSTS, TOTAL_COMMENTS, TOTAL_VIEWS, adjust_stats
+from app.core.async_routes import run_blocking
+from app.core.search import search_index, tokenize, highlight, make_snippet
+from app.core.loaders import post_list_options, post_detail_options
+from app.core.cache import response_cache
+from app.core.versions import POSTS, CATEGORIES, bump_versions, compute_validators, is_not_modified
+from app.core.fast_json import ResponseRoute
+from app.config import settings
+from app.models.blog import BlogPost, BlogCategory, Comment, BlogPostCounter
 from app.models.user import User
 from app.schemas.blog import (
     BlogPost as BlogPostSchema, BlogPostList, BlogPostCreate, BlogPostUpdate,
-    BlogCategory as BlogCategorySchema, BlogCategoryCreate, BlogCategoryUpdate,
-    Comment as CommentSchema, CommentCreate, PaginatedResponse, BlogPostWithComments
+    BlogCategory as BlogCategorySchema, BlogCategoryCreate, BlogCategoryUpdate, BlogCategoryList,
+    Comment as CommentSchema, CommentCreate, PaginatedResponse, CursorPaginatedResponse,
+    CommentTicket, BlogPostWithComments, SearchResponse
 )
 from app.schemas.user import User as UserSchema
-from app.utils.helpers import slugify
+from app.utils.helpers import slugify, encode_cursor, decode_cursor
 
-router = APIRouter(prefix="/api/blog", tags=["博客"])
+router = APIRouter(prefix="/api/blog", tags=["博客"], route_class=ResponseRoute)
 
 
 # 博客文章相关路由
 
-@router.get("/posts", response_model=PaginatedResponse)
+def _seek_after(published_at, post_id):
+    """构造(published_at, id)降序下位于游标之后的定位条件，NULL发布时间排在最后"""
+    if published_at is None:
+        return and_(BlogPost.published_at.is_(None), BlogPost.id < post_id)
+    return or_(
+        BlogPost.published_at < published_at,
+        and_(BlogPost.published_at == published_at, BlogPost.id < post_id),
+        BlogPost.published_at.is_(None)
+    )
+
+
+def _load_posts_in_order(db: Session, post_ids: list, options=None) -> list:
+    """按给定ID顺序加载文章"""
+    if not post_ids:
+        return []
+    query = db.query(BlogPost).options(*(options or post_list_options()))
+    posts = {post.id: post for post in query.filter(BlogPost.id.in_(post_ids)).all()}
+    return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+
+@router.get("/posts", response_model=Union[PaginatedResponse, CursorPaginatedResponse])
 def read_blog_posts(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     pagination: dict = Depends(get_pagination_params),
     category: Optional[int] = Query(None, description="分类ID"),
     search: Optional[str] = Query(None, description="搜索关键词"),
     published_only: bool = Query(True, description="是否只显示已发布文章")
 ):
     """获取博客文章列表"""
-    query = db.query(BlogPost)
+    cache_key = response_cache.key_for(request)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return response_cache.respond(request, cached)
+    
+    # 客户端缓存仍然有效时只需一次版本查询
+    validators = compute_validators(db, cache_key, [POSTS, CATEGORIES])
+    if is_not_modified(request, validators):
+        return validators.not_modified_response()
+    
+    result = _list_blog_posts(db, pagination, category, search, published_only)
+    return response_cache.store(
+        cache_key, result, tags=["posts", "categories"],
+        headers=validators.headers, from_replica=is_replica(db), request=request,
+        versions=validators.versions
+    )
+
+
+def _require_search_index():
+    """检索前确认索引可用，启动后首次构建完成前返回503"""
+    if not run_blocking(search_index.ensure_fresh):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="搜索索引正在构建，请稍后重试",
+            headers={"Retry-After": "5"},
+        )
+
+
+def _list_blog_posts(
+    db: Session,
+    pagination: dict,
+    category: Optional[int],
+    search: Optional[str],
+    published_only: bool
+) -> Union[PaginatedResponse, CursorPaginatedResponse]:
+    """查询文章列表"""
+    # 关键词筛选走全文索引，结果按相关度排序
+    if search:
+        if pagination["cursor"] is not None:
+            raise HTTPException(status_code=400, detail="搜索不支持游标分页")
+        
+        _require_search_index()
+        ranked, total = run_blocking(
+            search_index.search, search, published_only, category,
+            limit=pagination["offset"] + pagination["size"]
+        )
+        posts = _load_posts_in_order(db, [post_id for post_id, _ in ranked[pagination["offset"]:]])
+        
+        return PaginatedResponse(
+            items=posts,
+            total=total,
+            page=pagination["page"],
+            size=pagination["size"],
+            pages=(total + pagination["size"] - 1) // pagination["size"]
+        )
+    
+    query = db.query(BlogPost).options(*post_list_options())
     
     if published_only:
         query = query.filter(BlogPost.is_published == True)
@@ -36,47 +128,160 @@ def read_blog_posts(
     if category:
         query = query.filter(BlogPost.category_id == category)
     
-    if search:
-        query = query.filter(BlogPost.title.ilike(f"%{search}%"))
+    # 游标分页：按(published_at, id)定位，深翻页无需扫描并丢弃之前的行
+    if pagination["cursor"] is not None:
+        if pagination["cursor"]:
+            try:
+                cursor_published_at, cursor_id = decode_cursor(pagination["cursor"])
+            except ValueError:
+                raise HTTPException(status_code=400, detail="无效的分页游标")
+            query = query.filter(_seek_after(cursor_published_at, cursor_id))
+        
+        # 多取一条用于判断是否还有下一页
+        posts = query.order_by(BlogPost.published_at.desc(), BlogPost.id.desc())\
+                    .limit(pagination["size"] + 1)\
+                    .all()
+        
+        next_cursor = None
+        if len(posts) > pagination["size"]:
+            posts = posts[:pagination["size"]]
+            next_cursor = encode_cursor(posts[-1].published_at, posts[-1].id)
+        
+        return CursorPaginatedResponse(
+            items=posts,
+            size=pagination["size"],
+            next_cursor=next_cursor
+        )
     
-    total = query.count()
-    posts = query.order_by(BlogPost.published_at.desc(), BlogPost.created_at.desc())\
+    # 已发布文章（可按分类）的总数直接读取计数表，其余筛选条件才需要实时统计
+    if published_only:
+        total = get_published_count(db, category)
+    else:
+        total = query.count()
+    # 与游标分页相同的(published_at, id)排序，可直接按索引顺序读取
+    posts = query.order_by(BlogPost.published_at.desc(), BlogPost.id.desc())\
                 .offset(pagination["offset"])\
                 .limit(pagination["size"])\
                 .all()
     
     pages = (total + pagination["size"] - 1) // pagination["size"]
     
+    return PaginatedResponse(
+        items=posts,
+        total=total,
+        page=pagination["page"],
+        size=pagination["size"],
+        pages=pages
+    )
+
+
+@router.get("/search", response_model=SearchResponse)
+def search_blog_posts(
+    q: str = Query(..., min_length=1, max_length=100, description="搜索关键词"),
+    category: Optional[int] = Query(None, description="分类ID"),
+    page: int = Query(1, ge=1, description="页码"),
+    size: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size, description="每页数量"),
+    db: Session = Depends(get_read_db)
+):
+    """全文搜索已发布的博客文章（标题、摘要、正文），按相关度排序并高亮命中词"""
+    _require_search_index()
+    offset = (page - 1) * size
+    ranked, total = run_blocking(search_index.search, q, True, category, limit=offset + size)
+    scores = dict(ranked[offset:])
+    
+    terms = tokenize(q)
+    items = [
+        {
+            "post": post,
+            "score": round(scores[post.id], 4),
+            "title_highlight": highlight(post.title, terms),
+            "snippet": make_snippet(post.summary, post.content, terms)
+        }
+        for post in _load_posts_in_order(
+            db, list(scores), post_list_options(BlogPost.content)
+        )
+    ]
+    
     return {
-        "items": posts,
+        "items": items,
         "total": total,
-        "page": pagination["page"],
-        "size": pagination["size"],
-        "pages": pages
+        "page": page,
+        "size": size,
+        "pages": (total + size - 1) // size
     }
 
 
+def _record_view(db: Session, post_id: int, request: Request) -> int:
+    """记录一次文章访问，返回尚未计入已读取view_count的访问次数"""
+    if settings.view_analytics_enabled:
+        view_analytics.record(post_id, request.headers.get("referer"), request.url.hostname)
+    return _count_view(db, post_id)
+
+
+def _count_view_on_primary(post_id: int) -> int:
+    with SessionLocal() as primary:
+        return _count_view(primary, post_id)
+
+
+def _count_view(db: Session, post_id: int) -> int:
+    """累加文章的view_count，返回尚未计入已读取view_count的访问次数"""
+    # 默认写入缓冲区并定期批量写回
+    if settings.view_count_buffer:
+        return view_counter.record(post_id)
+    # 从库会话只读，直接写库时改用主库
+    if is_replica(db):
+        return run_blocking(_count_view_on_primary, post_id)
+    db.query(BlogPost).filter(BlogPost.id == post_id)\
+      .update({BlogPost.view_count: BlogPost.view_count + 1}, synchronize_session=False)
+    adjust_stats(db, {TOTAL_VIEWS: 1})
+    db.commit()
+    return 1
+
+
 @router.get("/posts/{slug}", response_model=BlogPostWithComments)
-def read_blog_post(slug: str, db: Session = Depends(get_db)):
+def read_blog_post(slug: str, request: Request, db: Session = Depends(get_read_db)):
     """获取博客文章详情"""
-    post = db.query(BlogPost).filter(BlogPost.slug == slug).first()
+    # 命中缓存时仍然记录访问，返回的访问次数可能滞后于缓存有效期
+    cache_key = response_cache.key_for(request)
+    cached = response_cache.get(cache_key)
+    if cached:
+        _record_view(db, cached.meta["post_id"], request)
+        return response_cache.respond(request, cached)
+    
+    # 返回304的访问同样计数；版本号覆盖文章的发布状态，304不会泄露已下线的文章
+    validators = compute_validators(db, cache_key, [POSTS, CATEGORIES])
+    if is_not_modified(request, validators):
+        post_id = db.query(BlogPost.id).filter(BlogPost.slug == slug, BlogPost.is_published == True).scalar()
+        if post_id is not None:
+            _record_view(db, post_id, request)
+            return validators.not_modified_response()
+    
+    post = db.query(BlogPost).options(*post_detail_options()).filter(BlogPost.slug == slug).first()
     if not post or not post.is_published:
         raise HTTPException(status_code=404, detail="文章未找到")
     
-    # 增加访问计数
-    post.view_count += 1
-    db.commit()
-    db.refresh(post)
+    # 提交会使实例属性过期，先取出响应所需的数据
+    post_data = dict(post.__dict__)
+    post_data["view_count"] += _record_view(db, post.id, request)
     
     # 获取已批准的评论
     approved_comments = db.query(Comment).filter(
-        Comment.post_id == post.id, Comment.is_approved == True
+        Comment.post_id == post_data["id"], Comment.is_approved == True
     ).order_by(Comment.created_at.desc()).all()
     
-    return BlogPostWithComments(
-        **post.__dict__,
+    result = BlogPostWithComments(
+        **post_data,
         comments=approved_comments
     )
+    return response_cache.store(
+        cache_key, result,
+        tags=[f"post:{post_data['id']}", "categories"],
+        meta={"post_id": post_data["id"]},
+        headers=validators.headers,
+        from_replica=is_replica(db),
+        request=request,
+        versions=validators.versions
+    )
 
 
 @router.post("/posts", response_model=BlogPostSchema)
@@ -100,11 +305,16 @@ def create_blog_post(
     )
     
     if post.is_published:
-        db_post.published_at = db_post.created_at
+        db_post.published_at = func.now()
     
     db.add(db_post)
+    track_published_change(db, None, (db_post.is_published, db_post.category_id))
+    adjust_stats(db, {TOTAL_POSTS: 1})
+    bump_versions(db, POSTS)
     db.commit()
     db.refresh(db_post)
+    search_index.upsert(db_post)
+    response_cache.invalidate("posts")
     
     return db_post
 
@@ -121,16 +331,23 @@ def update_blog_post(
     if not db_post:
         raise HTTPException(status_code=404, detail="文章未找到")
     
+    was_published = db_post.is_published
+    old_state = (db_post.is_published, db_post.category_id)
+    
     for key, value in post_update.model_dump(exclude_unset=True).items():
         if value is not None:
             setattr(db_post, key, value)
     
     # 如果从未发布到发布，设置发布时间
-    if not db_post.is_published and post_update.is_published:
-        db_post.published_at = db_post.updated_at
+    if not was_published and db_post.is_published and db_post.published_at is None:
+        db_post.published_at = func.now()
     
+    track_published_change(db, old_state, (db_post.is_published, db_post.category_id))
+    bump_versions(db, POSTS)
     db.commit()
     db.refresh(db_post)
+    search_index.upsert(db_post)
+    response_cache.invalidate("posts", f"post:{post_id}")
     
     return db_post
 
@@ -146,24 +363,49 @@ def delete_blog_post(
     if not db_post:
         raise HTTPException(status_code=404, detail="文章未找到")
     
+    old_state = (db_post.is_published, db_post.category_id)
+    # 评论随文章级联删除
+    comment_count = db.query(func.count(Comment.id)).filter(Comment.post_id == post_id).scalar()
     db.delete(db_post)
+    # 文章的访问统计一并删除，全站合计保留
+    delete_post_views(db, post_id)
+    track_published_change(db, old_state, None)
+    adjust_stats(db, {TOTAL_POSTS: -1, TOTAL_COMMENTS: -comment_count, TOTAL_VIEWS: -(db_post.view_count or 0)})
+    bump_versions(db, POSTS)
     db.commit()
+    search_index.remove(post_id)
+    response_cache.invalidate("posts", f"post:{post_id}")
     
     return {"message": "文章删除成功"}
 
 
 # 评论相关路由
 
-@router.post("/comments", response_model=CommentSchema)
+@router.post(
+    "/comments",
+    response_model=CommentSchema,
+    responses={202: {"model": CommentTicket, "description": "启用评论写入队列时，评论已入队等待批量写入"}}
+)
 def create_comment(comment: CommentCreate, db: Session = Depends(get_db)):
     """创建新的评论"""
-    # 检查文章是否存在
-    post = db.query(BlogPost).filter(BlogPost.id == comment.post_id).first()
-    if not post or not post.is_published:
+    # 检查文章是否存在，只读取发布状态
+    is_published = db.query(BlogPost.is_published).filter(BlogPost.id == comment.post_id).scalar()
+    if not is_published:
         raise HTTPException(status_code=404, detail="文章未找到")
     
+    if settings.comment_queue_enabled:
+        ticket = comment_queue.submit(comment.model_dump())
+        if ticket is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="评论提交过多，请稍后重试",
+                headers={"Retry-After": "1"},
+            )
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=CommentTicket(ticket=ticket).model_dump())
+    
     db_comment = Comment(**comment.model_dump())
     db.add(db_comment)
+    adjust_stats(db, {TOTAL_COMMENTS: 1})
     db.commit()
     db.refresh(db_comment)
     
@@ -171,7 +413,7 @@ def create_comment(comment: CommentCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/posts/{post_id}/comments", response_model=list[CommentSchema])
-def read_post_comments(post_id: int, db: Session = Depends(get_db)):
+def read_post_comments(post_id: int, db: Session = Depends(get_read_db)):
     """获取文章评论列表"""
     # 只返回已批准的评论
     comments = db.query(Comment).filter(
@@ -184,10 +426,23 @@ def read_post_comments(post_id: int, db: Session = Depends(get_db)):
 # 分类相关路由
 
 @router.get("/categories", response_model=list[BlogCategorySchema])
-def read_categories(db: Session = Depends(get_db)):
+def read_categories(request: Request, db: Session = Depends(get_read_db)):
     """获取博客分类列表"""
+    cache_key = response_cache.key_for(request)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return response_cache.respond(request, cached)
+    
+    validators = compute_validators(db, cache_key, [CATEGORIES])
+    if is_not_modified(request, validators):
+        return validators.not_modified_response()
+    
     categories = db.query(BlogCategory).order_by(BlogCategory.name).all()
-    return categories
+    return response_cache.store(
+        cache_key, BlogCategoryList.model_validate(categories),
+        tags=["categories"], headers=validators.headers, from_replica=is_replica(db), request=request,
+        versions=validators.versions
+    )
 
 
 @router.post("/categories", response_model=BlogCategorySchema)
@@ -199,8 +454,10 @@ def create_category(
     """创建新的博客分类"""
     db_category = BlogCategory(**category.model_dump())
     db.add(db_category)
+    bump_versions(db, CATEGORIES)
     db.commit()
     db.refresh(db_category)
+    response_cache.invalidate("categories")
     
     return db_category
 
@@ -221,8 +478,10 @@ def update_category(
         if value is not None:
             setattr(db_category, key, value)
     
+    bump_versions(db, CATEGORIES)
     db.commit()
     db.refresh(db_category)
+    response_cache.invalidate("categories")
     
     return db_category
 
@@ -247,6 +506,9 @@ def delete_category(
         )
     
     db.delete(db_category)
+    db.query(BlogPostCounter).filter(BlogPostCounter.category_id == category_id).delete()
+    bump_versions(db, CATEGORIES)
     db.commit()
+    response_cache.invalidate("categories")
     
     return {"message": "分类删除成功"}
\ No newline at end of file
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.core.security import get_current_active_user
+from app.core.versions import is_not_modified
+from app.core.resume_snapshot import resume_snapshot
+from app.core.fast_json import ResponseRoute
+from app.utils.compression import compressor, encoded_content
 from app.models.resume import ResumeSection, SectionType, PersonalInfo, Education, Experience
 from app.schemas.resume import (
     ResumeSection as ResumeSectionSchema, 
@@ -16,55 +20,20 @@ from app.schemas.resume import (
     ExperienceCreate, ExperienceUpdate
 )
 
-router = APIRouter(prefix="/api/resume", tags=["简历"])
+router = APIRouter(prefix="/api/resume", tags=["简历"], route_class=ResponseRoute)
 
 
 @router.get("", response_model=ResumeData)
-def read_resume(db: Session = Depends(get_db)):
+def read_resume(request: Request, db: Session = Depends(get_read_db)):
     """获取完整简历信息"""
-    try:
-        # 获取个人信息
-        personal_info = db.query(PersonalInfo)\
-                         .filter(PersonalInfo.is_visible == True)\
-                         .first()
-        
-        # 获取教育背景
-        education = db.query(Education)\
-                     .filter(Education.is_visible == True)\
-                     .order_by(Education.order_index)\
-                     .all()
-        
-        # 获取工作经历
-        experience = db.query(Experience)\
-                      .filter(Experience.is_visible == True)\
-                      .order_by(Experience.order_index)\
-                      .all()
-        
-        # 获取技能章节
-        skills = db.query(ResumeSection)\
-                  .filter(ResumeSection.is_visible == True)\
-                  .filter(ResumeSection.section_type == SectionType.skills)\
-                  .order_by(ResumeSection.order_index)\
-                  .all()
-        
-        # 获取项目章节
-        projects = db.query(ResumeSection)\
-                    .filter(ResumeSection.is_visible == True)\
-                    .filter(ResumeSection.section_type == SectionType.projects)\
-                    .order_by(ResumeSection.order_index)\
-                    .all()
-        
-        # 按类型分组
-        resume_data = {
-            "personal_info": personal_info,
-            "education": education,
-            "experience": experience,
-            "skills": skills,
-            "projects": projects
-        }
-        return resume_data
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # 直接返回预先序列化（并已压缩）的简历快照，只需查询一次版本号
+    body, variants, validators = resume_snapshot.get(db)
+    if is_not_modified(request, validators):
+        return validators.not_modified_response()
+    content, headers = encoded_content(
+        compressor, request.headers.get("accept-encoding"), body, variants, validators.headers
+    )
+    return Response(content=content, media_type="application/json", headers=headers)
 
 
 @router.get("/sections", response_model=List[ResumeSectionSchema])
@@ -91,7 +60,7 @@ def create_resume_section(
     """创建新的简历章节"""
     db_section = ResumeSection(**section.model_dump())
     db.add(db_section)
-    db.commit()
+    resume_snapshot.commit(db)
     db.refresh(db_section)
     
     return db_section
@@ -113,7 +82,7 @@ def update_resume_section(
         if value is not None:
             setattr(db_section, key, value)
     
-    db.commit()
+    resume_snapshot.commit(db)
     db.refresh(db_section)
     
     return db_section
@@ -131,7 +100,7 @@ def delete_resume_section(
         raise HTTPException(status_code=404, detail="章节未找到")
     
     db.delete(db_section)
-    db.commit()
+    resume_snapshot.commit(db)
     
     return {"message": "章节删除成功"}
 
@@ -164,7 +133,7 @@ def create_personal_info(
     
     db_personal_info = PersonalInfo(**personal_info.model_dump())
     db.add(db_personal_info)
-    db.commit()
+    resume_snapshot.commit(db)
     db.refresh(db_personal_info)
     
     return db_personal_info
@@ -185,7 +154,7 @@ def update_personal_info(
         if value is not None:
             setattr(db_personal_info, key, value)
     
-    db.commit()
+    resume_snapshot.commit(db)
     db.refresh(db_personal_info)
     
     return db_personal_info
@@ -202,7 +171,7 @@ def delete_personal_info(
         raise HTTPException(status_code=404, detail="个人信息未找到")
     
     db.delete(db_personal_info)
-    db.commit()
+    resume_snapshot.commit(db)
     
     return {"message": "个人信息删除成功"}
 
@@ -226,7 +195,7 @@ def create_education(
     """创建教育背景"""
     db_education = Education(**education.model_dump())
     db.add(db_education)
-    db.commit()
+    resume_snapshot.commit(db)
     db.refresh(db_education)
     return db_education
 
@@ -257,7 +226,7 @@ def update_education(
         if value is not None:
             setattr(db_education, key, value)
     
-    db.commit()
+    resume_snapshot.commit(db)
     db.refresh(db_education)
     
     return db_education
@@ -275,7 +244,7 @@ def delete_education(
         raise HTTPException(status_code=404, detail="教育背景未找到")
     
     db.delete(db_education)
-    db.commit()
+    resume_snapshot.commit(db)
     
     return {"message": "教育背景删除成功"}
 
@@ -299,7 +268,7 @@ def create_experience(
     """创建工作经历"""
     db_experience = Experience(**experience.model_dump())
     db.add(db_experience)
-    db.commit()
+    resume_snapshot.commit(db)
     db.refresh(db_experience)
     return db_experience
 
@@ -330,7 +299,7 @@ def update_experience(
         if value is not None:
             setattr(db_experience, key, value)
     
-    db.commit()
+    resume_snapshot.commit(db)
     db.refresh(db_experience)
     
     return db_experience
@@ -348,6 +317,6 @@ def delete_experience(
         raise HTTPException(status_code=404, detail="工作经历未找到")
     
     db.delete(db_experience)
-    db.commit()
+    resume_snapshot.commit(db)
     
     return {"message": "工作经历删除成功"}
\ No newline at end of file
@@ -0,0 +1,114 @@
+import inspect
+from contextvars import ContextVar
+from typing import Callable
+from fastapi import APIRouter, Depends, Response, params
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.util import await_only
+from app.database import get_db, get_read_db, get_async_db
+from app.core.security import (
+    get_current_user, get_current_active_user, get_current_user_async, get_current_active_user_async
+)
+from app.core.dependencies import get_current_admin_user, get_current_admin_user_async
+
+# 同步栈依赖 -> 异步栈中的对应依赖（异步栈不使用从库，只读会话同样连接主库）
+ASYNC_DEPENDENCIES = {
+    get_db: get_async_db,
+    get_read_db: get_async_db,
+    get_current_user: get_current_user_async,
+    get_current_active_user: get_current_active_user_async,
+    get_current_admin_user: get_current_admin_user_async,
+}
+
+
+# 当前代码是否运行在异步栈处理函数的greenlet中（事件循环线程上）
+_in_async_endpoint: ContextVar[bool] = ContextVar("in_async_endpoint", default=False)
+
+
+def run_blocking(fn: Callable, *args, **kwargs):
+    """执行同步IO（Redis、另开的数据库会话）或CPU密集的调用
+
+    异步栈的处理函数在事件循环线程上运行，此时把调用移到线程池并挂起greenlet，等待期间事件循环继续处理其他请求；
+    同步栈、后台线程与脚本中直接调用。fn不能使用请求的数据库会话，需要的ORM属性应在调用前读取。
+    """
+    if not _in_async_endpoint.get():
+        return fn(*args, **kwargs)
+    return await_only(run_in_threadpool(fn, *args, **kwargs))
+
+
+def _async_endpoint(route: APIRoute) -> Callable:
+    """把同步处理函数包装为async处理函数
+
+    处理函数通过AsyncSession.run_sync在greenlet中执行，数据库IO由异步驱动完成并让出事件循环，
+    请求不再占用线程池；其中的同步IO与CPU密集部分由run_blocking移到线程池。
+    返回值在greenlet内转换为响应模型，离开run_sync后不会再触发延迟加载。
+    """
+    endpoint = route.endpoint
+    signature = inspect.signature(endpoint)
+    db_param = None
+    parameters = []
+    for parameter in signature.parameters.values():
+        dependency = parameter.default
+        if isinstance(dependency, params.Depends) and dependency.dependency in ASYNC_DEPENDENCIES:
+            if dependency.dependency in (get_db, get_read_db):
+                db_param = parameter.name
+                parameter = parameter.replace(annotation=AsyncSession)
+            parameter = parameter.replace(default=Depends(
+                ASYNC_DEPENDENCIES[dependency.dependency], use_cache=dependency.use_cache
+            ))
+        parameters.append(parameter)
+
+    adapter = TypeAdapter(route.response_model) if route.response_model else None
+
+    def call(kwargs: dict):
+        result = endpoint(**kwargs)
+        if adapter is None or isinstance(result, Response):
+            return result
+        return adapter.validate_python(result, from_attributes=True)
+
+    def call_in_greenlet(session, kwargs: dict):
+        token = _in_async_endpoint.set(True)
+        try:
+            return call({**kwargs, db_param: session})
+        finally:
+            _in_async_endpoint.reset(token)
+
+    async def async_endpoint(**kwargs):
+        if db_param is None:
+            return await run_in_threadpool(call, kwargs)
+        db: AsyncSession = kwargs[db_param]
+        return await db.run_sync(call_in_greenlet, kwargs)
+
+    async_endpoint.__name__ = endpoint.__name__
+    async_endpoint.__doc__ = endpoint.__doc__
+    async_endpoint.__signature__ = signature.replace(parameters=parameters)
+    return async_endpoint
+
+
+def asyncify_router(router: APIRouter) -> APIRouter:
+    """由同步路由生成路径、参数与响应模型都相同的异步路由"""
+    async_router = APIRouter(route_class=router.route_class)
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        async_router.add_api_route(
+            route.path,
+            _async_endpoint(route),
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            dependencies=route.dependencies,
+            summary=route.summary,
+            description=route.description,
+            response_description=route.response_description,
+            responses=route.responses,
+            deprecated=route.deprecated,
+            methods=route.methods,
+            operation_id=route.operation_id,
+            include_in_schema=route.include_in_schema,
+            response_class=route.response_class,
+            name=route.name,
+        )
+    return async_router
@@ -0,0 +1,332 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from fastapi import Request, Response
+from pydantic import BaseModel
+from app.config import settings
+from app.database import SessionLocal
+from app.core.async_routes import run_blocking
+from app.core.versions import validators_from_headers, is_not_modified
+from app.models.version import ContentVersion
+from app.utils.profiling import profile_serialization
+from app.utils.compression import compressor, encoded_content
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """缓存的响应：序列化后的JSON字节、响应头（校验器等）、附加信息及预压缩的各编码版本"""
+    body: bytes
+    meta: dict = field(default_factory=dict)
+    headers: dict = field(default_factory=dict)
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+    def to_response(self, cache_status: str = "HIT", accept_encoding: Optional[str] = None) -> Response:
+        """按客户端接受的编码直接发送预压缩的版本，请求时不再压缩"""
+        content, headers = encoded_content(
+            compressor, accept_encoding, self.body, self.variants, {**self.headers, "X-Cache": cache_status}
+        )
+        return Response(content=content, media_type="application/json", headers=headers)
+
+
+class MemoryCacheBackend:
+    """进程内LRU缓存，带TTL与标签索引；也用作测试中的缓存替身"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, CacheEntry, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+
+    def _discard(self, key: str):
+        item = self._entries.pop(key, None)
+        if item:
+            for tag in item[2]:
+                keys = self._tags.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tags[tag]
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, entry: CacheEntry, ttl: int, tags: Iterable[str]):
+        tags = tuple(tags)
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + ttl, entry, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+
+    def delete(self, key: str):
+        with self._lock:
+            self._discard(key)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys.update(self._tags.get(tag, ()))
+            for key in keys:
+                self._discard(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+
+class RedisCacheBackend:
+    """基于Redis的共享缓存，多个进程间的失效即时可见"""
+
+    prefix = "myblog:cache:"
+
+    def __init__(self, redis_url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("使用redis响应缓存需要安装redis包") from e
+        self._client = redis.Redis.from_url(redis_url)
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        data = run_blocking(self._client.hgetall, self.prefix + key)
+        if not data:
+            return None
+        return CacheEntry(
+            body=data[b"body"],
+            meta=json.loads(data[b"meta"]),
+            headers=json.loads(data[b"headers"]),
+            variants={
+                name.decode().removeprefix("variant:"): value
+                for name, value in data.items() if name.startswith(b"variant:")
+            }
+        )
+
+    def set(self, key: str, entry: CacheEntry, ttl: int, tags: Iterable[str]):
+        pipe = self._client.pipeline(transaction=False)
+        pipe.hset(self.prefix + key, mapping={
+            "body": entry.body,
+            "meta": json.dumps(entry.meta),
+            "headers": json.dumps(entry.headers),
+            **{f"variant:{encoding}": body for encoding, body in entry.variants.items()}
+        })
+        pipe.expire(self.prefix + key, ttl)
+        for tag in tags:
+            pipe.sadd(self._tag_key(tag), key)
+            pipe.expire(self._tag_key(tag), ttl)
+        run_blocking(pipe.execute)
+
+    def delete(self, key: str):
+        run_blocking(self._client.delete, self.prefix + key)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        return run_blocking(self._invalidate_tags, list(tags))
+
+    def _invalidate_tags(self, tags: List[str]) -> int:
+        keys = set()
+        for tag in tags:
+            keys.update(member.decode() for member in self._client.smembers(self._tag_key(tag)))
+        pipe = self._client.pipeline(transaction=False)
+        for key in keys:
+            pipe.delete(self.prefix + key)
+        for tag in tags:
+            pipe.delete(self._tag_key(tag))
+        pipe.execute()
+        return len(keys)
+
+    def clear(self):
+        for key in self._client.scan_iter(f"{self.prefix}*"):
+            self._client.delete(key)
+
+
+def load_versions() -> Dict[str, int]:
+    """从主库读取全部内容版本号"""
+    with SessionLocal() as db:
+        return dict(db.query(ContentVersion.key, ContentVersion.version).all())
+
+
+class ResponseCache:
+    """公开读接口的响应缓存：按路由与查询参数缓存序列化后的JSON，写操作按标签精确失效
+
+    标签失效只作用于本进程的内存后端。指定versions_loader时，条目记录生成时的内容版本号，
+    读取时与最多version_check_interval秒前读到的content_versions比对，其他进程的写入递增版本号后
+    本进程的旧条目随之失效。
+    """
+
+    def __init__(
+        self,
+        backend,
+        ttl: int,
+        enabled: bool = True,
+        replica_lag_window: int = 0,
+        versions_loader: Optional[Callable[[], Dict[str, int]]] = None,
+        version_check_interval: float = 1.0
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.replica_lag_window = replica_lag_window
+        self.versions_loader = versions_loader
+        self.version_check_interval = version_check_interval
+        self._lock = threading.Lock()
+        self._invalidated_at: Dict[str, float] = {}
+        self._versions: Dict[str, int] = {}
+        self._versions_at: Optional[float] = None
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "invalidations": 0}
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    @staticmethod
+    def key_for(request: Request) -> str:
+        """由路径与排序后的查询参数生成缓存键"""
+        params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{params}"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        if not self.enabled:
+            return None
+        entry = self.backend.get(key)
+        if entry is not None and not self._is_current(entry):
+            self.backend.delete(key)
+            entry = None
+        self._count("hits" if entry else "misses")
+        return entry
+
+    def _load_versions(self) -> Dict[str, int]:
+        versions = run_blocking(self.versions_loader)
+        with self._lock:
+            self._versions, self._versions_at = versions, time.monotonic()
+        return versions
+
+    def _is_current(self, entry: CacheEntry) -> bool:
+        """条目记录的版本号与最新版本号一致时仍然有效"""
+        if self.versions_loader is None:
+            return True
+        versions = entry.meta.get("versions")
+        if versions is None:
+            return False
+
+        def matches(current: Dict[str, int]) -> bool:
+            return all(current.get(key, 0) == version for key, version in versions.items())
+
+        with self._lock:
+            checked_at, current = self._versions_at, self._versions
+        try:
+            if checked_at is None or time.monotonic() - checked_at >= self.version_check_interval:
+                return matches(self._load_versions())
+            # 间隔内直接使用上次读到的版本号；不一致时可能是条目比快照新，重新读取后再判断
+            return matches(current) or matches(self._load_versions())
+        except Exception:
+            logger.exception("读取内容版本号失败，跳过响应缓存")
+            return False
+
+    @staticmethod
+    def respond(request: Request, entry: CacheEntry) -> Response:
+        """用缓存条目响应请求，请求携带的校验器与条目一致时返回304"""
+        validators = validators_from_headers(entry.headers)
+        if validators and is_not_modified(request, validators):
+            return validators.not_modified_response()
+        return entry.to_response(accept_encoding=request.headers.get("accept-encoding"))
+
+    def store(
+        self,
+        key: str,
+        model: BaseModel,
+        tags: Iterable[str],
+        meta: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        from_replica: bool = False,
+        request: Optional[Request] = None,
+        versions: Optional[Dict[str, int]] = None
+    ) -> Response:
+        """序列化响应模型并写入缓存，返回可直接发送的响应
+
+        较大的响应在写入缓存时压缩一次，之后的请求直接发送压缩结果。
+        从库读到的结果在相关标签刚失效时不写入缓存，避免复制延迟期间的旧数据被缓存整个TTL。
+        versions是读取数据之前读到的内容版本号，校验版本号时缺少versions的结果不写入缓存。
+        """
+        with profile_serialization():
+            body = model.model_dump_json().encode()
+            variants = compressor.variants(body)
+        meta = dict(meta or {})
+        if versions is not None:
+            meta["versions"] = versions
+        entry = CacheEntry(body=body, meta=meta, headers=headers or {}, variants=variants)
+        checkable = self.versions_loader is None or versions is not None
+        if self.enabled and checkable and not (from_replica and self._recently_invalidated(tags)):
+            self.backend.set(key, entry, self.ttl, tags)
+            self._count("sets")
+        accept_encoding = request.headers.get("accept-encoding") if request is not None else None
+        return entry.to_response("MISS", accept_encoding)
+
+    def _recently_invalidated(self, tags: Iterable[str]) -> bool:
+        since = time.monotonic() - self.replica_lag_window
+        with self._lock:
+            return any(self._invalidated_at.get(tag, 0.0) > since for tag in tags)
+
+    def invalidate(self, *tags: str):
+        """使带有任一标签的缓存失效"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._invalidated_at = {
+                tag: at for tag, at in self._invalidated_at.items() if at > now - self.replica_lag_window
+            }
+            for tag in tags:
+                self._invalidated_at[tag] = now
+            # 本进程刚递增了版本号，下次读取时重新读取版本号
+            self._versions_at = None
+        self._count("invalidations", self.backend.invalidate_tags(tags))
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+def _create_backend():
+    if settings.response_cache_backend == "redis":
+        if not settings.redis_url:
+            raise RuntimeError("response_cache_backend为redis时必须配置redis_url")
+        return RedisCacheBackend(settings.redis_url)
+    return MemoryCacheBackend(settings.response_cache_max_entries)
+
+
+# 全局响应缓存实例
+# 内存后端只能失效本进程的条目，多进程部署时按content_versions发现其他进程的写入
+response_cache = ResponseCache(
+    _create_backend(),
+    ttl=settings.cache_expire_time,
+    enabled=settings.response_cache_enabled,
+    replica_lag_window=settings.replica_lag_window,
+    versions_loader=load_versions if settings.response_cache_backend != "redis" else None,
+    version_check_interval=settings.response_cache_version_check_interval
+)
@@ -0,0 +1,373 @@
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.exc import InterfaceError, OperationalError
+from app.config import settings
+from app.database import SessionLocal
+from app.core.async_routes import run_blocking
+from app.core.site_stats import TOTAL_COMMENTS, adjust_stats
+from app.models.blog import BlogPost, Comment
+
+logger = logging.getLogger(__name__)
+
+# (回执, 工单号, 评论字段, 已失败次数)：回执用于确认或放回，内存队列中与工单号相同
+QueuedComment = Tuple[str, str, dict, int]
+
+# 连接断开、锁等待超时等暂时性错误：整批放回重试，不计入评论的失败次数
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+# 死信最多保留的条数
+DEAD_LETTER_LIMIT = 1000
+
+
+class MemoryCommentStore:
+    """进程内的有界评论队列"""
+
+    def __init__(self, max_size: int):
+        self._queue: "queue.Queue[QueuedComment]" = queue.Queue(maxsize=max_size)
+        self.dead_letters: "deque[QueuedComment]" = deque(maxlen=DEAD_LETTER_LIMIT)
+
+    def put(self, ticket: str, comment: dict) -> bool:
+        try:
+            self._queue.put_nowait((ticket, ticket, comment, 0))
+            return True
+        except queue.Full:
+            return False
+
+    def take(self, max_items: int, timeout: float) -> List[QueuedComment]:
+        """最多等待timeout秒取到第一条，再取出已在队列中的其余评论"""
+        try:
+            entries = [self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()]
+        except queue.Empty:
+            return []
+        while len(entries) < max_items:
+            try:
+                entries.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return entries
+
+    def ack(self, entries: List[QueuedComment]):
+        pass
+
+    def release(self, entries: List[QueuedComment]):
+        for entry in entries:
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                logger.error("评论队列已满，丢弃评论 %s", entry[1])
+
+    def retry(self, entries: List[QueuedComment]):
+        """失败次数加一后重新入队"""
+        for receipt, ticket, comment, attempts in entries:
+            try:
+                self._queue.put_nowait((receipt, ticket, comment, attempts + 1))
+            except queue.Full:
+                self.dead_letter([(receipt, ticket, comment, attempts)])
+
+    def dead_letter(self, entries: List[QueuedComment]):
+        """保留最近的死信（失败次数加一），供排查后人工处理"""
+        self.dead_letters.extend((receipt, ticket, comment, attempts + 1) for receipt, ticket, comment, attempts in entries)
+
+    def size(self) -> int:
+        return self._queue.qsize()
+
+    def dead_letter_size(self) -> int:
+        return len(self.dead_letters)
+
+
+class RedisCommentStore:
+    """基于Redis Stream的评论队列，多个进程共享，由消费组分摊写入
+
+    取出后未确认的评论（写入失败或进程退出）在空闲超过reclaim_idle秒后由任一进程重新认领。
+    """
+
+    key = "myblog:comment_queue"
+    dead_key = "myblog:comment_queue:dead"
+    group = "comment-writers"
+
+    def __init__(self, redis_url: str, max_size: int, reclaim_idle: int = 30):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("使用redis评论队列需要安装redis包") from e
+        self._client = redis.Redis.from_url(redis_url)
+        self._redis = redis
+        self.max_size = max_size
+        self.reclaim_idle = reclaim_idle
+        self.consumer = uuid.uuid4().hex[:12]
+        self._group_ready = False
+
+    def _ensure_group(self):
+        if self._group_ready:
+            return
+        try:
+            self._client.xgroup_create(self.key, self.group, id="0", mkstream=True)
+        except self._redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    def put(self, ticket: str, comment: dict) -> bool:
+        return run_blocking(self._put, ticket, comment)
+
+    def _put(self, ticket: str, comment: dict) -> bool:
+        # 长度检查与写入不是原子操作，上限为近似值
+        if self._client.xlen(self.key) >= self.max_size:
+            return False
+        self._client.xadd(self.key, {"ticket": ticket, "comment": json.dumps(comment)})
+        return True
+
+    def take(self, max_items: int, timeout: float) -> List[QueuedComment]:
+        self._ensure_group()
+        _, claimed, *_ = self._client.xautoclaim(
+            self.key, self.group, self.consumer, min_idle_time=self.reclaim_idle * 1000, count=max_items
+        )
+        messages = claimed
+        if not messages:
+            block = int(timeout * 1000) if timeout > 0 else None
+            response = self._client.xreadgroup(self.group, self.consumer, {self.key: ">"}, count=max_items, block=block)
+            messages = response[0][1] if response else []
+        return [
+            (
+                message_id.decode(), fields[b"ticket"].decode(), json.loads(fields[b"comment"]),
+                int(fields.get(b"attempts", 0))
+            )
+            for message_id, fields in messages if fields
+        ]
+
+    def ack(self, entries: List[QueuedComment]):
+        ids = [entry[0] for entry in entries]
+        pipe = self._client.pipeline(transaction=True)
+        pipe.xack(self.key, self.group, *ids)
+        pipe.xdel(self.key, *ids)
+        pipe.execute()
+
+    def release(self, entries: List[QueuedComment]):
+        # 不确认，空闲超过reclaim_idle后重新认领
+        pass
+
+    def _move(self, entries: List[QueuedComment], key: str, **xadd_options):
+        """在同一事务中把评论以新的失败次数写入key，并确认、删除原消息"""
+        pipe = self._client.pipeline(transaction=True)
+        for _, ticket, comment, attempts in entries:
+            fields = {"ticket": ticket, "comment": json.dumps(comment), "attempts": attempts + 1}
+            pipe.xadd(key, fields, **xadd_options)
+        ids = [entry[0] for entry in entries]
+        pipe.xack(self.key, self.group, *ids)
+        pipe.xdel(self.key, *ids)
+        pipe.execute()
+
+    def retry(self, entries: List[QueuedComment]):
+        """失败次数加一后重新入队"""
+        self._move(entries, self.key)
+
+    def dead_letter(self, entries: List[QueuedComment]):
+        self._move(entries, self.dead_key, maxlen=DEAD_LETTER_LIMIT, approximate=True)
+
+    def size(self) -> int:
+        return run_blocking(self._client.xlen, self.key)
+
+    def dead_letter_size(self) -> int:
+        return run_blocking(self._client.xlen, self.dead_key)
+
+
+class CommentIngestQueue:
+    """评论写入队列：接口只校验并入队，后台线程把评论合并为多行INSERT批量写入
+
+    每批在攒够batch_size条或第一条入队后max_latency_ms毫秒时写入；写入前按批再次确认文章仍存在且已发布，
+    入队后被删除或下线的文章的评论丢弃。
+    """
+
+    def __init__(
+        self,
+        store,
+        session_factory=SessionLocal,
+        batch_size: int = 100,
+        max_latency_ms: int = 200,
+        max_attempts: int = 3
+    ):
+        self.store = store
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._stats = {
+            "accepted": 0, "rejected": 0, "stored": 0, "dropped": 0, "batches": 0, "failures": 0,
+            "retried": 0, "failed": 0
+        }
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _count(self, **deltas: int):
+        with self._lock:
+            for name, delta in deltas.items():
+                self._stats[name] += delta
+
+    def submit(self, comment: dict) -> Optional[str]:
+        """评论入队，返回工单号；队列已满时返回None"""
+        ticket = uuid.uuid4().hex
+        if not self.store.put(ticket, comment):
+            self._count(rejected=1)
+            return None
+        self._count(accepted=1)
+        return ticket
+
+    def write(self, entries: List[QueuedComment]) -> int:
+        """把一批评论写入数据库并确认，返回写入的条数
+
+        整批写入遇到连接断开、锁等待超时等暂时性错误时整批放回重试；其他错误（如文章在确认后被删除导致外键冲突）
+        改为逐条写入，只有失败的评论放回队列，失败max_attempts次后转入死信，不再阻塞之后的评论。
+        """
+        if not entries:
+            return 0
+
+        db = self.session_factory()
+        try:
+            published = self._published_post_ids(db, {comment["post_id"] for _, _, comment, _ in entries})
+            rows = [entry for entry in entries if entry[2]["post_id"] in published]
+            try:
+                self._insert(db, rows)
+                failed = []
+            except TRANSIENT_ERRORS:
+                raise
+            except Exception:
+                db.rollback()
+                logger.warning("评论批量写入失败，改为逐条写入", exc_info=True)
+                failed = self._write_each(db, rows)
+        except Exception:
+            db.rollback()
+            self.store.release(entries)
+            self._count(failures=1)
+            raise
+        finally:
+            db.close()
+
+        failed_receipts = {entry[0] for entry in failed}
+        self.store.ack([entry for entry in entries if entry[0] not in failed_receipts])
+        if failed:
+            self._retry_or_dead_letter(failed)
+        stored = len(rows) - len(failed)
+        dropped = len(entries) - len(rows)
+        if dropped:
+            logger.warning("文章已删除或下线，丢弃 %d 条排队的评论", dropped)
+        self._count(stored=stored, dropped=dropped, batches=1)
+        return stored
+
+    @staticmethod
+    def _published_post_ids(db, post_ids: set) -> set:
+        return {
+            post_id for post_id, in db.query(BlogPost.id).filter(
+                BlogPost.id.in_(post_ids), BlogPost.is_published == True
+            )
+        }
+
+    @staticmethod
+    def _insert(db, entries: List[QueuedComment]):
+        """一条多行INSERT写入并提交"""
+        if entries:
+            db.execute(insert(Comment), [comment for _, _, comment, _ in entries])
+            adjust_stats(db, {TOTAL_COMMENTS: len(entries)})
+        db.commit()
+
+    def _write_each(self, db, entries: List[QueuedComment]) -> List[QueuedComment]:
+        """逐条写入并提交，返回写入失败的评论"""
+        failed = []
+        for entry in entries:
+            try:
+                self._insert(db, [entry])
+            except Exception:
+                db.rollback()
+                logger.warning("评论 %s 写入失败", entry[1], exc_info=True)
+                failed.append(entry)
+        return failed
+
+    def _retry_or_dead_letter(self, entries: List[QueuedComment]):
+        retry = [entry for entry in entries if entry[3] + 1 < self.max_attempts]
+        dead = [entry for entry in entries if entry[3] + 1 >= self.max_attempts]
+        if retry:
+            self.store.retry(retry)
+        if dead:
+            self.store.dead_letter(dead)
+            logger.error(
+                "评论写入失败%d次，转入死信: %s", self.max_attempts, ", ".join(entry[1] for entry in dead)
+            )
+        self._count(retried=len(retry), failed=len(dead))
+
+    def collect(self, timeout: float = 1.0) -> List[QueuedComment]:
+        """取出一批评论：等待第一条最多timeout秒，之后在max_latency内继续攒批"""
+        entries = self.store.take(self.batch_size, timeout)
+        if not entries:
+            return entries
+        deadline = time.monotonic() + self.max_latency
+        while len(entries) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            entries += self.store.take(self.batch_size - len(entries), remaining)
+        return entries
+
+    def drain(self) -> int:
+        """立即写入队列中已有的全部评论，返回写入的条数"""
+        stored = 0
+        while True:
+            entries = self.store.take(self.batch_size, 0)
+            if not entries:
+                return stored
+            stored += self.write(entries)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queued"] = self.store.size()
+        stats["dead_letters"] = self.store.dead_letter_size()
+        return stats
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.write(self.collect())
+            except Exception:
+                logger.exception("评论批量写入失败")
+                # 避免数据库不可用时空转
+                self._stop.wait(1)
+
+    def start(self):
+        """启动后台写入线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="comment-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台线程并写入剩余的评论"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.drain()
+
+
+def _create_store():
+    if settings.comment_queue_backend == "redis":
+        if not settings.redis_url:
+            raise RuntimeError("comment_queue_backend为redis时必须配置redis_url")
+        return RedisCommentStore(settings.redis_url, settings.comment_queue_max_size)
+    return MemoryCommentStore(settings.comment_queue_max_size)
+
+
+# 全局评论写入队列
+comment_queue = CommentIngestQueue(
+    _create_store(),
+    batch_size=settings.comment_queue_batch_size,
+    max_latency_ms=settings.comment_queue_max_latency_ms,
+    max_attempts=settings.comment_queue_max_attempts
+)
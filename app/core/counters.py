@@ -0,0 +1,94 @@
+from collections import defaultdict
+from typing import Dict, List, Optional
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from app.core.upserts import insert_ignore
+from app.models.blog import BlogPost, BlogPostCounter
+
+# 全部文章计数使用的category_id
+ALL_CATEGORIES = 0
+
+
+def _scopes(category_id: Optional[int]) -> List[int]:
+    """一篇文章影响的计数范围：全部文章及其所属分类"""
+    return [ALL_CATEGORIES, category_id] if category_id else [ALL_CATEGORIES]
+
+
+def _count_published(db: Session, scope: int) -> int:
+    """直接统计已发布文章数"""
+    query = db.query(func.count(BlogPost.id)).filter(BlogPost.is_published == True)
+    if scope != ALL_CATEGORIES:
+        query = query.filter(BlogPost.category_id == scope)
+    return query.scalar() or 0
+
+
+def _apply_delta(db: Session, scope: int, delta: int) -> None:
+    """对单个计数范围做增量更新"""
+    stmt = update(BlogPostCounter)\
+        .where(BlogPostCounter.category_id == scope)\
+        .values(published_count=BlogPostCounter.published_count + delta)
+    if db.execute(stmt).rowcount == 0:
+        # 计数行尚不存在时，按事务内的最新数据初始化（已包含本次变更）；
+        # 并发的首次写入已插入该行时，本事务的变更不在其统计中，改为增量更新
+        db.flush()
+        row = {"category_id": scope, "published_count": _count_published(db, scope)}
+        if not insert_ignore(db, BlogPostCounter.__table__, row):
+            db.execute(stmt)
+
+
+def track_published_change(
+    db: Session,
+    old_state: Optional[tuple],
+    new_state: Optional[tuple]
+) -> None:
+    """根据文章变更前后的(is_published, category_id)在当前事务中维护计数，由调用方统一提交
+
+    None表示文章不存在（创建前或删除后）。
+    """
+    deltas = defaultdict(int)
+    if old_state and old_state[0]:
+        for scope in _scopes(old_state[1]):
+            deltas[scope] -= 1
+    if new_state and new_state[0]:
+        for scope in _scopes(new_state[1]):
+            deltas[scope] += 1
+
+    # 每个范围只更新一次，避免计数行初始化后被重复累加
+    for scope, delta in deltas.items():
+        if delta:
+            _apply_delta(db, scope, delta)
+
+
+def get_published_count(db: Session, category_id: Optional[int] = None) -> int:
+    """读取已发布文章数，计数行缺失时回退为实时统计"""
+    scope = category_id or ALL_CATEGORIES
+    count = db.query(BlogPostCounter.published_count)\
+              .filter(BlogPostCounter.category_id == scope)\
+              .scalar()
+    if count is None:
+        count = _count_published(db, scope)
+    return count
+
+
+def rebuild_published_counts(db: Session) -> Dict[int, tuple]:
+    """按实际数据重建全部计数，返回发生偏差的范围及其(旧值, 新值)"""
+    actual = {ALL_CATEGORIES: _count_published(db, ALL_CATEGORIES)}
+    rows = db.query(BlogPost.category_id, func.count(BlogPost.id))\
+             .filter(BlogPost.is_published == True, BlogPost.category_id.isnot(None))\
+             .group_by(BlogPost.category_id)\
+             .all()
+    actual.update({category_id: count for category_id, count in rows})
+
+    drift = {}
+    existing = {counter.category_id: counter for counter in db.query(BlogPostCounter).all()}
+    for scope, counter in existing.items():
+        count = actual.pop(scope, 0)
+        if counter.published_count != count:
+            drift[scope] = (counter.published_count, count)
+            counter.published_count = count
+    for scope, count in actual.items():
+        drift[scope] = (None, count)
+        db.add(BlogPostCounter(category_id=scope, published_count=count))
+
+    db.commit()
+    return drift
@@ -2,17 +2,18 @@ from typing import Optional
 from fastapi import Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.core.security import get_current_active_user
+from app.core.security import get_current_active_user, get_current_active_user_async
 from app.models.user import User
 from app.config import settings
 
 
 def get_pagination_params(
     page: int = Query(1, ge=1, description="页码"),
-    size: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size, description="每页数量")
+    size: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="分页游标，传入（首页传空字符串）时使用游标分页并忽略page")
 ):
     """获取分页参数"""
-    return {"page": page, "size": size, "offset": (page - 1) * size}
+    return {"page": page, "size": size, "offset": (page - 1) * size, "cursor": cursor}
 
 
 def get_current_admin_user(current_user: User = Depends(get_current_active_user)) -> User:
@@ -22,6 +23,11 @@ def get_current_admin_user(current_user: User = Depends(get_current_active_user)
     return current_user
 
 
+async def get_current_admin_user_async(current_user: User = Depends(get_current_active_user_async)) -> User:
+    """获取当前管理员用户（异步栈）"""
+    return get_current_admin_user(current_user)
+
+
 def get_optional_user(
     token: Optional[str] = Query(None), 
     db: Session = Depends(get_db)
@@ -0,0 +1,60 @@
+import inspect
+from typing import Any, Callable
+from fastapi import Response
+from fastapi.exceptions import ResponseValidationError
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter, ValidationError
+from app.config import settings
+
+
+class FastJSONRoute(APIRoute):
+    """响应模型一次校验、直接由pydantic-core序列化为JSON字节的路由
+
+    默认路径中FastAPI会把返回值按response_model重新校验，转换为Python字典后再由json.dumps编码；
+    这里改为在处理函数（同步函数即在线程池中）内校验一次并调用TypeAdapter.dump_json，
+    返回的Response不再经过FastAPI的序列化。处理函数直接返回Response时原样发送。
+    """
+
+    def get_route_handler(self) -> Callable:
+        if self.response_model is not None and not getattr(self.dependant.call, "_fast_json", False):
+            self.dependant.call = self._fast_json_call(self.dependant.call)
+        return super().get_route_handler()
+
+    def _fast_json_call(self, call: Callable) -> Callable:
+        adapter = TypeAdapter(self.response_model)
+        status_code = self.status_code or 200
+        options = {
+            "include": self.response_model_include,
+            "exclude": self.response_model_exclude,
+            "by_alias": self.response_model_by_alias,
+            "exclude_unset": self.response_model_exclude_unset,
+            "exclude_defaults": self.response_model_exclude_defaults,
+            "exclude_none": self.response_model_exclude_none,
+        }
+
+        def render(result: Any) -> Response:
+            if isinstance(result, Response):
+                return result
+            try:
+                value = adapter.validate_python(result, from_attributes=True)
+            except ValidationError as e:
+                raise ResponseValidationError(errors=e.errors(), body=result)
+            return Response(
+                content=adapter.dump_json(value, **options),
+                status_code=status_code,
+                media_type="application/json"
+            )
+
+        if inspect.iscoroutinefunction(call):
+            async def fast_call(**kwargs):
+                return render(await call(**kwargs))
+        else:
+            def fast_call(**kwargs):
+                return render(call(**kwargs))
+
+        fast_call._fast_json = True
+        return fast_call
+
+
+# 各路由模块使用的路由类，由配置决定是否启用快速JSON响应
+ResponseRoute = FastJSONRoute if settings.fast_json_responses else APIRoute
@@ -0,0 +1,103 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
+from app.core.security import verify_password
+
+
+class PasswordHasher:
+    """密码校验执行器：bcrypt在独立的进程池中计算，不占用请求线程
+
+    同时进行（计算中+排队）的校验数量超过workers + queue_limit时立即返回429，
+    而不是让登录请求堆积并拖慢其他接口；进程池异常时返回503。
+    工作进程以spawn方式启动：fork会复制后台线程持有中的锁（日志、连接池、Redis客户端），子进程可能因此死锁。
+    """
+
+    def __init__(self, workers: int = 2, queue_limit: int = 32):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._executor: Optional[Executor] = None
+        self.rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return max(self.workers, 1) + self.queue_limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def start(self):
+        """创建进程池并预先启动工作进程，避免首次登录时等待进程启动"""
+        if self.workers <= 0:
+            return
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(os.getpid)
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.rejected += 1
+                return False
+            self._in_flight += 1
+            return True
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """校验密码，执行器饱和时抛出429，进程池不可用时抛出503"""
+        if not self._acquire():
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="登录请求过多，请稍后重试",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            # workers为0时退回线程池计算，仍受排队上限约束
+            if self.workers <= 0:
+                return await run_in_threadpool(verify_password, plain_password, hashed_password)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), verify_password, plain_password, hashed_password
+            )
+        except BrokenProcessPool:
+            self.shutdown()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="认证服务暂时不可用",
+            )
+        finally:
+            self._release()
+
+    def shutdown(self):
+        """关闭进程池，下次校验时重新创建"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# 全局密码校验执行器
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    queue_limit=settings.password_hash_queue_limit
+)
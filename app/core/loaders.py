@@ -0,0 +1,26 @@
+from sqlalchemy.orm import joinedload, load_only, undefer
+from app.models.blog import BlogPost
+from app.schemas.blog import BlogPostList
+
+# BlogPostList中直接对应数据表列的字段（category为关系，单独加载）
+POST_LIST_COLUMNS = [
+    getattr(BlogPost, name)
+    for name in BlogPostList.model_fields
+    if name in BlogPost.__table__.columns
+]
+
+
+def post_list_options(*extra_columns):
+    """文章列表类响应的加载策略：只取BlogPostList所需列（及extra_columns），并通过JOIN一次取回分类，避免N+1查询
+
+    未列出的列（尤其是正文）被访问时直接报错，而不是逐条补查。
+    """
+    return (
+        load_only(*POST_LIST_COLUMNS, BlogPost.category_id, *extra_columns, raiseload=True),
+        joinedload(BlogPost.category),
+    )
+
+
+def post_detail_options():
+    """文章详情的加载策略：取出延迟加载的正文，分类随文章一次JOIN取回"""
+    return (undefer(BlogPost.content), joinedload(BlogPost.category))
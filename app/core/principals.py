@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+from app.config import settings
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """已认证用户的只读快照，字段与User响应模型一致，可脱离数据库会话使用"""
+    id: int
+    username: str
+    email: str
+    full_name: str
+    is_active: bool
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=user.is_active,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+class PrincipalCache:
+    """按令牌主体（用户名）缓存已认证用户，命中时认证不再查询users表
+
+    缓存只在本进程内有效：本进程的用户修改会立即失效对应条目，
+    其他进程的修改最多在ttl秒后生效。
+    """
+
+    def __init__(self, ttl: int = 60, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+
+    def get(self, username: str) -> Optional[Principal]:
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            item = self._entries.get(username)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._entries[username]
+                return None
+            self._entries.move_to_end(username)
+            return item[1]
+
+    def set(self, principal: Principal) -> Principal:
+        if self.ttl <= 0:
+            return principal
+        with self._lock:
+            self._entries[principal.username] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.username)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return principal
+
+    def invalidate(self, username: str):
+        """用户信息或状态修改后调用"""
+        with self._lock:
+            self._entries.pop(username, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# 全局已认证用户缓存实例
+principal_cache = PrincipalCache(ttl=settings.principal_cache_ttl)
@@ -0,0 +1,114 @@
+import threading
+from typing import Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.versions import RESUME, bump_versions, get_versions, make_validators, Validators
+from app.models.resume import ResumeSection, SectionType, PersonalInfo, Education, Experience, ResumeSnapshot
+from app.schemas.resume import ResumeData
+from app.utils.compression import compressor
+
+# 快照表中只保存一行
+SNAPSHOT_ID = 1
+
+
+def build_resume_data(db: Session) -> ResumeData:
+    """从各简历表组装完整简历，技能与项目章节一次查询取回后按类型拆分"""
+    personal_info = db.query(PersonalInfo)\
+                     .filter(PersonalInfo.is_visible == True)\
+                     .first()
+    
+    education = db.query(Education)\
+                 .filter(Education.is_visible == True)\
+                 .order_by(Education.order_index)\
+                 .all()
+    
+    experience = db.query(Experience)\
+                  .filter(Experience.is_visible == True)\
+                  .order_by(Experience.order_index)\
+                  .all()
+    
+    sections = db.query(ResumeSection)\
+                .filter(ResumeSection.is_visible == True)\
+                .filter(ResumeSection.section_type.in_([SectionType.skills, SectionType.projects]))\
+                .order_by(ResumeSection.order_index)\
+                .all()
+    
+    return ResumeData.model_validate({
+        "personal_info": personal_info,
+        "education": education,
+        "experience": experience,
+        "skills": [s for s in sections if s.section_type == SectionType.skills],
+        "projects": [s for s in sections if s.section_type == SectionType.projects]
+    }, from_attributes=True)
+
+
+class ResumeSnapshotCache:
+    """简历快照：按版本号缓存序列化后的简历JSON
+
+    读取时只查询一次版本号；本进程内存中的快照版本一致时直接返回，否则读取快照表，
+    快照表缺失或落后时现场重建。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[Tuple[int, bytes, Dict[str, bytes]]] = None
+
+    def get(self, db: Session) -> Tuple[bytes, Dict[str, bytes], Validators]:
+        """返回当前版本的简历JSON、预压缩的各编码版本及其校验器"""
+        versions = get_versions(db, [RESUME])
+        version = versions[RESUME][0]
+        # 同一版本的快照逐字节相同，使用强ETag
+        validators = make_validators("resume", versions, weak=False)
+        
+        snapshot = self._snapshot
+        if snapshot and snapshot[0] == version:
+            return snapshot[1], snapshot[2], validators
+        
+        row = db.get(ResumeSnapshot, SNAPSHOT_ID)
+        if row is not None and row.version == version:
+            body = row.data.encode()
+        else:
+            # 兜底：快照缺失（如尚未有过写操作）或被绕过接口的修改弄旧时，只在内存中重建，
+            # 不在读请求里写表，避免并发读请求争抢插入
+            body = build_resume_data(db).model_dump_json().encode()
+        variants = self._remember(version, body)
+        return body, variants, validators
+
+    def _remember(self, version: int, body: bytes) -> Dict[str, bytes]:
+        """保存内存快照，每个版本只压缩一次"""
+        variants = compressor.variants(body)
+        with self._lock:
+            if self._snapshot is None or self._snapshot[0] <= version:
+                self._snapshot = (version, body, variants)
+        return variants
+
+    def rebuild(self, db: Session) -> Tuple[int, str]:
+        """在当前事务中递增版本号并重建快照表，由调用方提交；返回新版本号及快照内容
+
+        版本号行在事务内被锁定，并发的简历写操作会按顺序生成各自的快照。
+        """
+        bump_versions(db, RESUME)
+        db.flush()
+        version = get_versions(db, [RESUME])[RESUME][0]
+        data = build_resume_data(db).model_dump_json()
+        
+        row = db.get(ResumeSnapshot, SNAPSHOT_ID)
+        if row is None:
+            db.add(ResumeSnapshot(id=SNAPSHOT_ID, version=version, data=data))
+        else:
+            row.version = version
+            row.data = data
+        return version, data
+
+    def commit(self, db: Session):
+        """提交简历写操作：与数据修改在同一事务中重建快照，提交后更新内存快照"""
+        version, data = self.rebuild(db)
+        db.commit()
+        self._remember(version, data.encode())
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+
+
+# 全局简历快照实例
+resume_snapshot = ResumeSnapshotCache()
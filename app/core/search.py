@@ -0,0 +1,351 @@
+import heapq
+import html
+import logging
+import math
+import re
+import sys
+import threading
+import time
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.core.async_routes import run_blocking
+from app.models.blog import BlogPost
+
+logger = logging.getLogger(__name__)
+
+# 拉丁字母/数字按单词切分，中日韩文字连续片段按二元组切分
+_TOKEN_RE = re.compile(r"[a-z0-9]+|[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]+")
+
+# 字段权重：词频按权重累加，标题命中的分值高于正文
+FIELD_WEIGHTS = {"title": 3, "summary": 2, "content": 1}
+
+# BM25参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 增量同步向水位线之前重叠读取的时间，覆盖更新时间早于水位线、提交晚于上次同步的事务
+REFRESH_OVERLAP = timedelta(minutes=1)
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """分词：英文单词整体作为词项，中文连续片段切为重叠二元组，单字片段保留单字"""
+    tokens = []
+    for match in _TOKEN_RE.finditer(_normalize(text)):
+        word = match.group()
+        if word[0] < "\u3040" or len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def highlight(text: str, terms: Iterable[str], max_length: Optional[int] = None) -> str:
+    """对文本中命中的词项加<mark>标记并转义HTML，指定max_length时截取首个命中附近的片段"""
+    text = text or ""
+    lowered = text.lower()
+    spans = []
+    for term in set(terms):
+        start = lowered.find(term)
+        while start != -1:
+            spans.append((start, start + len(term)))
+            start = lowered.find(term, start + 1)
+    spans.sort()
+
+    # 合并重叠的命中区间（二元组相互重叠）
+    merged: List[List[int]] = []
+    for start, end in spans:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    window_start, window_end = 0, len(text)
+    if max_length and len(text) > max_length:
+        anchor = merged[0][0] if merged else 0
+        window_start = max(0, anchor - max_length // 4)
+        window_end = min(len(text), window_start + max_length)
+
+    parts = []
+    cursor = window_start
+    for start, end in merged:
+        if end <= window_start or start >= window_end:
+            continue
+        start, end = max(start, window_start), min(end, window_end)
+        parts.append(html.escape(text[cursor:start]))
+        parts.append(f"<mark>{html.escape(text[start:end])}</mark>")
+        cursor = end
+    parts.append(html.escape(text[cursor:window_end]))
+
+    snippet = "".join(parts)
+    if window_start > 0:
+        snippet = "…" + snippet
+    if window_end < len(text):
+        snippet += "…"
+    return snippet
+
+
+def make_snippet(summary: Optional[str], content: Optional[str], terms: Iterable[str], length: int = 160) -> str:
+    """生成结果摘要：优先取正文中命中位置附近的片段，正文未命中时使用摘要"""
+    terms = list(terms)
+    lowered = (content or "").lower()
+    if summary and not any(term in lowered for term in terms):
+        return highlight(summary, terms, length)
+    return highlight(content, terms, length)
+
+
+class _IndexData:
+    """一份倒排索引数据；全量构建时在锁外生成新实例，完成后整体替换"""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self.doc_length: Dict[int, int] = {}
+        self.doc_meta: Dict[int, Tuple[bool, Optional[int]]] = {}
+        self.total_length = 0
+
+    def add(self, post_id: int, document: Tuple[Dict[str, int], int], is_published: bool, category_id: Optional[int]):
+        frequencies, length = document
+        for term, frequency in frequencies.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+            postings[post_id] = frequency
+        self.doc_terms[post_id] = tuple(frequencies)
+        self.doc_length[post_id] = length
+        self.doc_meta[post_id] = (bool(is_published), category_id)
+        self.total_length += length
+
+    def remove(self, post_id: int):
+        for term in self.doc_terms.pop(post_id, ()):
+            postings = self.postings[term]
+            del postings[post_id]
+            if not postings:
+                del self.postings[term]
+        self.total_length -= self.doc_length.pop(post_id, 0)
+        self.doc_meta.pop(post_id, None)
+
+
+def _analyze(title: str, summary: str, content: str) -> Tuple[Dict[str, int], int]:
+    """计算文章的加权词频与文档长度，不访问索引，可在锁外执行"""
+    frequencies: Dict[str, int] = {}
+    length = 0
+    for field, text in (("title", title), ("summary", summary), ("content", content)):
+        weight = FIELD_WEIGHTS[field]
+        for token in tokenize(text):
+            # 驻留词项字符串，文档词项表与倒排表共享同一对象以节省内存
+            token = sys.intern(token)
+            frequencies[token] = frequencies.get(token, 0) + weight
+            length += weight
+    return frequencies, length
+
+
+class SearchIndex:
+    """博客文章倒排索引，支持增量更新与BM25排序
+
+    启动后台线程时由线程用主库会话全量构建一次，之后按updated_at水位线增量同步其他进程的写入；
+    未启动线程时（测试、脚本）在首次检索时构建并在检索时定期增量同步。
+    """
+
+    def __init__(self, session_factory=SessionLocal, refresh_interval: int = 30):
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        # 同一时刻只进行一次构建或同步
+        self._sync_lock = threading.Lock()
+        self._data = _IndexData()
+        self._built = False
+        # 已同步的最大updated_at，增量同步从该时间前REFRESH_OVERLAP开始读取
+        self._last_seen: Optional[datetime] = None
+        self._checked_at = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def __len__(self) -> int:
+        return len(self._data.doc_length)
+
+    def upsert(self, post: BlogPost):
+        """文章创建或更新后同步索引，索引尚未构建时跳过（由构建后的增量同步补上）"""
+        # 先在调用方读取属性（正文延迟加载），分词移到线程池
+        document = run_blocking(_analyze, post.title, post.summary, post.content)
+        with self._lock:
+            if not self._built:
+                return
+            self._data.remove(post.id)
+            self._data.add(post.id, document, post.is_published, post.category_id)
+
+    def remove(self, post_id: int):
+        """文章删除后同步索引"""
+        with self._lock:
+            if not self._built:
+                return
+            self._data.remove(post_id)
+
+    def clear(self):
+        with self._lock:
+            self._data = _IndexData()
+            self._built = False
+            self._last_seen = None
+
+    def _rows(self, db: Session):
+        return db.query(
+            BlogPost.id, BlogPost.title, BlogPost.summary, BlogPost.content,
+            BlogPost.is_published, BlogPost.category_id
+        )
+
+    def build(self, db: Session):
+        """从数据库全量构建新的索引并整体替换，构建期间检索继续使用原有索引"""
+        # 先读取水位线再读取文章（同一事务），构建期间提交的修改由下一次增量同步补上
+        last_seen = db.query(func.max(BlogPost.updated_at)).scalar()
+        data = _IndexData()
+        for post_id, title, summary, content, is_published, category_id in self._rows(db).yield_per(1000):
+            data.add(post_id, _analyze(title, summary, content), is_published, category_id)
+        with self._lock:
+            self._data = data
+            self._built = True
+            self._last_seen = last_seen
+            self._checked_at = time.monotonic()
+
+    def refresh(self, db: Session):
+        """增量同步：重新索引水位线之后更新的文章，文章数不一致时移除数据库中已删除的文章"""
+        with self._lock:
+            since = self._last_seen
+        # 水位线与文章在同一事务中读取，并向前重叠REFRESH_OVERLAP，覆盖提交晚于更新时间的事务
+        last_seen = db.query(func.max(BlogPost.updated_at)).scalar()
+        query = self._rows(db)
+        if since is not None:
+            query = query.filter(BlogPost.updated_at >= since - REFRESH_OVERLAP)
+        changed = [
+            (post_id, _analyze(title, summary, content), is_published, category_id)
+            for post_id, title, summary, content, is_published, category_id in query
+        ]
+        count = db.query(func.count(BlogPost.id)).scalar()
+
+        with self._lock:
+            for post_id, document, is_published, category_id in changed:
+                self._data.remove(post_id)
+                self._data.add(post_id, document, is_published, category_id)
+            stale = len(self._data.doc_length) != count
+        if stale:
+            existing = {post_id for post_id, in db.query(BlogPost.id)}
+            with self._lock:
+                for post_id in [post_id for post_id in self._data.doc_length if post_id not in existing]:
+                    self._data.remove(post_id)
+        with self._lock:
+            if last_seen is not None:
+                self._last_seen = last_seen
+            self._checked_at = time.monotonic()
+
+    def sync(self):
+        """用主库会话构建索引，已构建时增量同步"""
+        with self._sync_lock:
+            db = self.session_factory()
+            try:
+                if self._built:
+                    self.refresh(db)
+                else:
+                    self.build(db)
+            finally:
+                db.close()
+
+    def ensure_fresh(self) -> bool:
+        """检索前调用，返回索引是否可用
+
+        后台线程运行时构建与同步都由线程完成，首次构建完成前返回False；
+        否则首次使用时构建，之后每隔refresh_interval增量同步一次。
+        """
+        if self._thread is not None:
+            return self._built
+        if not self._built or time.monotonic() - self._checked_at >= self.refresh_interval:
+            self.sync()
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                self.sync()
+            except Exception:
+                logger.exception("搜索索引构建或同步失败")
+            if self._stop.wait(self.refresh_interval):
+                return
+
+    def start(self):
+        """启动后台线程：立即全量构建索引，之后定期增量同步"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="search-indexer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台线程"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def search(
+        self,
+        query: str,
+        published_only: bool = True,
+        category_id: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        """按BM25检索同时包含全部查询词项的文章，返回[(文章ID, 分值)]及命中总数"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return [], 0
+
+        with self._lock:
+            data = self._data
+            postings = [data.postings.get(term) for term in terms]
+            if not all(postings):
+                return [], 0
+            postings.sort(key=len)
+
+            doc_count = len(data.doc_length)
+            average_length = data.total_length / doc_count if doc_count else 1.0
+            idf = [
+                math.log(1 + (doc_count - len(p) + 0.5) / (len(p) + 0.5))
+                for p in postings
+            ]
+
+            scores = []
+            for post_id in postings[0]:
+                is_published, post_category = data.doc_meta[post_id]
+                if published_only and not is_published:
+                    continue
+                if category_id and post_category != category_id:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * data.doc_length[post_id] / average_length)
+                score = 0.0
+                for weight, term_postings in zip(idf, postings):
+                    frequency = term_postings.get(post_id)
+                    if frequency is None:
+                        break
+                    score += weight * frequency * (BM25_K1 + 1) / (frequency + norm)
+                else:
+                    scores.append((post_id, score))
+
+        total = len(scores)
+        if limit is not None:
+            ranked = heapq.nlargest(limit, scores, key=lambda item: (item[1], item[0]))
+        else:
+            ranked = sorted(scores, key=lambda item: (item[1], item[0]), reverse=True)
+        return ranked, total
+
+
+# 全局搜索索引实例
+search_index = SearchIndex(refresh_interval=settings.search_refresh_interval)
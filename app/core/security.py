@@ -1,13 +1,16 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+from jose import JWTError
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.config import settings
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.user import User
+from app.core.principals import Principal, principal_cache
+from app.core.tokens import token_codec
 from app.schemas.user import TokenData
 
 # 密码加密上下文
@@ -37,42 +40,71 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
             minutes=settings.access_token_expire_minutes
         )
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(
-        to_encode, settings.secret_key, algorithm=settings.algorithm
-    )
+    encoded_jwt = token_codec.encode(to_encode)
     return encoded_jwt
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> User:
-    """获取当前认证用户"""
+def _token_subject(token: str) -> str:
+    """校验JWT并返回令牌主体（用户名）"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="无法验证凭据",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(
-            token, settings.secret_key, algorithms=[settings.algorithm]
-        )
+        payload = token_codec.decode(token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
         token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
+    return token_data.username
+
 
-    user = db.query(User).filter(User.username == token_data.username).first()
+def _load_principal(db: Session, username: str) -> Principal:
+    """查询用户并写入已认证用户缓存"""
+    user = db.query(User).filter(User.username == username).first()
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="无法验证凭据",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal_cache.set(Principal.from_user(user))
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+) -> Principal:
+    """获取当前认证用户，缓存命中时不查询数据库"""
+    username = _token_subject(token)
+    user = principal_cache.get(username) or _load_principal(db, username)
     if not user.is_active:
         raise HTTPException(status_code=400, detail="用户已禁用")
     return user
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     """获取当前活跃用户"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="用户已禁用")
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """获取当前认证用户（异步栈）"""
+    username = _token_subject(token)
+    user = principal_cache.get(username)
+    if user is None:
+        user = await db.run_sync(lambda session: _load_principal(session, username))
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="用户已禁用")
+    return user
+
+
+async def get_current_active_user_async(current_user: Principal = Depends(get_current_user_async)) -> Principal:
+    """获取当前活跃用户（异步栈）"""
+    return get_current_active_user(current_user)
@@ -0,0 +1,125 @@
+import logging
+import threading
+from typing import Callable, Dict, Optional
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.core.upserts import insert_ignore
+from app.models.blog import BlogPost, Comment
+from app.models.message import Message
+from app.models.stats import SiteStat
+
+logger = logging.getLogger(__name__)
+
+# 统计键
+TOTAL_POSTS = "total_posts"
+TOTAL_COMMENTS = "total_comments"
+TOTAL_MESSAGES = "total_messages"
+TOTAL_VIEWS = "total_views"
+
+# 统计键 -> 按实际数据计算的查询
+_ACTUAL: Dict[str, Callable[[Session], int]] = {
+    TOTAL_POSTS: lambda db: db.query(func.count(BlogPost.id)).scalar(),
+    TOTAL_COMMENTS: lambda db: db.query(func.count(Comment.id)).scalar(),
+    TOTAL_MESSAGES: lambda db: db.query(func.count(Message.id)).scalar(),
+    TOTAL_VIEWS: lambda db: db.query(func.sum(BlogPost.view_count)).scalar(),
+}
+
+
+def _count_actual(db: Session, key: str) -> int:
+    return _ACTUAL[key](db) or 0
+
+
+def adjust_stats(db: Session, deltas: Dict[str, int]) -> None:
+    """在当前事务中对统计值做增量更新，由调用方统一提交"""
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        stmt = update(SiteStat)\
+            .where(SiteStat.key == key)\
+            .values(value=SiteStat.value + delta)
+        if db.execute(stmt).rowcount == 0:
+            # 统计行尚不存在时，按事务内的最新数据初始化（已包含本次变更）；
+            # 并发的首次写入已插入该行时，本事务的变更不在其统计中，改为增量更新
+            db.flush()
+            if not insert_ignore(db, SiteStat.__table__, {"key": key, "value": _count_actual(db, key)}):
+                db.execute(stmt)
+
+
+def get_stats(db: Session) -> Dict[str, int]:
+    """一次主键范围查询读取全部统计值，统计行缺失时回退为实时统计"""
+    stats = dict(db.query(SiteStat.key, SiteStat.value).filter(SiteStat.key.in_(_ACTUAL)).all())
+    for key in _ACTUAL:
+        if key not in stats:
+            stats[key] = _count_actual(db, key)
+    return stats
+
+
+def rebuild_site_stats(db: Session) -> Dict[str, tuple]:
+    """按实际数据重建全部统计值，返回发生偏差的统计键及其(旧值, 新值)
+
+    读取实际数据与写回之间提交的增量会被覆盖，偏差在下一次核对时修正。
+    """
+    existing = {stat.key: stat for stat in db.query(SiteStat).filter(SiteStat.key.in_(_ACTUAL)).all()}
+    drift = {}
+    for key in _ACTUAL:
+        actual = _count_actual(db, key)
+        stat = existing.get(key)
+        if stat is None:
+            drift[key] = (None, actual)
+            db.add(SiteStat(key=key, value=actual))
+        elif stat.value != actual:
+            drift[key] = (stat.value, actual)
+            stat.value = actual
+    db.commit()
+    return drift
+
+
+class StatsReconciler:
+    """定期按实际数据核对统计值，修正访问计数丢失、批量导入等造成的偏差"""
+
+    def __init__(self, session_factory=SessionLocal, interval: int = 3600):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def reconcile(self) -> Dict[str, tuple]:
+        db = self.session_factory()
+        try:
+            drift = rebuild_site_stats(db)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        if drift:
+            logger.warning("全站统计与实际数据不一致，已修正: %s", drift)
+        return drift
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.reconcile()
+            except Exception:
+                logger.exception("全站统计核对失败")
+
+    def start(self):
+        """启动后台定时核对线程"""
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="site-stats-reconciler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台线程"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+
+# 全局统计核对任务
+stats_reconciler = StatsReconciler(interval=settings.site_stats_reconcile_interval)
@@ -0,0 +1,94 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+from jose import ExpiredSignatureError, jwk, jwt
+from jose.backends.base import Key
+from app.config import settings
+
+HMAC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+ASYMMETRIC_ALGORITHMS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+
+
+class TokenCodec:
+    """JWT签发与校验：密钥在启动时解析一次，已校验的令牌按哈希缓存解码结果直到过期
+
+    HS*使用secret_key；RS*/ES*使用PEM私钥签发、公钥校验，只部署公钥的进程只能校验令牌。
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret_key: Optional[str] = None,
+        private_key: Optional[str] = None,
+        public_key: Optional[str] = None,
+        cache_size: int = 4096
+    ):
+        self.algorithm = algorithm
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._verified: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+
+        if algorithm in HMAC_ALGORITHMS:
+            if not secret_key:
+                raise RuntimeError(f"{algorithm}算法需要配置secret_key")
+            self._signing_key: Optional[Key] = jwk.construct(secret_key, algorithm)
+            self._verifying_key: Key = self._signing_key
+        elif algorithm in ASYMMETRIC_ALGORITHMS:
+            if not public_key:
+                raise RuntimeError(f"{algorithm}算法需要配置JWT公钥")
+            self._signing_key = jwk.construct(private_key, algorithm) if private_key else None
+            self._verifying_key = jwk.construct(public_key, algorithm)
+        else:
+            raise RuntimeError(f"不支持的JWT算法: {algorithm}")
+
+    @classmethod
+    def from_settings(cls, config=settings) -> "TokenCodec":
+        def read(path: Optional[str]) -> Optional[str]:
+            return Path(path).read_text() if path else None
+
+        return cls(
+            algorithm=config.algorithm,
+            secret_key=config.secret_key,
+            private_key=read(config.jwt_private_key_file),
+            public_key=read(config.jwt_public_key_file),
+            cache_size=config.jwt_verify_cache_size,
+        )
+
+    def encode(self, claims: dict) -> str:
+        if self._signing_key is None:
+            raise RuntimeError("未配置JWT私钥，无法签发令牌")
+        return jwt.encode(claims, self._signing_key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        """校验令牌并返回声明，失败时抛出JWTError；同一令牌在过期前只做一次签名校验"""
+        digest = hashlib.sha256(token.encode()).digest()
+        now = time.time()
+        with self._lock:
+            item = self._verified.get(digest)
+            if item is not None:
+                claims, expires_at = item
+                if expires_at > now:
+                    self._verified.move_to_end(digest)
+                    return dict(claims)
+                del self._verified[digest]
+                raise ExpiredSignatureError("Signature has expired.")
+
+        claims = jwt.decode(token, self._verifying_key, algorithms=[self.algorithm])
+        # 没有exp的令牌不缓存，避免长期有效
+        if self.cache_size > 0 and "exp" in claims:
+            with self._lock:
+                self._verified[digest] = (claims, float(claims["exp"]))
+                while len(self._verified) > self.cache_size:
+                    self._verified.popitem(last=False)
+        return dict(claims)
+
+    def clear_cache(self):
+        with self._lock:
+            self._verified.clear()
+
+
+# 全局令牌编解码实例，导入时（应用启动时）解析密钥
+token_codec = TokenCodec.from_settings()
@@ -0,0 +1,63 @@
+from typing import List
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+
+def upsert_add(db: Session, table, rows: List[dict], column: str) -> None:
+    """按主键把rows中column的增量累加到已有行，行不存在时插入
+
+    MySQL使用INSERT ... ON DUPLICATE KEY UPDATE，SQLite与PostgreSQL使用INSERT ... ON CONFLICT DO UPDATE，
+    一条语句批量执行；累加而不是覆盖，多个进程各自汇总写入也不会丢失访问次数。
+    """
+    target = table.c[column]
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table)
+        stmt = stmt.on_duplicate_key_update({column: target + stmt.inserted[column]})
+    elif dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(table.primary_key.columns),
+            set_={column: target + stmt.excluded[column]}
+        )
+    else:
+        # 其他数据库逐行先更新，不存在时插入
+        for row in rows:
+            key = [table.c[name] == row[name] for name in table.primary_key.columns.keys()]
+            result = db.execute(table.update().where(*key).values({column: target + row[column]}))
+            if result.rowcount == 0:
+                db.execute(table.insert().values(**row))
+        return
+    db.execute(stmt, rows)
+
+
+def insert_ignore(db: Session, table, row: dict) -> bool:
+    """插入一行，主键已存在时忽略，返回是否插入
+
+    用于按需初始化的计数行：并发的首次写入都发现行不存在时只有一个插入生效，
+    其余在已提交的行上重新执行增量更新，而不是因主键冲突失败。
+    MySQL的INSERT IGNORE与PostgreSQL/SQLite的ON CONFLICT DO NOTHING会等待并发插入同一主键的事务结束。
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = table.insert().prefix_with("IGNORE").values(**row)
+    elif dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table).values(**row).on_conflict_do_nothing(index_elements=list(table.primary_key.columns))
+    else:
+        # 其他数据库在保存点中插入，主键冲突时回滚保存点
+        try:
+            with db.begin_nested():
+                db.execute(table.insert().values(**row))
+        except IntegrityError:
+            return False
+        return True
+    return db.execute(stmt).rowcount > 0
@@ -0,0 +1,120 @@
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterable, Optional, Tuple
+from fastapi import Request, Response
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.core.upserts import insert_ignore
+from app.models.version import ContentVersion
+
+# 版本键：文章（含评论审核）、分类、简历
+POSTS = "posts"
+CATEGORIES = "categories"
+RESUME = "resume"
+
+
+def bump_versions(db: Session, *keys: str) -> None:
+    """在当前事务中递增版本号，由调用方统一提交"""
+    now = datetime.utcnow()
+    for key in keys:
+        stmt = update(ContentVersion)\
+            .where(ContentVersion.key == key)\
+            .values(version=ContentVersion.version + 1, updated_at=now)
+        if db.execute(stmt).rowcount == 0:
+            # 版本行不存在时插入；并发的首次写入已插入该行时改为递增
+            row = {"key": key, "version": 1, "updated_at": now}
+            if not insert_ignore(db, ContentVersion.__table__, row):
+                db.execute(stmt)
+
+
+def get_versions(db: Session, keys: Iterable[str]) -> Dict[str, Tuple[int, Optional[datetime]]]:
+    """读取版本号及最后修改时间，不存在的键视为版本0"""
+    keys = list(keys)
+    rows = db.query(ContentVersion.key, ContentVersion.version, ContentVersion.updated_at)\
+             .filter(ContentVersion.key.in_(keys))\
+             .all()
+    versions = {key: (0, None) for key in keys}
+    versions.update({row.key: (row.version, row.updated_at) for row in rows})
+    return versions
+
+
+@dataclass
+class Validators:
+    """HTTP缓存校验器"""
+    etag: str
+    last_modified: Optional[datetime] = None
+    # 计算校验器时读到的版本号，缓存条目据此判断是否仍是最新内容
+    versions: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.last_modified:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def not_modified_response(self) -> Response:
+        return Response(status_code=304, headers=self.headers)
+
+
+def compute_validators(db: Session, scope: str, keys: Iterable[str]) -> Validators:
+    """根据版本号计算校验器（一次主键查询），不需要查询或序列化响应内容
+
+    响应中的访问次数会滞后于实际值，内容只是语义等价而非逐字节相同，因此使用弱ETag。
+    """
+    return make_validators(scope, get_versions(db, keys))
+
+
+def make_validators(
+    scope: str,
+    versions: Dict[str, Tuple[int, Optional[datetime]]],
+    weak: bool = True
+) -> Validators:
+    """由已读取的版本号生成校验器，同一版本的响应逐字节相同时可使用强ETag"""
+    digest = hashlib.sha1(scope.encode())
+    for key in sorted(versions):
+        digest.update(f"|{key}:{versions[key][0]}".encode())
+
+    timestamps = [updated_at for _, updated_at in versions.values() if updated_at]
+    last_modified = max(timestamps).replace(tzinfo=timezone.utc, microsecond=0) if timestamps else None
+    etag = f'"{digest.hexdigest()[:20]}"'
+    return Validators(
+        etag=f"W/{etag}" if weak else etag,
+        last_modified=last_modified,
+        versions={key: version for key, (version, _) in versions.items()}
+    )
+
+
+def validators_from_headers(headers) -> Optional[Validators]:
+    """从缓存条目保存的响应头恢复校验器"""
+    if "ETag" not in headers:
+        return None
+    last_modified = headers.get("Last-Modified")
+    return Validators(
+        etag=headers["ETag"],
+        last_modified=parsedate_to_datetime(last_modified) if last_modified else None
+    )
+
+
+def is_not_modified(request: Request, validators: Validators) -> bool:
+    """判断条件请求是否可以直接返回304，If-None-Match优先于If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # 弱比较：忽略W/前缀
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return validators.etag.removeprefix("W/") in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and validators.last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return validators.last_modified <= since
+    return False
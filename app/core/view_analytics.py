@@ -0,0 +1,298 @@
+import heapq
+import logging
+import threading
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from sqlalchemy import Date, Integer, bindparam, func, select, tuple_, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.core.upserts import upsert_add
+from app.models.analytics import PostDailyView, PostCumulativeView, PostViewTotal
+from app.models.blog import BlogPost
+
+logger = logging.getLogger(__name__)
+
+# 访问来源分类
+DIRECT = "direct"
+INTERNAL = "internal"
+SEARCH = "search"
+SOCIAL = "social"
+OTHER = "other"
+REFERRERS = (DIRECT, INTERNAL, SEARCH, SOCIAL, OTHER)
+
+# 全站合计行的post_id
+SITE_TOTAL = 0
+
+# 不超过该天数的日期范围直接汇总每日访问量排序，更长的范围按累计访问量查找
+DIRECT_TRENDING_MAX_DAYS = 7
+# 长范围热门文章每次读取的候选文章数
+TRENDING_CHUNK_SIZE = 100
+
+# 搜索引擎与社交网站的域名（含子域名）
+SEARCH_DOMAINS = (
+    "bing.com", "baidu.com", "sogou.com", "so.com", "sm.cn", "duckduckgo.com", "yandex.ru", "yandex.com",
+    "search.yahoo.com",
+)
+SOCIAL_DOMAINS = (
+    "twitter.com", "x.com", "t.co", "facebook.com", "weibo.com", "weibo.cn", "zhihu.com", "douban.com",
+    "reddit.com", "linkedin.com", "news.ycombinator.com", "v2ex.com", "weixin.qq.com", "juejin.cn",
+)
+
+ViewKey = Tuple[int, date, str]
+
+
+def _matches(host: str, domains: tuple) -> bool:
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+def referrer_bucket(referrer: Optional[str], host: Optional[str] = None) -> str:
+    """按Referer请求头归类访问来源，host为本站域名"""
+    if not referrer:
+        return DIRECT
+    referrer_host = (urlsplit(referrer).hostname or "").lower()
+    if not referrer_host:
+        return OTHER
+    if host and referrer_host == host.lower():
+        return INTERNAL
+    # Google的国家与地区域名很多，按域名中的google标签识别
+    if "google" in referrer_host.split(".") or _matches(referrer_host, SEARCH_DOMAINS):
+        return SEARCH
+    if _matches(referrer_host, SOCIAL_DOMAINS):
+        return SOCIAL
+    return OTHER
+
+
+def upsert_daily_views(db: Session, rows: List[dict]) -> None:
+    """把(文章, 日期, 来源)的访问增量累加到post_daily_views，行不存在时插入"""
+    upsert_add(db, PostDailyView.__table__, rows, "views")
+
+
+def update_rollups(db: Session, deltas: Dict[Tuple[int, date], int]) -> None:
+    """把(文章, 日期)的访问增量计入累计访问量与文章总访问量"""
+    if not deltas:
+        return
+    table = PostCumulativeView.__table__
+    post_id, day, delta = bindparam("_post_id", type_=Integer), bindparam("_day", type_=Date), bindparam("_delta")
+    params = [
+        {"_post_id": post_id_, "_day": day_, "_delta": delta_}
+        for (post_id_, day_), delta_ in sorted(deltas.items())
+    ]
+
+    # 之后日期的累计值一并增加（只有跨天后补写前一天的访问时才有这样的行）
+    db.execute(
+        update(table).where(table.c.post_id == post_id, table.c.day > day).values(total=table.c.total + delta),
+        params
+    )
+    # 当天的行不存在时由之前最近一天的累计值加上增量得到；累计值随日期单调不减，之前的最大值即最近一天的值
+    previous = select(post_id, day, func.coalesce(func.max(table.c.total), 0) + delta)\
+        .where(table.c.post_id == post_id, table.c.day < day)
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).from_select(["post_id", "day", "total"], previous)
+        stmt = stmt.on_duplicate_key_update(total=table.c.total + delta)
+    elif dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table).from_select(["post_id", "day", "total"], previous)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.post_id, table.c.day], set_={"total": table.c.total + delta}
+        )
+    else:
+        for row in params:
+            result = db.execute(
+                update(table).where(table.c.post_id == post_id, table.c.day == day)
+                .values(total=table.c.total + delta), row
+            )
+            if result.rowcount == 0:
+                db.execute(table.insert().from_select(["post_id", "day", "total"], previous), row)
+        stmt = None
+    if stmt is not None:
+        db.execute(stmt, params)
+
+    totals: Counter = Counter()
+    for (post_id_, _), delta_ in deltas.items():
+        totals[post_id_] += delta_
+    upsert_add(db, PostViewTotal.__table__, [
+        {"post_id": post_id_, "total": total} for post_id_, total in sorted(totals.items())
+    ], "total")
+
+
+def delete_post_views(db: Session, post_id: int) -> None:
+    """删除文章的每日、累计与总访问量，全站合计保留；由调用方提交"""
+    for model in (PostDailyView, PostCumulativeView, PostViewTotal):
+        db.query(model).filter(model.post_id == post_id).delete(synchronize_session=False)
+
+
+def _cumulative_at(day: date):
+    """文章截至day（含）的累计访问量，按(post_id, day)主键定位到最近一行"""
+    return select(PostCumulativeView.total)\
+        .where(PostCumulativeView.post_id == PostViewTotal.post_id, PostCumulativeView.day <= day)\
+        .order_by(PostCumulativeView.day.desc())\
+        .limit(1)\
+        .scalar_subquery()
+
+
+def _rank_key(item: Tuple[int, int]) -> tuple:
+    return -item[1], item[0]
+
+
+def trending_posts(db: Session, start: date, end: date, limit: int = 10) -> List[Tuple[int, int]]:
+    """返回日期范围内（含首尾）访问量最高的现存文章(post_id, 访问量)
+
+    短范围直接汇总每日访问量。长范围按文章总访问量从高到低分批读取候选文章，
+    用两次主键定位的累计值之差得到范围内的访问量；总访问量是范围内访问量的上界，
+    剩余候选的总访问量低于当前第limit名时即可停止，访问量集中在少数文章时只需读取前几批。
+    """
+    if (end - start).days + 1 <= DIRECT_TRENDING_MAX_DAYS:
+        views = func.sum(PostDailyView.views).label("views")
+        grouped = select(PostDailyView.post_id, views)\
+            .where(PostDailyView.day.between(start, end), PostDailyView.post_id != SITE_TOTAL)\
+            .group_by(PostDailyView.post_id)\
+            .subquery()
+        stmt = select(grouped.c.post_id, grouped.c.views)\
+            .join(BlogPost, BlogPost.id == grouped.c.post_id)\
+            .order_by(grouped.c.views.desc(), grouped.c.post_id)\
+            .limit(limit)
+        return [tuple(row) for row in db.execute(stmt)]
+
+    window = func.coalesce(_cumulative_at(end), 0) - func.coalesce(_cumulative_at(start - timedelta(days=1)), 0)
+    candidates = select(PostViewTotal.post_id, PostViewTotal.total, window)\
+        .join(BlogPost, BlogPost.id == PostViewTotal.post_id)\
+        .where(PostViewTotal.total > 0)\
+        .order_by(PostViewTotal.total.desc(), PostViewTotal.post_id.desc())\
+        .limit(TRENDING_CHUNK_SIZE)
+
+    top: List[Tuple[int, int]] = []  # (访问量, -post_id)的小顶堆，堆顶是当前第limit名
+    last = None
+    while True:
+        stmt = candidates if last is None else candidates.where(
+            tuple_(PostViewTotal.total, PostViewTotal.post_id) < last
+        )
+        rows = db.execute(stmt).all()
+        for post_id, total, views in rows:
+            if len(top) == limit and total < top[0][0]:
+                return sorted(((-neg_id, v) for v, neg_id in top), key=_rank_key)
+            if views > 0:
+                item = (views, -post_id)
+                if len(top) < limit:
+                    heapq.heappush(top, item)
+                elif item > top[0]:
+                    heapq.heapreplace(top, item)
+        if len(rows) < TRENDING_CHUNK_SIZE:
+            return sorted(((-neg_id, v) for v, neg_id in top), key=_rank_key)
+        last = tuple(rows[-1][:2])
+
+
+def daily_views(db: Session, start: date, end: date, post_id: int = SITE_TOTAL) -> List[dict]:
+    """返回文章（默认全站）在日期范围内每天的访问量与来源分布，没有访问的日期补0"""
+    # 不经过ORM构造结果行，一年的全站数据约1800行
+    rows = db.execute(
+        select(PostDailyView.day, PostDailyView.referrer, PostDailyView.views)
+        .where(PostDailyView.post_id == post_id, PostDailyView.day.between(start, end))
+    )
+    by_day: Dict[date, Dict[str, int]] = {}
+    for day, referrer, views in rows:
+        by_day.setdefault(day, {})[referrer] = views
+
+    series = []
+    day = start
+    while day <= end:
+        referrers = by_day.get(day, {})
+        series.append({"day": day, "views": sum(referrers.values()), "referrers": referrers})
+        day += timedelta(days=1)
+    return series
+
+
+class ViewAnalytics:
+    """文章访问明细的内存聚合：每次访问只在进程内累加(文章, 日期, 来源)的计数，定期汇总写入post_daily_views"""
+
+    def __init__(self, session_factory=SessionLocal, interval: int = 60):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, post_id: int, referrer: Optional[str] = None, host: Optional[str] = None,
+               day: Optional[date] = None):
+        """记录一次文章访问"""
+        key = (post_id, day or date.today(), referrer_bucket(referrer, host))
+        with self._lock:
+            self._pending[key] += 1
+
+    def _add(self, pending: Dict[ViewKey, int]):
+        with self._lock:
+            self._pending.update(pending)
+
+    def drain(self) -> Dict[ViewKey, int]:
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        return dict(pending)
+
+    def flush(self) -> int:
+        """把聚合的访问次数连同全站合计、累计访问量在一个事务中写入数据库，返回写入的(文章, 日期, 来源)数"""
+        pending = self.drain()
+        if not pending:
+            return 0
+
+        totals: Counter = Counter()
+        for (post_id, day, referrer), views in pending.items():
+            totals[(SITE_TOTAL, day, referrer)] += views
+        rows = [
+            {"post_id": post_id, "day": day, "referrer": referrer, "views": views}
+            # 按主键顺序写入，多个进程同时写回时加锁顺序一致
+            for (post_id, day, referrer), views in sorted({**pending, **totals}.items())
+        ]
+
+        by_post: Counter = Counter()
+        for (post_id, day, _), views in pending.items():
+            by_post[(post_id, day)] += views
+
+        db = self.session_factory()
+        try:
+            upsert_daily_views(db, rows)
+            update_rollups(db, by_post)
+            db.commit()
+        except Exception:
+            db.rollback()
+            # 写入失败时放回内存，等待下一次汇总
+            self._add(pending)
+            raise
+        finally:
+            db.close()
+
+        return len(pending)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("文章访问统计汇总失败")
+
+    def start(self):
+        """启动后台定时汇总线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="view-analytics-rollup", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台线程并写入剩余的访问次数"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+# 全局文章访问统计聚合实例
+view_analytics = ViewAnalytics(interval=settings.view_analytics_flush_interval)
@@ -0,0 +1,134 @@
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Optional
+from sqlalchemy import bindparam, update
+from app.config import settings
+from app.database import SessionLocal
+from app.core.async_routes import run_blocking
+from app.core.site_stats import TOTAL_VIEWS, adjust_stats
+from app.models.blog import BlogPost
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryViewStore:
+    """进程内的访问计数暂存"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[int, int] = defaultdict(int)
+
+    def incr(self, post_id: int, amount: int = 1) -> int:
+        with self._lock:
+            self._pending[post_id] += amount
+            return self._pending[post_id]
+
+    def drain(self) -> Dict[int, int]:
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+        return dict(pending)
+
+
+class RedisViewStore:
+    """基于Redis哈希的访问计数暂存，多个进程共享"""
+
+    key = "myblog:view_counts"
+
+    def __init__(self, redis_url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("使用redis访问计数需要安装redis包") from e
+        self._client = redis.Redis.from_url(redis_url)
+
+    def incr(self, post_id: int, amount: int = 1) -> int:
+        return run_blocking(self._client.hincrby, self.key, post_id, amount)
+
+    def drain(self) -> Dict[int, int]:
+        pipe = self._client.pipeline(transaction=True)
+        pipe.hgetall(self.key)
+        pipe.delete(self.key)
+        pending, _ = pipe.execute()
+        return {int(post_id): int(count) for post_id, count in pending.items()}
+
+
+class ViewCountBuffer:
+    """访问计数写缓冲：汇总访问次数并定期批量写回blog_posts.view_count"""
+
+    def __init__(self, store, session_factory=SessionLocal, interval: int = 5):
+        self.store = store
+        self.session_factory = session_factory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, post_id: int) -> int:
+        """记录一次访问，返回该文章尚未写回的访问次数"""
+        return self.store.incr(post_id)
+
+    def flush(self) -> int:
+        """把暂存的访问次数批量写回数据库，返回写回的文章数"""
+        pending = self.store.drain()
+        if not pending:
+            return 0
+
+        table = BlogPost.__table__
+        # 显式保留updated_at，访问计数不应算作文章内容修改
+        stmt = update(table)\
+            .where(table.c.id == bindparam("_post_id"))\
+            .values(view_count=table.c.view_count + bindparam("_delta"), updated_at=table.c.updated_at)
+
+        db = self.session_factory()
+        try:
+            db.execute(stmt, [
+                {"_post_id": post_id, "_delta": delta}
+                for post_id, delta in pending.items()
+            ])
+            adjust_stats(db, {TOTAL_VIEWS: sum(pending.values())})
+            db.commit()
+        except Exception:
+            db.rollback()
+            # 写回失败时放回暂存，等待下一次刷新
+            for post_id, delta in pending.items():
+                self.store.incr(post_id, delta)
+            raise
+        finally:
+            db.close()
+
+        return len(pending)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("访问计数写回失败")
+
+    def start(self):
+        """启动后台定时刷新线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="view-count-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台线程并写回剩余的访问次数"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+def _create_store():
+    if settings.view_count_backend == "redis":
+        if not settings.redis_url:
+            raise RuntimeError("view_count_backend为redis时必须配置redis_url")
+        return RedisViewStore(settings.redis_url)
+    return MemoryViewStore()
+
+
+# 全局访问计数缓冲实例
+view_counter = ViewCountBuffer(_create_store(), interval=settings.view_count_flush_interval)
@@ -1,20 +1,91 @@
+from typing import List
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from app.config import settings
+from app.utils.pool_metrics import instrumented_pool_class
+from app.utils.replicas import PRIMARY_PIN_COOKIE, QueryCounter, ReplicaSet
+
+
+def pool_options(url: str, name: str, async_engine: bool = False) -> dict:
+    """按配置生成连接池参数，连接池以name上报指标；内存SQLite只有单个连接，不适用"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": instrumented_pool_class(name, async_engine),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_use_lifo": settings.db_pool_use_lifo,
+    }
+
 
 # 创建数据库引擎
 engine = create_engine(
     settings.database_url,
-    pool_pre_ping=True,
-    pool_recycle=300,
     echo=settings.debug,
+    **pool_options(settings.database_url, "primary"),
 )
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 按目标库统计SQL语句数
+query_counter = QueryCounter()
+query_counter.watch(engine, "primary")
+
+# 只读从库，未配置时所有读写都使用主库
+replica_set = ReplicaSet(check_interval=settings.replica_health_check_interval)
+
+
+def configure_replicas(urls: List[str]):
+    """按连接串（重新）创建从库引擎，传入空列表即停用从库"""
+    engines = {}
+    for index, url in enumerate(urls):
+        name = f"replica{index}"
+        engines[name] = create_engine(url, echo=settings.debug, **pool_options(url, name))
+        query_counter.watch(engines[name], name)
+    replica_set.configure(engines)
+
+
+configure_replicas(settings.database_replica_urls)
+
+# 同步驱动对应的异步驱动
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """把同步驱动的连接串换成对应的异步驱动，已是异步驱动时原样返回"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def create_async_db_engine(url: str = None, **kwargs):
+    """创建异步数据库引擎，指定poolclass时不使用配置的连接池参数"""
+    url = get_async_database_url(url or settings.async_database_url or settings.database_url)
+    options = {} if "poolclass" in kwargs else pool_options(url, "async", async_engine=True)
+    return create_async_engine(url, echo=settings.debug, **options, **kwargs)
+
+
+# 异步引擎只在启用异步栈时创建，未安装异步驱动也不影响同步栈
+async_engine = create_async_db_engine() if settings.database_async else None
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=True)
+
 # 创建基础模型类
 Base = declarative_base()
 
@@ -28,6 +99,30 @@ def get_db():
         db.close()
 
 
+def get_read_db(request: Request):
+    """获取只读数据库会话：轮询使用健康的从库，没有可用从库或客户端刚写入过数据时使用主库"""
+    target = None
+    if PRIMARY_PIN_COOKIE not in request.cookies:
+        target = replica_set.choose()
+    db = SessionLocal(bind=target) if target is not None else SessionLocal()
+    db.info["replica"] = target is not None
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def is_replica(db) -> bool:
+    """会话是否连接到从库，从库会话不能用于写操作"""
+    return db.info.get("replica", False)
+
+
+async def get_async_db():
+    """获取异步数据库会话"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def create_tables():
     """创建所有数据表"""
     Base.metadata.create_all(bind=engine)
@@ -1,8 +1,26 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy.engine import Engine
 from app.config import settings
-from app.api import auth_router, blog_router, resume_router, admin_router
+from app.api import (
+    auth_router, blog_router, resume_router, admin_router,
+    async_blog_router, async_resume_router, async_admin_router
+)
+from app.database import async_engine, replica_set
+from app.core.view_counter import view_counter
+from app.core.comment_queue import comment_queue
+from app.core.site_stats import stats_reconciler
+from app.core.view_analytics import view_analytics
+from app.core.search import search_index
+from app.core.hashing import password_hasher
+from app.utils.request_context import RequestContextMiddleware
+from app.utils.replicas import ReadAfterWriteMiddleware
+from app.utils.metrics import CONTENT_TYPE, MetricsMiddleware, registry, track_queries
+from app.utils.profiling import ProfilingMiddleware, SQLProfiler
+from app.utils.compression import CompressionMiddleware, compressor
+from app.utils.index_advisor import IndexAdvisor
 
 # 创建FastAPI应用实例
 app = FastAPI(
@@ -22,14 +40,80 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 记录当前请求，供连接池等指标按接口归类
+app.add_middleware(RequestContextMiddleware)
+
+# 配置了从库时，写请求后短时间内该客户端的读请求走主库
+app.add_middleware(ReadAfterWriteMiddleware, replicas=replica_set, window=settings.replica_lag_window)
+
+# 响应压缩；缓存的响应已带预压缩结果，直接转发
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware, compressor=compressor)
+
+# 请求与SQL指标，放在最外层以覆盖其他中间件的耗时
+if settings.metrics_enabled:
+    track_queries(Engine)
+    app.add_middleware(MetricsMiddleware)
+
+# SQL分析模式：替代debug时引擎的echo输出，适合在生产环境短时开启
+if settings.sql_profiling:
+    sql_profiler = SQLProfiler(settings.slow_query_ms, settings.sql_repeat_threshold)
+    sql_profiler.install(Engine)
+    app.add_middleware(ProfilingMiddleware, profiler=sql_profiler)
+
+# 索引分析模式：在测试或压测时开启，找出全表扫描与filesort
+if settings.index_advisor_report:
+    IndexAdvisor(settings.index_advisor_report).install(Engine)
+
 # 挂载静态文件目录
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# 注册API路由
+# 注册API路由，启用异步栈时博客/简历/管理路由使用异步引擎
 app.include_router(auth_router)
-app.include_router(blog_router)
-app.include_router(resume_router)
-app.include_router(admin_router)
+if settings.database_async:
+    app.include_router(async_blog_router)
+    app.include_router(async_resume_router)
+    app.include_router(async_admin_router)
+else:
+    app.include_router(blog_router)
+    app.include_router(resume_router)
+    app.include_router(admin_router)
+
+
+@app.on_event("startup")
+def start_background_tasks():
+    """启动后台任务"""
+    # 先于后台线程创建密码校验进程池
+    password_hasher.start()
+    if settings.view_count_buffer:
+        view_counter.start()
+    if settings.view_analytics_enabled:
+        view_analytics.start()
+    if settings.comment_queue_enabled:
+        comment_queue.start()
+    stats_reconciler.start()
+    search_index.start()
+
+
+@app.on_event("shutdown")
+def stop_background_tasks():
+    """停止后台任务并写回缓冲数据"""
+    if settings.view_count_buffer:
+        view_counter.stop()
+    if settings.view_analytics_enabled:
+        view_analytics.stop()
+    if settings.comment_queue_enabled:
+        comment_queue.stop()
+    stats_reconciler.stop()
+    search_index.stop()
+    password_hasher.shutdown()
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    """关闭异步引擎的连接池"""
+    if async_engine is not None:
+        await async_engine.dispose()
 
 
 @app.get("/")
@@ -47,6 +131,12 @@ async def health_check():
     return {"status": "healthy", "version": settings.version}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus文本格式的指标"""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=settings.debug)
\ No newline at end of file
@@ -1,17 +1,27 @@
 from .user import User
-from .blog import BlogCategory, BlogPost, Comment
-from .resume import ResumeSection, SectionType, PersonalInfo, Education, Experience
+from .blog import BlogCategory, BlogPost, Comment, BlogPostCounter
+from .resume import ResumeSection, SectionType, PersonalInfo, Education, Experience, ResumeSnapshot
 from .message import Message
+from .version import ContentVersion
+from .stats import SiteStat
+from .analytics import PostDailyView, PostCumulativeView, PostViewTotal
 
 __all__ = [
     "User",
     "BlogCategory", 
     "BlogPost", 
     "Comment",
+    "BlogPostCounter",
     "ResumeSection", 
     "SectionType",
     "PersonalInfo",
     "Education",
     "Experience",
-    "Message"
+    "ResumeSnapshot",
+    "Message",
+    "ContentVersion",
+    "SiteStat",
+    "PostDailyView",
+    "PostCumulativeView",
+    "PostViewTotal"
 ]
\ No newline at end of file
@@ -0,0 +1,53 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Date, Index
+from app.database import Base
+
+
+class PostDailyView(Base):
+    """文章每日访问量，按访问来源分类汇总；post_id为0的行是当天全站合计"""
+    __tablename__ = "post_daily_views"
+
+    post_id = Column(Integer, primary_key=True, autoincrement=False)
+    day = Column(Date, primary_key=True)
+    referrer = Column(String(16), primary_key=True)
+    views = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # 热门文章：按日期范围筛选后只读索引即可按文章汇总访问量
+        Index("ix_post_daily_views_day_post_id_views", "day", "post_id", "views"),
+        # SQLite上与InnoDB一样按主键聚簇存储，单篇文章的每日访问量是一段连续的主键范围
+        {"sqlite_with_rowid": False},
+    )
+
+    def __repr__(self):
+        return f"<PostDailyView(post_id={self.post_id}, day={self.day}, referrer='{self.referrer}', views={self.views})>"
+
+
+class PostCumulativeView(Base):
+    """文章截至某天（含）的累计访问量，只在有访问的日期有行；两个日期的累计值之差即为期间的访问量"""
+    __tablename__ = "post_cumulative_views"
+
+    post_id = Column(Integer, primary_key=True, autoincrement=False)
+    day = Column(Date, primary_key=True)
+    total = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        {"sqlite_with_rowid": False},
+    )
+
+    def __repr__(self):
+        return f"<PostCumulativeView(post_id={self.post_id}, day={self.day}, total={self.total})>"
+
+
+class PostViewTotal(Base):
+    """文章在访问统计中的累计访问量，是任意日期范围内访问量的上界，长范围热门文章按它从高到低查找"""
+    __tablename__ = "post_view_totals"
+
+    post_id = Column(Integer, primary_key=True, autoincrement=False)
+    total = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_post_view_totals_total_post_id", "total", "post_id"),
+    )
+
+    def __repr__(self):
+        return f"<PostViewTotal(post_id={self.post_id}, total={self.total})>"
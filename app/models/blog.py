@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from app.database import Base
 
 
@@ -28,11 +28,12 @@ class BlogPost(Base):
     title = Column(String(200), nullable=False)
     slug = Column(String(200), unique=True, index=True, nullable=False)
     summary = Column(Text)
-    content = Column(Text, nullable=False)
+    # 正文可能很大，默认延迟加载，只有详情等确实需要正文的查询才取出
+    content = deferred(Column(Text, nullable=False))
     category_id = Column(Integer, ForeignKey("blog_categories.id"))
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     featured_image = Column(String(500))
-    is_published = Column(Boolean, default=False, index=True)
+    is_published = Column(Boolean, default=False)
     view_count = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -43,6 +44,14 @@ class BlogPost(Base):
     author = relationship("User")
     comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # 游标分页的(published_at, id)定位索引
+        Index("ix_blog_posts_published_at_id", "published_at", "id"),
+        # 已发布文章列表（可按分类）按发布时间排序，以及按分类统计已发布文章数；id由主键隐式附加在索引末尾
+        Index("ix_blog_posts_is_published_published_at", "is_published", "published_at"),
+        Index("ix_blog_posts_is_published_category_id_published_at", "is_published", "category_id", "published_at"),
+    )
+
     def __repr__(self):
         return f"<BlogPost(id={self.id}, title='{self.title}')>"
 
@@ -55,7 +64,7 @@ class Comment(Base):
     author_name = Column(String(100), nullable=False)
     author_email = Column(String(100), nullable=False)
     content = Column(Text, nullable=False)
-    is_approved = Column(Boolean, default=False, index=True)
+    is_approved = Column(Boolean, default=False)
     ip_address = Column(String(45))
     user_agent = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -63,5 +72,24 @@ class Comment(Base):
     # 关系
     post = relationship("BlogPost", back_populates="comments")
 
+    __table_args__ = (
+        # 文章的已审批评论按时间倒序
+        Index("ix_comments_post_id_is_approved_created_at", "post_id", "is_approved", "created_at"),
+        # 待审批评论列表
+        Index("ix_comments_is_approved_created_at", "is_approved", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<Comment(id={self.id}, author='{self.author_name}')>"
+
+
+class BlogPostCounter(Base):
+    """已发布文章计数，category_id为0表示全部文章"""
+    __tablename__ = "blog_post_counters"
+
+    category_id = Column(Integer, primary_key=True, autoincrement=False)
+    published_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
     def __repr__(self):
-        return f"<Comment(id={self.id}, author='{self.author_name}')>"
\ No newline at end of file
+        return f"<BlogPostCounter(category_id={self.category_id}, published_count={self.published_count})>"
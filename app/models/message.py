@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -11,9 +11,15 @@ class Message(Base):
     email = Column(String(100), nullable=False)
     subject = Column(String(200))
     content = Column(Text, nullable=False)
-    is_read = Column(Boolean, default=False, index=True)
+    is_read = Column(Boolean, default=False)
     ip_address = Column(String(45))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # 未读留言按时间倒序，以及全部留言按时间倒序
+        Index("ix_messages_is_read_created_at", "is_read", "created_at"),
+        Index("ix_messages_created_at", "created_at"),
+    )
+
     def __repr__(self):
         return f"<Message(id={self.id}, name='{self.name}', subject='{self.subject}')>"
\ No newline at end of file
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Enum
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -84,4 +85,17 @@ class ResumeSection(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     def __repr__(self):
-        return f"<ResumeSection(id={self.id}, type='{self.section_type.value}', title='{self.title}')>"
\ No newline at end of file
+        return f"<ResumeSection(id={self.id}, type='{self.section_type.value}', title='{self.title}')>"
+
+
+class ResumeSnapshot(Base):
+    """简历快照：序列化后的完整简历JSON，简历写操作提交时按版本号重建"""
+    __tablename__ = "resume_snapshots"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(Integer, nullable=False)
+    data = Column(Text().with_variant(MEDIUMTEXT(), "mysql"), nullable=False)
+    built_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<ResumeSnapshot(id={self.id}, version={self.version})>"
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, BigInteger, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class SiteStat(Base):
+    """全站统计值（文章、评论、留言总数与总访问量），写操作时增量维护，定期与实际数据核对"""
+    __tablename__ = "site_stats"
+
+    key = Column(String(50), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<SiteStat(key='{self.key}', value={self.value})>"
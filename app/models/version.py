@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ContentVersion(Base):
+    """内容版本号，写操作提交时递增，用于生成HTTP缓存校验器"""
+    __tablename__ = "content_versions"
+
+    key = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<ContentVersion(key='{self.key}', version={self.version})>"
@@ -1,8 +1,9 @@
 from .user import User, UserCreate, UserUpdate, UserLogin, Token, TokenData
 from .blog import (
-    BlogCategory, BlogCategoryCreate, BlogCategoryUpdate,
+    BlogCategory, BlogCategoryCreate, BlogCategoryUpdate, BlogCategoryList,
     BlogPost, BlogPostList, BlogPostCreate, BlogPostUpdate, BlogPostWithComments,
-    Comment, CommentCreate, PaginatedResponse
+    Comment, CommentCreate, PaginatedResponse, CursorPaginatedResponse,
+    SearchHit, SearchResponse
 )
 from .resume import (
     ResumeSection, ResumeSectionCreate, ResumeSectionUpdate, ResumeData,
@@ -12,9 +13,10 @@ from .message import Message, MessageCreate
 
 __all__ = [
     "User", "UserCreate", "UserUpdate", "UserLogin", "Token", "TokenData",
-    "BlogCategory", "BlogCategoryCreate", "BlogCategoryUpdate",
+    "BlogCategory", "BlogCategoryCreate", "BlogCategoryUpdate", "BlogCategoryList",
     "BlogPost", "BlogPostList", "BlogPostCreate", "BlogPostUpdate", "BlogPostWithComments",
-    "Comment", "CommentCreate", "PaginatedResponse",
+    "Comment", "CommentCreate", "PaginatedResponse", "CursorPaginatedResponse",
+    "SearchHit", "SearchResponse",
     "ResumeSection", "ResumeSectionCreate", "ResumeSectionUpdate", "ResumeData",
     "PersonalInfo", "PersonalInfoCreate", "PersonalInfoUpdate",
     "Message", "MessageCreate"
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import Optional, List
+from pydantic import BaseModel, Field, RootModel
+from datetime import date, datetime
+from typing import Dict, Literal, Optional, List
 
 
 class BlogCategoryBase(BaseModel):
@@ -29,6 +29,10 @@ class BlogCategory(BlogCategoryBase):
         from_attributes = True
 
 
+class BlogCategoryList(RootModel[List[BlogCategory]]):
+    pass
+
+
 class BlogPostBase(BaseModel):
     title: str
     slug: Optional[str] = None
@@ -95,6 +99,56 @@ class Comment(CommentBase):
         from_attributes = True
 
 
+class CommentTicket(BaseModel):
+    """评论已进入写入队列"""
+    ticket: str
+    status: str = "queued"
+
+
+class CommentBulkIds(BaseModel):
+    """按ID批量审核评论"""
+    ids: List[int] = Field(..., min_length=1, max_length=10000)
+
+
+class CommentBulkFilter(BaseModel):
+    """按条件批量审核评论，条件之间为“且”关系"""
+    action: Literal["approve", "delete"]
+    author_email: Optional[str] = None
+    post_id: Optional[int] = None
+    is_approved: Optional[bool] = None
+    older_than_days: Optional[int] = Field(None, ge=0, description="只处理创建时间早于该天数的评论")
+
+
+class CommentBulkResult(BaseModel):
+    affected: int
+    posts: int
+
+
+class TrendingPost(BaseModel):
+    post: BlogPostList
+    views: int
+
+
+class TrendingPosts(BaseModel):
+    start: date
+    end: date
+    items: List[TrendingPost]
+
+
+class DailyViews(BaseModel):
+    day: date
+    views: int
+    referrers: Dict[str, int]
+
+
+class DailyViewSeries(BaseModel):
+    post_id: Optional[int] = None
+    start: date
+    end: date
+    total: int
+    series: List[DailyViews]
+
+
 class BlogPostWithComments(BlogPost):
     comments: List[Comment] = []
 
@@ -104,4 +158,26 @@ class PaginatedResponse(BaseModel):
     total: int
     page: int
     size: int
-    pages: int
\ No newline at end of file
+    pages: int
+
+
+class CursorPaginatedResponse(BaseModel):
+    items: List[BlogPostList]
+    size: int
+    next_cursor: Optional[str] = None
+
+
+
+class SearchHit(BaseModel):
+    post: BlogPostList
+    score: float
+    title_highlight: str
+    snippet: str
+
+
+class SearchResponse(BaseModel):
+    items: List[SearchHit]
+    total: int
+    page: int
+    size: int
+    pages: int
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""索引分析脚本：汇总INDEX_ADVISOR_REPORT生成的执行计划报告，列出全表扫描与filesort的查询
+
+用法:
+  python -m app.scripts.index_advisor --pytest [-- pytest参数]  # 以索引分析模式运行测试并汇总
+  python -m benchmarks.bench_load --env INDEX_ADVISOR_REPORT=load.json
+  python -m app.scripts.index_advisor load.json [--all]    # 汇总已有报告（可指定多个）
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+
+def load_reports(paths):
+    """合并多个报告中相同语句模板的执行次数与来源接口"""
+    merged = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for plan in json.load(f):
+                existing = merged.setdefault(plan["statement"], dict(plan, executions=0, endpoints=[]))
+                existing["executions"] += plan["executions"]
+                existing["endpoints"] += [e for e in plan["endpoints"] if e not in existing["endpoints"]]
+    return sorted(merged.values(), key=lambda plan: plan["executions"], reverse=True)
+
+
+def run_pytest(report_path: str, pytest_args) -> int:
+    env = dict(os.environ, INDEX_ADVISOR_REPORT=report_path)
+    return subprocess.call([sys.executable, "-m", "pytest", "-q", *pytest_args], env=env)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="汇总执行计划，列出缺少索引的查询")
+    parser.add_argument("reports", nargs="*", help="INDEX_ADVISOR_REPORT写出的报告")
+    parser.add_argument("--pytest", action="store_true", help="先以索引分析模式运行测试")
+    parser.add_argument("--all", action="store_true", help="同时列出没有问题的语句")
+    argv = sys.argv[1:]
+    pytest_args = []
+    if "--" in argv:
+        argv, pytest_args = argv[:argv.index("--")], argv[argv.index("--") + 1:]
+    args = parser.parse_args(argv)
+
+    reports = list(args.reports)
+    if args.pytest:
+        fd, path = tempfile.mkstemp(prefix="index-advisor-", suffix=".json")
+        os.close(fd)
+        if run_pytest(path, pytest_args) != 0:
+            print("测试未全部通过，报告可能不完整")
+        reports.append(path)
+    if not reports:
+        parser.error("需要指定报告文件或--pytest")
+
+    plans = load_reports(reports)
+    flagged = [plan for plan in plans if plan["issues"]]
+    print(f"\n=== 索引分析：{len(plans)} 种语句，{len(flagged)} 种存在问题 ===")
+    for plan in plans if args.all else flagged:
+        print(f"\n[{plan['executions']}次] {plan['statement']}")
+        print(f"  接口: {', '.join(plan['endpoints'])}")
+        for line in plan["plan"]:
+            print(f"  计划: {line}")
+        for issue in plan["issues"]:
+            print(f"  问题: {issue}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""文章计数与仪表板统计重建脚本，用于修复计数表、统计表与实际数据的偏差"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.database import SessionLocal, create_tables
+from app.core.counters import rebuild_published_counts, ALL_CATEGORIES
+from app.core.site_stats import rebuild_site_stats
+
+
+def main():
+    """主函数"""
+    print("=== 重建已发布文章计数与仪表板统计 ===")
+    create_tables()
+    db = SessionLocal()
+
+    try:
+        drift = rebuild_published_counts(db)
+        if not drift:
+            print("文章计数与实际数据一致，无需修复")
+        for scope, (old, new) in sorted(drift.items()):
+            name = "全部文章" if scope == ALL_CATEGORIES else f"分类 {scope}"
+            print(f"{name}: {old if old is not None else '缺失'} -> {new}")
+        stats_drift = rebuild_site_stats(db)
+        if not stats_drift:
+            print("仪表板统计与实际数据一致，无需修复")
+        for key, (old, new) in sorted(stats_drift.items()):
+            print(f"{key}: {old if old is not None else '缺失'} -> {new}")
+        print("计数重建完成!")
+
+    except Exception as e:
+        print(f"重建计数失败: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
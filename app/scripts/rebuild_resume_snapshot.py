@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""简历快照重建脚本，直接修改数据库中的简历数据后运行"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.database import SessionLocal, create_tables
+from app.core.resume_snapshot import resume_snapshot
+
+
+def main():
+    """主函数"""
+    print("=== 重建简历快照 ===")
+    create_tables()
+    db = SessionLocal()
+
+    try:
+        version, data = resume_snapshot.rebuild(db)
+        db.commit()
+        print(f"快照版本: {version}，大小: {len(data.encode())} 字节")
+        print("简历快照重建完成!")
+
+    except Exception as e:
+        print(f"重建简历快照失败: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import gzip
+from typing import Dict, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli为可选依赖，未安装时只提供gzip
+    brotli = None
+
+# 值得压缩的响应类型，图片等已压缩的格式不再压缩
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/javascript", "application/xml", "image/svg+xml", "text/"
+)
+
+
+def weaken_etag(etag: str) -> str:
+    """压缩后的响应与原始响应字节不同，强ETag需改为弱ETag"""
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+class Compressor:
+    """响应压缩：按Accept-Encoding协商brotli/gzip，小于minimum_size的响应不压缩"""
+
+    def __init__(self, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5,
+                 enabled: bool = True):
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.enabled = enabled
+        # 按服务端偏好排序，客户端权重相同时优先brotli
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """返回客户端接受且权重最高的编码，都不接受时返回None"""
+        if not self.enabled or not accept_encoding:
+            return None
+        weights = {}
+        for item in accept_encoding.split(","):
+            name, _, params = item.strip().partition(";")
+            weight = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    weight = float(params[2:])
+                except ValueError:
+                    weight = 0.0
+            weights[name.strip().lower()] = weight
+
+        best, best_weight = None, 0.0
+        for encoding in self.encodings:
+            weight = weights.get(encoding, weights.get("*", 0.0))
+            if weight > best_weight:
+                best, best_weight = encoding, weight
+        return best
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def variants(self, body: bytes) -> Dict[str, bytes]:
+        """预先生成各编码的压缩结果，供缓存条目直接发送"""
+        if not self.enabled or len(body) < self.minimum_size:
+            return {}
+        return {encoding: self.compress(body, encoding) for encoding in self.encodings}
+
+    @staticmethod
+    def compressible(content_type: str) -> bool:
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def encoded_content(
+    compressor: Compressor,
+    accept_encoding: Optional[str],
+    body: bytes,
+    variants: Dict[str, bytes],
+    headers: Dict[str, str]
+):
+    """从预压缩结果中选出客户端接受的编码，返回(响应体, 响应头)"""
+    headers = {**headers, "Vary": "Accept-Encoding"}
+    encoding = compressor.negotiate(accept_encoding) if variants else None
+    if encoding not in variants:
+        return body, headers
+    headers["Content-Encoding"] = encoding
+    if "ETag" in headers:
+        headers["ETag"] = weaken_etag(headers["ETag"])
+    return variants[encoding], headers
+
+
+class CompressionMiddleware:
+    """压缩一次性发送的响应；已带Content-Encoding（如缓存中的预压缩结果）或分块发送的响应原样转发"""
+
+    def __init__(self, app, compressor: Compressor):
+        self.app = app
+        self.compressor = compressor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.compressor.negotiate(Headers(scope=scope).get("accept-encoding"))
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            headers = MutableHeaders(scope=start_message)
+            body = message.get("body", b"")
+            compressible = self.compressor.compressible(headers.get("content-type", ""))
+            if compressible:
+                headers.add_vary_header("Accept-Encoding")
+            if (
+                encoding is None
+                or not compressible
+                or "content-encoding" in headers
+                or message.get("more_body", False)
+                or len(body) < self.compressor.minimum_size
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            body = self.compressor.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            if "etag" in headers:
+                headers["ETag"] = weaken_etag(headers["etag"])
+            passthrough = True
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+# 全局压缩器实例
+compressor = Compressor(
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+    enabled=settings.compression_enabled
+)
@@ -1,5 +1,9 @@
+import base64
+import json
 import re
 import unicodedata
+from datetime import datetime
+from typing import Optional, Tuple
 
 
 def slugify(text: str) -> str:
@@ -21,4 +25,23 @@ def slugify(text: str) -> str:
     if not text:
         text = 'untitled'
     
-    return text
\ No newline at end of file
+    return text
+
+
+def encode_cursor(published_at: Optional[datetime], post_id: int) -> str:
+    """将(published_at, id)编码为不透明的分页游标"""
+    payload = {"p": published_at.isoformat() if published_at else None, "i": post_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """解析分页游标，格式错误时抛出ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        published_at = datetime.fromisoformat(payload["p"]) if payload["p"] else None
+        post_id = int(payload["i"])
+    except (TypeError, KeyError, ValueError) as e:
+        raise ValueError("无效的分页游标") from e
+    return published_at, post_id
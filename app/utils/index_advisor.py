@@ -0,0 +1,141 @@
+import atexit
+import json
+import logging
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from app.utils.profiling import normalize_statement
+from app.utils.request_context import current_endpoint
+
+logger = logging.getLogger(__name__)
+
+# 只分析会读取表数据的语句
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE")
+
+
+@dataclass
+class StatementPlan:
+    """一个语句模板的执行计划与问题"""
+    statement: str
+    executions: int = 0
+    endpoints: List[str] = field(default_factory=list)
+    plan: List[str] = field(default_factory=list)
+    issues: List[str] = field(default_factory=list)
+
+
+def mysql_issues(rows: List[dict]) -> List[str]:
+    """从MySQL EXPLAIN结果中找出全表扫描、全索引扫描、filesort与临时表"""
+    issues = []
+    for row in rows:
+        table, access, extra = row.get("table"), row.get("type"), row.get("Extra") or ""
+        if access == "ALL":
+            issues.append(f"全表扫描 {table}（约{row.get('rows')}行）")
+        elif access == "index":
+            issues.append(f"全索引扫描 {table}（{row.get('key')}）")
+        if "Using filesort" in extra:
+            issues.append(f"filesort {table}")
+        if "Using temporary" in extra:
+            issues.append(f"临时表 {table}")
+    return issues
+
+
+def sqlite_issues(details: List[str]) -> List[str]:
+    """从SQLite EXPLAIN QUERY PLAN结果中找出全表扫描与临时B树排序"""
+    issues = []
+    for detail in details:
+        if detail.startswith("SCAN ") and "(" not in detail and detail != "SCAN CONSTANT ROW":
+            if "USING" in detail:
+                issues.append(f"全索引扫描 {detail[5:]}")
+            else:
+                issues.append(f"全表扫描 {detail[5:]}")
+        elif detail.startswith("USE TEMP B-TREE") and "ORDER BY" in detail:
+            # 包括RIGHT PART OF ORDER BY等只需对部分排序列排序的情况
+            issues.append(f"filesort（{detail[len('USE TEMP B-TREE FOR '):]}）")
+        elif detail.startswith("USE TEMP B-TREE"):
+            issues.append(f"临时表（{detail[len('USE TEMP B-TREE FOR '):]}）")
+    return issues
+
+
+class IndexAdvisor:
+    """记录执行过的SQL，对每个语句模板首次出现时用相同参数EXPLAIN一次，找出缺少索引的查询
+
+    在同一数据库连接上执行EXPLAIN，测试或压测结束后数据库被删除也不影响结果；
+    进程退出时把全部语句模板的计划与问题写入report_path（JSON），由app.scripts.index_advisor汇总输出。
+    """
+
+    def __init__(self, report_path: Optional[str] = None):
+        self.report_path = report_path
+        self._lock = threading.Lock()
+        self._plans: Dict[str, StatementPlan] = {}
+        self._explaining = threading.local()
+
+    def install(self, target):
+        """在引擎（或Engine类，即全部引擎）上注册事件钩子，并在进程退出时写出报告"""
+        event.listen(target, "after_cursor_execute", self._after_cursor_execute)
+        if self.report_path:
+            atexit.register(self.write_report)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if executemany or getattr(self._explaining, "active", False):
+            return
+        if not statement.lstrip().upper().startswith(EXPLAINABLE):
+            return
+        template = normalize_statement(statement)
+        endpoint = current_endpoint() or "<background>"
+        with self._lock:
+            plan = self._plans.get(template)
+            new = plan is None
+            if new:
+                plan = self._plans[template] = StatementPlan(template)
+            plan.executions += 1
+            if endpoint not in plan.endpoints:
+                plan.endpoints.append(endpoint)
+        if new:
+            self._explain(conn, plan, statement, parameters)
+
+    def _explain(self, conn, plan: StatementPlan, statement: str, parameters):
+        dialect = conn.dialect.name
+        if dialect == "mysql":
+            prefix = "EXPLAIN "
+        elif dialect == "sqlite":
+            prefix = "EXPLAIN QUERY PLAN "
+        else:
+            plan.plan = [f"不支持分析{dialect}的执行计划"]
+            return
+
+        self._explaining.active = True
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        except Exception as e:
+            plan.plan = [f"EXPLAIN失败: {e}"]
+            return
+        finally:
+            cursor.close()
+            self._explaining.active = False
+
+        if dialect == "mysql":
+            plan.plan = [
+                f"{row.get('table')}: type={row.get('type')} key={row.get('key')} "
+                f"rows={row.get('rows')} {row.get('Extra') or ''}".strip()
+                for row in rows
+            ]
+            plan.issues = mysql_issues(rows)
+        else:
+            plan.plan = [row["detail"] for row in rows]
+            plan.issues = sqlite_issues(plan.plan)
+
+    def plans(self) -> List[StatementPlan]:
+        """按执行次数从多到少返回全部语句模板"""
+        with self._lock:
+            return sorted(self._plans.values(), key=lambda plan: plan.executions, reverse=True)
+
+    def write_report(self):
+        if not self.report_path:
+            return
+        with open(self.report_path, "w", encoding="utf-8") as f:
+            json.dump([asdict(plan) for plan in self.plans()], f, ensure_ascii=False, indent=2)
+        logger.info("索引分析报告已写入 %s", self.report_path)
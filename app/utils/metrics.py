@@ -0,0 +1,238 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+
+# Prometheus文本格式的Content-Type
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+
+class _Shards:
+    """按线程分片的存储：每个线程只写自己的分片，写入无需加锁，读取时汇总所有分片
+
+    锁只在线程第一次写入、登记新分片时使用。分片中的值由CPython的GIL保证单次读写完整，
+    读取与写入并发时汇总结果可能缺少正在进行的那一次记录。
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[dict] = []
+
+    def mine(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def items(self):
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            yield from list(shard.items())
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._shards = _Shards()
+
+    def _labels(self, labels: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, labels))
+        if extra is not None:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    """只增计数器"""
+
+    type = "counter"
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1):
+        shard = self._shards.mine()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        totals: Dict[Tuple[str, ...], float] = {}
+        for labels, value in self._shards.items():
+            totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for labels, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{self._labels(labels)} {_format(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """可增可减的数值，同一请求的inc与dec应在同一线程中调用"""
+
+    type = "gauge"
+
+    def dec(self, labels: Tuple[str, ...] = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    """直方图：各分片保存每个桶的计数（非累计）与观测值之和，输出时转为累计计数"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        shard = self._shards.mine()
+        data = shard.get(labels)
+        if data is None:
+            # 桶计数（最后一个为+Inf）+ 观测值之和
+            data = shard[labels] = [0] * (len(self.buckets) + 2)
+        data[bisect_left(self.buckets, value)] += 1
+        data[-1] += value
+
+    def values(self) -> Dict[Tuple[str, ...], List[float]]:
+        totals: Dict[Tuple[str, ...], List[float]] = {}
+        for labels, data in self._shards.items():
+            total = totals.setdefault(labels, [0] * len(data))
+            for index, value in enumerate(list(data)):
+                total[index] += value
+        return totals
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for labels, data in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), data):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format(bound)
+                lines.append(f"{self.name}_bucket{self._labels(labels, ('le', le))} {_format(cumulative)}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {_format(data[-1])}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {_format(cumulative)}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class MetricsRegistry:
+    """指标注册表，按注册顺序以Prometheus文本格式输出"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# 全局指标注册表与应用指标
+registry = MetricsRegistry()
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP请求数", ("method", "route", "status")))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP请求处理耗时", ("method", "route")))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "正在处理的HTTP请求数"))
+http_response_size = registry.register(Histogram(
+    "http_response_size_bytes", "HTTP响应体大小", ("method", "route"), buckets=SIZE_BUCKETS))
+request_db_queries = registry.register(Histogram(
+    "http_request_db_queries", "单个请求执行的SQL语句数", ("method", "route"), buckets=QUERY_COUNT_BUCKETS))
+request_db_duration = registry.register(Histogram(
+    "http_request_db_duration_seconds", "单个请求执行SQL的总耗时", ("method", "route")))
+
+# 当前请求的SQL统计[语句数, 耗时]；线程池中执行的同步代码复制上下文后仍指向同一个列表
+_request_queries: ContextVar[Optional[list]] = ContextVar("request_queries", default=None)
+
+
+class MetricsMiddleware:
+    """记录每个请求的次数、耗时、响应大小与SQL统计，按路由模板归类，未匹配路由的请求归为<unmatched>"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        queries = [0, 0.0]
+        token = _request_queries.set(queries)
+        http_requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            duration = time.perf_counter() - start
+            http_requests_in_flight.dec()
+            _request_queries.reset(token)
+
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route is not None else "<unmatched>")
+            http_requests.inc(labels + (str(status),))
+            http_request_duration.observe(labels, duration)
+            http_response_size.observe(labels, size)
+            request_db_queries.observe(labels, queries[0])
+            request_db_duration.observe(labels, queries[1])
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = _request_queries.get()
+    if queries is not None:
+        queries[0] += 1
+        queries[1] += time.perf_counter() - context._metrics_started
+
+
+def track_queries(target):
+    """在引擎（或Engine类，即全部引擎）上记录每条SQL的耗时，计入当前请求"""
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,110 @@
+import threading
+import time
+from typing import Dict, Type
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.utils.request_context import current_endpoint
+
+
+class PoolMetrics:
+    """连接池指标：每个连接池的借出等待、在用连接与溢出情况，以及按接口汇总的等待时间"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools: Dict[str, QueuePool] = {}
+        self._pool_stats: Dict[str, dict] = {}
+        self._endpoint_stats: Dict[str, dict] = {}
+
+    @staticmethod
+    def _new_stats() -> dict:
+        return {"checkouts": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0, "timeouts": 0}
+
+    @staticmethod
+    def _update(stats: dict, wait_ms: float, timed_out: bool):
+        stats["checkouts"] += 0 if timed_out else 1
+        stats["timeouts"] += 1 if timed_out else 0
+        stats["wait_ms_total"] += wait_ms
+        stats["wait_ms_max"] = max(stats["wait_ms_max"], wait_ms)
+
+    def record_checkout(self, pool: "InstrumentedQueuePool", wait: float, timed_out: bool = False,
+                        overflowed: bool = False):
+        wait_ms = wait * 1000
+        endpoint = current_endpoint() or "<background>"
+        with self._lock:
+            self._pools[pool.metrics_name] = pool
+            stats = self._pool_stats.setdefault(
+                pool.metrics_name, dict(self._new_stats(), overflow_checkouts=0, peak_in_use=0)
+            )
+            self._update(stats, wait_ms, timed_out)
+            if overflowed:
+                stats["overflow_checkouts"] += 1
+            if not timed_out:
+                stats["peak_in_use"] = max(stats["peak_in_use"], pool.checkedout())
+
+            key = f"{pool.metrics_name} {endpoint}"
+            self._update(self._endpoint_stats.setdefault(key, self._new_stats()), wait_ms, timed_out)
+
+    def snapshot(self) -> dict:
+        """当前连接池状态与累计指标"""
+        def rounded(stats: dict) -> dict:
+            result = dict(stats)
+            count = stats["checkouts"] + stats["timeouts"]
+            result["wait_ms_avg"] = round(stats["wait_ms_total"] / count, 3) if count else 0.0
+            result["wait_ms_total"] = round(stats["wait_ms_total"], 3)
+            result["wait_ms_max"] = round(stats["wait_ms_max"], 3)
+            return result
+
+        with self._lock:
+            pools = {}
+            for name, pool in self._pools.items():
+                pools[name] = {
+                    "size": pool.size(),
+                    "max_overflow": pool._max_overflow,
+                    "timeout": pool.timeout(),
+                    "in_use": pool.checkedout(),
+                    "idle": pool.checkedin(),
+                    "overflow": max(pool.overflow(), 0),
+                    **rounded(self._pool_stats[name]),
+                }
+            endpoints = {key: rounded(stats) for key, stats in self._endpoint_stats.items()}
+        return {"pools": pools, "endpoints": endpoints}
+
+    def reset(self):
+        with self._lock:
+            self._pool_stats = {name: dict(self._new_stats(), overflow_checkouts=0, peak_in_use=0)
+                                for name in self._pools}
+            self._endpoint_stats.clear()
+
+
+# 全局连接池指标实例
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """记录借出连接等待时间的QueuePool，包括等待空闲连接与新建溢出连接的时间"""
+
+    metrics_name = "primary"
+
+    def _do_get(self):
+        overflow = self._overflow
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record_checkout(self, time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.record_checkout(
+            self, time.perf_counter() - start,
+            overflowed=self._overflow > overflow and self._overflow > 0
+        )
+        return connection
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """异步引擎使用的带指标连接池"""
+
+
+def instrumented_pool_class(name: str, async_engine: bool = False) -> Type[QueuePool]:
+    """生成以name上报指标的连接池类（引擎重建连接池时沿用同一个类）"""
+    base = InstrumentedAsyncQueuePool if async_engine else InstrumentedQueuePool
+    return type(f"{base.__name__}_{name}", (base,), {"metrics_name": name})
@@ -0,0 +1,145 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional
+from sqlalchemy import event
+from app.utils.request_context import current_endpoint, endpoint_label
+
+slow_query_logger = logging.getLogger("app.sql.slow")
+repeated_query_logger = logging.getLogger("app.sql.repeated")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s|:\w+|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_statement(statement: str) -> str:
+    """把SQL归一化为模板：字面量与各驱动的占位符统一为?，IN列表折叠为(?...)，空白合并"""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(?...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+@dataclass
+class RequestProfile:
+    """单个请求的SQL与序列化耗时"""
+    queries: int = 0
+    db_seconds: float = 0.0
+    serialize_seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def server_timing(self, total_seconds: float) -> str:
+        return (
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.queries} queries", '
+            f"serialize;dur={self.serialize_seconds * 1000:.2f}, "
+            f"total;dur={total_seconds * 1000:.2f}"
+        )
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+@contextmanager
+def profile_serialization():
+    """把代码块的耗时计入当前请求的序列化时间，未开启分析时几乎没有开销"""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.serialize_seconds += time.perf_counter() - start
+
+
+class SQLProfiler:
+    """按请求记录SQL语句数与耗时，超过阈值的语句写入app.sql.slow日志
+
+    同一请求中重复执行达到repeat_threshold次的语句模板（通常是N+1查询）写入app.sql.repeated日志。
+    日志内容为单行JSON，便于日志系统按字段检索。
+    """
+
+    def __init__(self, slow_query_ms: float = 100, repeat_threshold: int = 10):
+        self.slow_query_ms = slow_query_ms
+        self.repeat_threshold = repeat_threshold
+
+    def install(self, target):
+        """在引擎（或Engine类，即全部引擎）上注册事件钩子"""
+        event.listen(target, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(target, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._profile_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - context._profile_started
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.queries += 1
+            profile.db_seconds += duration
+            if self.repeat_threshold > 0:
+                profile.statements[normalize_statement(statement)] += 1
+
+        duration_ms = duration * 1000
+        if 0 < self.slow_query_ms <= duration_ms:
+            slow_query_logger.warning(json.dumps({
+                "event": "slow_query",
+                "endpoint": current_endpoint() or "<background>",
+                "duration_ms": round(duration_ms, 3),
+                "statement": normalize_statement(statement),
+            }, ensure_ascii=False))
+
+    def report_repeated(self, profile: RequestProfile, endpoint: str):
+        if self.repeat_threshold <= 0:
+            return
+        for statement, count in profile.statements.items():
+            if count >= self.repeat_threshold:
+                repeated_query_logger.warning(json.dumps({
+                    "event": "repeated_query",
+                    "endpoint": endpoint,
+                    "count": count,
+                    "statement": statement,
+                }, ensure_ascii=False))
+
+
+class ProfilingMiddleware:
+    """为每个请求收集SQL与序列化耗时，通过Server-Timing响应头返回，并在请求结束时报告重复语句"""
+
+    def __init__(self, app, profiler: SQLProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", profile.server_timing(time.perf_counter() - start).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            self.profiler.report_repeated(profile, endpoint_label(scope))
+            _current_profile.reset(token)
+
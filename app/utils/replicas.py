@@ -0,0 +1,159 @@
+import itertools
+import logging
+import threading
+import time
+from http.cookies import SimpleCookie
+from typing import Dict, List, Optional
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# 写操作成功后下发的cookie，携带该cookie的读请求在有效期内走主库，保证读到自己的写入
+PRIMARY_PIN_COOKIE = "myblog_primary"
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class QueryCounter:
+    """按目标库（primary/replica0/...）统计执行的SQL语句数"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+
+    def watch(self, engine: Engine, name: str):
+        self._counts.setdefault(name, 0)
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def count(conn, cursor, statement, parameters, context, executemany):
+            with self._lock:
+                self._counts[name] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+class ReplicaSet:
+    """只读从库集合：轮询选择健康的从库，全部不可用时返回None由调用方改用主库
+
+    连接或执行出错时立即把从库标记为不可用；每隔check_interval秒在后台线程中
+    用SELECT 1重新检查所有从库，恢复的从库重新加入轮询。
+    """
+
+    def __init__(self, check_interval: int = 10):
+        self.check_interval = check_interval
+        self.engines: List[Engine] = []
+        self.names: Dict[Engine, str] = {}
+        self._healthy: Dict[Engine, bool] = {}
+        self._cycle = iter(())
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self._checking = False
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def configure(self, engines: Dict[str, Engine]):
+        """替换从库配置，engines为名称到引擎的映射"""
+        self.dispose()
+        for name, engine in engines.items():
+            event.listen(engine, "handle_error", self._on_error(engine))
+            self.names[engine] = name
+            self._healthy[engine] = True
+        engines = list(engines.values())
+        with self._lock:
+            self.engines = engines
+            self._cycle = itertools.cycle(engines)
+            self._next_check = time.monotonic() + self.check_interval
+
+    def _on_error(self, engine: Engine):
+        def handle_error(context):
+            if context.is_disconnect or context.connection is None:
+                self.mark(engine, False)
+        return handle_error
+
+    def mark(self, engine: Engine, healthy: bool):
+        if self._healthy.get(engine) != healthy:
+            logger.warning("从库%s%s", self.names.get(engine), "恢复可用" if healthy else "不可用，改用其他库")
+        self._healthy[engine] = healthy
+
+    def choose(self) -> Optional[Engine]:
+        """轮询返回下一个健康的从库"""
+        if not self.engines:
+            return None
+        self._maybe_schedule_check()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                engine = next(self._cycle)
+                if self._healthy[engine]:
+                    return engine
+        return None
+
+    def check_health(self):
+        """逐个探测从库是否可用"""
+        for engine in list(self.engines):
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                self.mark(engine, True)
+            except Exception:
+                self.mark(engine, False)
+
+    def _maybe_schedule_check(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._checking or now < self._next_check:
+                return
+            self._checking = True
+            self._next_check = now + self.check_interval
+
+        def run():
+            try:
+                self.check_health()
+            finally:
+                self._checking = False
+
+        threading.Thread(target=run, name="replica-health-check", daemon=True).start()
+
+    def status(self) -> Dict[str, bool]:
+        return {self.names[engine]: self._healthy[engine] for engine in self.engines}
+
+    def dispose(self):
+        for engine in self.engines:
+            engine.dispose()
+        with self._lock:
+            self.engines = []
+            self.names = {}
+            self._healthy = {}
+            self._cycle = iter(())
+
+
+class ReadAfterWriteMiddleware:
+    """配置了从库时，写请求成功后下发短期cookie，使该客户端随后的读请求走主库"""
+
+    def __init__(self, app, replicas: ReplicaSet, window: int = 5):
+        self.app = app
+        self.replicas = replicas
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or not self.replicas:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start" and 200 <= message["status"] < 400:
+                cookie = SimpleCookie()
+                cookie[PRIMARY_PIN_COOKIE] = "1"
+                cookie[PRIMARY_PIN_COOKIE]["max-age"] = self.window
+                cookie[PRIMARY_PIN_COOKIE]["path"] = "/"
+                cookie[PRIMARY_PIN_COOKIE]["httponly"] = True
+                cookie[PRIMARY_PIN_COOKIE]["samesite"] = "lax"
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", cookie.output(header="").strip().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
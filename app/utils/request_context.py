@@ -0,0 +1,39 @@
+from contextvars import ContextVar
+from typing import Optional
+
+# 当前请求的ASGI scope；线程池中执行的同步代码会复制调用方的上下文，同样可以读取
+_current_scope: ContextVar[Optional[dict]] = ContextVar("current_request_scope", default=None)
+
+
+class RequestContextMiddleware:
+    """记录当前请求的ASGI scope，供数据库事件等在请求之外的回调中按接口归类指标"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
+
+
+def current_endpoint() -> Optional[str]:
+    """返回当前请求的接口标识（方法 + 路由模板），不在请求中时返回None
+
+    路由匹配前或未匹配任何路由时返回"方法 <unmatched>"，避免按原始路径产生无限多的标签。
+    """
+    scope = _current_scope.get()
+    if scope is None:
+        return None
+    return endpoint_label(scope)
+
+
+def endpoint_label(scope: dict) -> str:
+    """由请求的ASGI scope生成接口标识"""
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route is not None else '<unmatched>'}"
@@ -0,0 +1,102 @@
+"""认证依赖单次开销微基准
+
+对比每次请求都解析密钥并校验签名（原实现）、预解析密钥、已校验令牌缓存三种方式的JWT解码耗时，
+以及完整的get_current_user依赖在各级缓存开启/关闭时的耗时。
+
+用法: python -m benchmarks.bench_auth_overhead [--iterations 20000]
+"""
+
+import argparse
+import time
+import timeit
+
+from benchmarks.common import use_temp_database
+
+use_temp_database()
+
+from cryptography.hazmat.primitives import serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import rsa  # noqa: E402
+from jose import jwt  # noqa: E402
+from app.core.principals import principal_cache  # noqa: E402
+from app.core.security import create_access_token, get_current_user  # noqa: E402
+from app.core.tokens import TokenCodec, token_codec  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+def per_call_us(fn, iterations: int) -> float:
+    fn()
+    return timeit.timeit(fn, number=iterations) / iterations * 1e6
+
+
+def rsa_keys():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return private_pem, public_pem
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    claims = {"sub": "bench", "exp": int(time.time()) + 3600}
+    results = {}
+
+    secret = "bench-secret"
+    hs_token = jwt.encode(claims, secret, algorithm="HS256")
+    hs_uncached = TokenCodec("HS256", secret_key=secret, cache_size=0)
+    hs_cached = TokenCodec("HS256", secret_key=secret)
+    results["HS256 jose.decode(每次解析密钥)"] = per_call_us(
+        lambda: jwt.decode(hs_token, secret, algorithms=["HS256"]), n)
+    results["HS256 预解析密钥"] = per_call_us(lambda: hs_uncached.decode(hs_token), n)
+    results["HS256 预解析密钥+校验缓存"] = per_call_us(lambda: hs_cached.decode(hs_token), n)
+
+    private_pem, public_pem = rsa_keys()
+    rs_token = jwt.encode(claims, private_pem, algorithm="RS256")
+    rs_uncached = TokenCodec("RS256", public_key=public_pem, cache_size=0)
+    rs_cached = TokenCodec("RS256", public_key=public_pem)
+    rs_n = max(n // 10, 100)
+    results["RS256 jose.decode(每次解析公钥)"] = per_call_us(
+        lambda: jwt.decode(rs_token, public_pem, algorithms=["RS256"]), rs_n)
+    results["RS256 预解析公钥"] = per_call_us(lambda: rs_uncached.decode(rs_token), rs_n)
+    results["RS256 预解析公钥+校验缓存"] = per_call_us(lambda: rs_cached.decode(rs_token), n)
+
+    # 完整认证依赖（SQLite本地查询，远程MySQL时查询开销更大）
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(username="bench", email="bench@example.com", full_name="Bench", password_hash="x"))
+    db.commit()
+    token = create_access_token({"sub": "bench"})
+
+    def dependency():
+        session = SessionLocal()
+        try:
+            get_current_user(token, session)
+        finally:
+            session.close()
+
+    cache_size, ttl = token_codec.cache_size, principal_cache.ttl
+    token_codec.cache_size, principal_cache.ttl = 0, 0
+    token_codec.clear_cache()
+    results["get_current_user 无缓存"] = per_call_us(dependency, max(n // 10, 100))
+    principal_cache.ttl = ttl
+    results["get_current_user 用户缓存"] = per_call_us(dependency, n)
+    token_codec.cache_size = cache_size
+    results["get_current_user 用户缓存+令牌缓存"] = per_call_us(dependency, n)
+    db.close()
+
+    print("\n=== 认证开销（微秒/次） ===")
+    for name, value in results.items():
+        print(f"{name:<36}{value:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
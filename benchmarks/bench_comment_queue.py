@@ -0,0 +1,84 @@
+"""评论写入队列基准
+
+分别以COMMENT_QUEUE_ENABLED=false/true启动uvicorn，并发提交评论，比较吞吐量与延迟；
+服务停止后（队列在关闭时写入剩余评论）核对入库的评论数与提交成功的请求数一致。
+
+用法: python -m benchmarks.bench_comment_queue [--requests 3000] [--concurrency 20] [--batch-size 100]
+"""
+
+import argparse
+import asyncio
+
+from benchmarks.common import use_temp_database, start_server, run_http_load, print_results
+
+use_temp_database()
+
+from sqlalchemy import func, insert  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models.blog import BlogPost, Comment  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+COMMENT = {"author_name": "压测", "author_email": "bench@example.com", "content": "写得很好，收获很大。" * 5}
+
+
+def seed(posts: int):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    author = User(username="bench", email="bench@example.com", full_name="Bench", password_hash="x")
+    db.add(author)
+    db.commit()
+    db.execute(insert(BlogPost), [
+        {"title": f"文章 {i}", "slug": f"post-{i}", "content": "正文", "author_id": author.id, "is_published": True}
+        for i in range(posts)
+    ])
+    db.commit()
+    db.close()
+
+
+def count_comments() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(func.count(Comment.id)).scalar()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--max-latency-ms", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8771)
+    args = parser.parse_args()
+
+    seed(posts=1)
+    results = {}
+    for label, enabled in (("同步写入", False), ("写入队列", True)):
+        before = count_comments()
+        server = start_server(
+            args.port,
+            COMMENT_QUEUE_ENABLED=str(enabled).lower(),
+            COMMENT_QUEUE_BATCH_SIZE=str(args.batch_size),
+            COMMENT_QUEUE_MAX_LATENCY_MS=str(args.max_latency_ms),
+            METRICS_ENABLED="false",
+        )
+        try:
+            stats = asyncio.run(run_http_load(
+                f"http://127.0.0.1:{args.port}", ["/api/blog/comments"], args.requests, args.concurrency,
+                json=dict(COMMENT, post_id=1)
+            ))
+        finally:
+            server.terminate()
+            server.wait()
+        accepted = stats["statuses"].get(200, 0) + stats["statuses"].get(202, 0)
+        stored = count_comments() - before
+        print(f"{label}: 状态码 {stats['statuses']}，成功提交 {accepted} 条，入库 {stored} 条")
+        results[label] = stats
+
+    print_results(f"提交评论（并发{args.concurrency}，批量{args.batch_size}条）", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""响应压缩CPU开销基准
+
+对100篇文章的列表与带评论的长文详情，比较不压缩、每个请求由中间件压缩、
+缓存填充时预压缩（命中缓存直接发送）三种方式下每个请求消耗的CPU时间与响应大小。
+
+用法: python -m benchmarks.bench_compression [--requests 300] [--body-kb 30]
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import use_temp_database
+
+use_temp_database()
+
+from sqlalchemy import insert  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.core.cache import response_cache  # noqa: E402
+from app.models.blog import BlogPost, BlogCategory, Comment  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.utils.compression import compressor  # noqa: E402
+
+PATHS = {
+    "列表(100篇)": "/api/blog/posts?size=100",
+    "详情(长文+评论)": "/api/blog/posts/long-0",
+}
+
+
+def seed(body_kb):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    author = User(username="bench", email="bench@example.com", full_name="Bench", password_hash="x")
+    category = BlogCategory(name="技术文章", slug="technology")
+    db.add_all([author, category])
+    db.commit()
+
+    body = ("这是一段用于压缩测试的博客正文。" * (body_kb * 1024 // 45 + 1))[:body_kb * 1024 // 3]
+    db.execute(insert(BlogPost), [
+        {
+            "title": f"长文 {i}", "slug": f"long-{i}", "summary": f"第{i}篇文章的摘要，介绍文章的主要内容",
+            "content": body, "author_id": author.id, "category_id": category.id,
+            "is_published": True, "view_count": 0,
+        }
+        for i in range(120)
+    ])
+    post_id = db.query(BlogPost.id).filter(BlogPost.slug == "long-0").scalar()
+    db.execute(insert(Comment), [
+        {"post_id": post_id, "author_name": f"读者{i}", "author_email": f"r{i}@example.com",
+         "content": "写得很好，收获很大。" * 5, "is_approved": True}
+        for i in range(30)
+    ])
+    db.commit()
+    db.close()
+
+
+async def cpu_per_request(path, encoding, requests):
+    """直接以ASGI调用应用（不经过网络与客户端解压），返回每个请求的CPU时间（微秒）与响应体大小（字节）"""
+    raw_path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": raw_path, "raw_path": raw_path.encode(), "query_string": query.encode(),
+        "root_path": "", "server": ("bench", 80), "client": ("127.0.0.1", 1234),
+        "headers": [(b"host", b"bench"), (b"accept-encoding", encoding.encode())],
+    }
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(dict(scope), receive, send)
+    start = time.process_time()
+    for _ in range(requests):
+        size = 0
+        await app(dict(scope), receive, send)
+    elapsed = time.process_time() - start
+    return elapsed / requests * 1e6, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--body-kb", type=int, default=30)
+    args = parser.parse_args()
+
+    seed(args.body_kb)
+    original_variants = compressor.variants
+    scenarios = [
+        ("不压缩", "identity", True),
+        ("gzip 每次压缩", "gzip", False),
+        ("gzip 预压缩缓存", "gzip", True),
+    ]
+    if "br" in compressor.encodings:
+        scenarios += [("brotli 每次压缩", "br", False), ("brotli 预压缩缓存", "br", True)]
+
+    print(f"\n=== 响应压缩CPU开销（{args.requests}次请求，命中响应缓存） ===")
+    print(f"{'接口':<18}{'场景':<20}{'CPU(us/请求)':>14}{'响应(字节)':>12}")
+    for name, path in PATHS.items():
+        for label, encoding, precompressed in scenarios:
+            # 关闭预压缩时缓存条目不带压缩版本，由中间件在每个请求中压缩
+            compressor.variants = original_variants if precompressed else (lambda body: {})
+            response_cache.clear()
+            cpu_us, size = asyncio.run(cpu_per_request(path, encoding, args.requests))
+            print(f"{name:<18}{label:<20}{cpu_us:>14.1f}{size:>12}")
+    compressor.variants = original_variants
+
+
+if __name__ == "__main__":
+    main()
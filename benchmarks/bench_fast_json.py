@@ -0,0 +1,128 @@
+"""快速JSON响应基准
+
+1. 进程内对比100篇文章列表的两种序列化方式：FastAPI默认路径（按响应模型再次校验、
+   转换为字典后json.dumps）与FastJSONRoute（校验一次后TypeAdapter.dump_json）。
+2. 分别以FAST_JSON_RESPONSES=false/true启动uvicorn（关闭响应缓存），测量各读接口的吞吐量。
+   /api/blog/posts与/api/resume本身已直接返回序列化好的字节，两种配置下应基本相同；
+   差别体现在仍由FastAPI序列化响应模型的接口上（章节列表、评论列表等）。
+
+用法: python -m benchmarks.bench_fast_json [--requests 2000] [--concurrency 10]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+
+from benchmarks.common import use_temp_database, start_server, run_http_load, print_results
+
+use_temp_database()
+
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.core.loaders import post_list_options  # noqa: E402
+from app.models.blog import BlogCategory, BlogPost, Comment  # noqa: E402
+from app.models.resume import ResumeSection, SectionType  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.blog import BlogPostList  # noqa: E402
+
+PATHS = {
+    "文章列表(100篇)": "/api/blog/posts?size=100",
+    "简历": "/api/resume",
+    "简历章节(100条)": "/api/resume/sections",
+    "评论列表(100条)": "/api/blog/posts/1/comments",
+}
+
+
+def seed():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    author = User(username="bench", email="bench@example.com", full_name="Bench", password_hash="x")
+    category = BlogCategory(name="基准", slug="bench")
+    db.add_all([author, category])
+    db.commit()
+    db.execute(insert(BlogPost), [
+        {
+            "title": f"文章 {i}", "slug": f"post-{i}", "summary": f"摘要 {i}", "content": "正文" * 200,
+            "author_id": author.id, "category_id": category.id, "is_published": True, "view_count": 0,
+        }
+        for i in range(150)
+    ])
+    db.execute(insert(Comment), [
+        {"post_id": 1, "author_name": f"读者{i}", "author_email": f"r{i}@example.com",
+         "content": "写得很好。" * 10, "is_approved": True}
+        for i in range(100)
+    ])
+    db.execute(insert(ResumeSection), [
+        {"section_type": SectionType.skills if i % 2 else SectionType.projects, "title": f"章节 {i}",
+         "content": "内容" * 50, "order_index": i, "is_visible": True}
+        for i in range(100)
+    ])
+    db.commit()
+    db.close()
+
+
+def per_call_us(fn, iterations: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def serialization_micro(iterations: int):
+    db = SessionLocal()
+    posts = db.query(BlogPost).options(*post_list_options()).limit(100).all()
+    field = create_response_field(name="Response", type_=List[BlogPostList])
+    adapter = TypeAdapter(List[BlogPostList])
+    loop = asyncio.new_event_loop()
+
+    def fastapi_default():
+        # 与JSONResponse.render相同的编码参数
+        content = loop.run_until_complete(serialize_response(field=field, response_content=posts))
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+    def fast_json():
+        return adapter.dump_json(adapter.validate_python(posts, from_attributes=True))
+
+    default_us = per_call_us(fastapi_default, iterations)
+    fast_us = per_call_us(fast_json, iterations)
+    loop.close()
+    db.close()
+    print("\n=== 100篇文章列表序列化（微秒/次） ===")
+    print(f"FastAPI默认路径     {default_us:>10.1f}")
+    print(f"FastJSONRoute       {fast_us:>10.1f}  ({default_us / fast_us:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    seed()
+    serialization_micro(args.iterations)
+
+    for name, path in PATHS.items():
+        results = {}
+        for label, fast in (("默认序列化", False), ("快速JSON", True)):
+            server = start_server(args.port, FAST_JSON_RESPONSES=str(fast).lower(), RESPONSE_CACHE_ENABLED="false")
+            try:
+                base_url = f"http://127.0.0.1:{args.port}"
+                asyncio.run(run_http_load(base_url, [path], 100, args.concurrency))  # 预热
+                results[label] = asyncio.run(run_http_load(base_url, [path], args.requests, args.concurrency))
+            finally:
+                server.terminate()
+                server.wait()
+        print_results(name, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""文章列表加载基准：加载完整实体（含正文）vs 列投影
+
+在正文约200KB的文章上比较列表查询的延迟与内存峰值。
+
+用法: python -m benchmarks.bench_list_projection [--posts 300] [--body-kb 200] [--size 100]
+"""
+
+import argparse
+import tracemalloc
+
+from benchmarks.common import use_temp_database, run_load, print_results
+
+use_temp_database()
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.orm import joinedload, undefer  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.blog import BlogPost, BlogCategory  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.core.loaders import post_list_options  # noqa: E402
+from app.schemas.blog import BlogPostList  # noqa: E402
+
+
+def seed(posts, body_kb):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    author = User(username="bench", email="bench@example.com", full_name="Bench", password_hash="x")
+    category = BlogCategory(name="技术文章", slug="technology")
+    db.add_all([author, category])
+    db.commit()
+
+    body = ("长文正文" * (body_kb * 1024 // 12 + 1))[:body_kb * 1024 // 3]
+    db.execute(insert(BlogPost), [
+        {
+            "title": f"长文 {i}", "slug": f"long-{i}", "summary": "摘要",
+            "content": body, "author_id": author.id, "category_id": category.id,
+            "is_published": True, "view_count": 0,
+        }
+        for i in range(posts)
+    ])
+    db.commit()
+    db.close()
+
+
+def load_full(size):
+    db = SessionLocal()
+    posts = db.query(BlogPost).options(undefer(BlogPost.content), joinedload(BlogPost.category))\
+              .order_by(BlogPost.id.desc()).limit(size).all()
+    items = [BlogPostList.model_validate(post) for post in posts]
+    db.close()
+    return items
+
+
+def load_projected(size):
+    db = SessionLocal()
+    posts = db.query(BlogPost).options(*post_list_options())\
+              .order_by(BlogPost.id.desc()).limit(size).all()
+    items = [BlogPostList.model_validate(post) for post in posts]
+    db.close()
+    return items
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=300)
+    parser.add_argument("--body-kb", type=int, default=200)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    seed(args.posts, args.body_kb)
+
+    print(f"\n内存峰值（{args.size} 篇，正文约 {args.body_kb}KB）")
+    print(f"  完整实体: {peak_memory(lambda: load_full(args.size)):.1f} MB")
+    print(f"  列投影:   {peak_memory(lambda: load_projected(args.size)):.1f} MB")
+
+    results = {
+        "完整实体 (含正文)": run_load(lambda: load_full(args.size), args.requests),
+        "列投影 (post_list_options)": run_load(lambda: load_projected(args.size), args.requests),
+    }
+    client = TestClient(app)
+    results[f"GET /api/blog/posts?size={args.size}"] = run_load(
+        lambda: client.get("/api/blog/posts", params={"size": args.size}), args.requests
+    )
+    print_results("列表查询延迟", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""全接口压测
+
+启动uvicorn后依次压测app/api下全部路由组（认证、博客、简历、管理）的主要接口，
+记录每个场景的吞吐量与p50/p95/p99延迟，写入JSON报告；指定--compare时与之前的报告逐项对比。
+
+默认使用临时SQLite并用app.scripts.seed_data生成数据；设置DATABASE_URL可对MySQL等已有数据库压测，
+数据库中已有文章时不再生成数据（除非指定--seed）。
+
+用法: python -m benchmarks.bench_load [--posts 3000] [--requests 500] [--concurrency 10]
+      [--output report.json] [--compare baseline.json] [--env RESPONSE_CACHE_ENABLED=false ...]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.common import use_temp_database, start_server, run_http_load, print_results
+
+use_temp_database()
+
+from sqlalchemy.engine import make_url  # noqa: E402
+from app.database import SessionLocal, create_tables  # noqa: E402
+from app.models.blog import BlogCategory, BlogPost  # noqa: E402
+from app.scripts.init_db import create_initial_data  # noqa: E402
+from app.scripts.seed_data import seed  # noqa: E402
+
+# 登录使用init_db创建的默认管理员
+ADMIN_CREDENTIALS = {"username": "admin", "password": "admin123"}
+
+
+def prepare_data(args):
+    """建表并准备数据，返回场景需要的文章、分类样本"""
+    create_tables()
+    create_initial_data()
+    db = SessionLocal()
+    try:
+        if args.seed or db.query(BlogPost.id).first() is None:
+            counts = seed(db, posts=args.posts, comments_per_post=args.comments_per_post)
+            print(f"已生成数据: {counts}")
+        rng = random.Random(0)
+        published = db.query(BlogPost.id, BlogPost.slug).filter(BlogPost.is_published == True).all()
+        return {
+            "posts": rng.sample(published, min(200, len(published))),
+            "published": len(published),
+            "category_id": db.query(BlogCategory.id).order_by(BlogCategory.id).limit(1).scalar(),
+        }
+    finally:
+        db.close()
+
+
+def build_scenarios(sample):
+    """(路由组, 场景名) -> 请求参数；请求数倍率用于控制登录等昂贵接口的请求量"""
+    slugs = [f"/api/blog/posts/{slug}" for _, slug in sample["posts"]]
+    comments = [f"/api/blog/posts/{post_id}/comments" for post_id, _ in sample["posts"]]
+    deep_page = max(1, sample["published"] // 10 - 1)
+    first_post_id = sample["posts"][0][0]
+    return {
+        ("auth", "登录"): {"paths": ["/api/auth/login/json"], "json": ADMIN_CREDENTIALS, "scale": 0.1},
+        ("auth", "当前用户"): {"paths": ["/api/auth/me"], "auth": True},
+        ("blog", "文章列表"): {"paths": ["/api/blog/posts"]},
+        ("blog", "文章列表(100条)"): {"paths": ["/api/blog/posts?size=100"]},
+        ("blog", "文章列表(深翻页)"): {"paths": [f"/api/blog/posts?page={deep_page}"]},
+        ("blog", "文章列表(游标)"): {"paths": ["/api/blog/posts?cursor="]},
+        ("blog", "文章列表(分类)"): {"paths": [f"/api/blog/posts?category={sample['category_id']}"]},
+        ("blog", "全文搜索"): {"paths": ["/api/blog/search?q=缓存", "/api/blog/search?q=latency", "/api/blog/search?q=连接池"]},
+        ("blog", "文章详情"): {"paths": slugs},
+        ("blog", "评论列表"): {"paths": comments},
+        ("blog", "分类列表"): {"paths": ["/api/blog/categories"]},
+        ("blog", "发表评论"): {
+            "paths": ["/api/blog/comments"],
+            "json": {"post_id": first_post_id, "author_name": "压测", "author_email": "load@example.com",
+                     "content": "压测评论内容"},
+            "scale": 0.5,
+        },
+        ("resume", "完整简历"): {"paths": ["/api/resume"]},
+        ("resume", "简历章节"): {"paths": ["/api/resume/sections"]},
+        ("resume", "个人信息"): {"paths": ["/api/resume/personal-info"]},
+        ("resume", "教育背景"): {"paths": ["/api/resume/education"]},
+        ("resume", "工作经历"): {"paths": ["/api/resume/experience"]},
+        ("admin", "仪表板"): {"paths": ["/api/admin/dashboard"], "auth": True},
+        ("admin", "待审核评论"): {"paths": ["/api/admin/comments/pending"], "auth": True},
+        ("admin", "留言列表"): {"paths": ["/api/admin/messages"], "auth": True},
+        ("admin", "用户列表"): {"paths": ["/api/admin/users"], "auth": True},
+        ("admin", "缓存统计"): {"paths": ["/api/admin/cache/stats"], "auth": True},
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(report, baseline_path):
+    """逐场景对比吞吐量与p95延迟的变化"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\n=== 与 {baseline_path}（{baseline['meta']['revision']}）对比 ===")
+    print(f"{'场景':<30}{'吞吐变化':>12}{'p95变化':>12}")
+    for key, stats in report["scenarios"].items():
+        old = baseline["scenarios"].get(key)
+        if old is None:
+            print(f"{key:<30}{'新增':>12}")
+            continue
+        throughput = (stats["throughput"] / old["throughput"] - 1) * 100 if old["throughput"] else 0.0
+        p95 = (stats["p95_ms"] / old["p95_ms"] - 1) * 100 if old["p95_ms"] else 0.0
+        print(f"{key:<30}{throughput:>+11.1f}%{p95:>+11.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=3000, help="生成的文章数")
+    parser.add_argument("--comments-per-post", type=int, default=5)
+    parser.add_argument("--seed", action="store_true", help="已有数据时仍生成数据")
+    parser.add_argument("--requests", type=int, default=500, help="每个场景的请求数")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8770)
+    parser.add_argument("--env", action="append", default=[], help="传给服务进程的配置，如RESPONSE_CACHE_ENABLED=false")
+    parser.add_argument("--output", default="load_test_report.json")
+    parser.add_argument("--compare", help="用于对比的历史报告")
+    args = parser.parse_args()
+
+    sample = prepare_data(args)
+    scenarios = build_scenarios(sample)
+    env = dict(item.split("=", 1) for item in args.env)
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    server = start_server(args.port, **env)
+    try:
+        token = httpx.post(f"{base_url}/api/auth/login/json", json=ADMIN_CREDENTIALS).json()["access_token"]
+        auth = {"Authorization": f"Bearer {token}"}
+        results = {}
+        for (router, name), scenario in scenarios.items():
+            requests = max(args.concurrency, int(args.requests * scenario.get("scale", 1)))
+            stats = asyncio.run(run_http_load(
+                base_url, scenario["paths"], requests, args.concurrency,
+                json=scenario.get("json"), headers=auth if scenario.get("auth") else None
+            ))
+            stats["router"] = router
+            stats["statuses"] = {str(code): count for code, count in stats["statuses"].items()}
+            results[f"{router}: {name}"] = stats
+    finally:
+        server.terminate()
+        server.wait()
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "database": make_url(os.environ["DATABASE_URL"]).get_backend_name(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "env": env,
+        },
+        "scenarios": results,
+    }
+    print_results(f"全接口压测（并发{args.concurrency}）", results)
+    # 启用评论写入队列时发表评论返回202
+    failed = {
+        key: stats["statuses"] for key, stats in results.items()
+        if any(not code.startswith("2") for code in stats["statuses"])
+    }
+    if failed:
+        print(f"\n存在失败响应的场景: {failed}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n报告已写入 {args.output}")
+    if args.compare:
+        compare(report, args.compare)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
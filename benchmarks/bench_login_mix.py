@@ -0,0 +1,91 @@
+"""登录与读取混合负载基准：密码校验在线程池中计算 vs 独立进程池（带排队上限）
+
+持续的并发登录（模拟登录高峰或撞库）同时，测量文章列表读取的延迟。
+线程池模式下bcrypt占满请求线程，读取请求需要排队；进程池模式下登录数量受限，
+超出排队上限的登录立即返回429，读取延迟基本不受影响。
+
+用法: python -m benchmarks.bench_login_mix [--logins 40] [--readers 10] [--reads 400]
+"""
+
+import argparse
+import asyncio
+
+from benchmarks.common import use_temp_database, start_server, run_http_load, print_results
+
+use_temp_database()
+
+from app.core.security import get_password_hash  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models.blog import BlogPost  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+def seed():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    author = User(
+        username="bench", email="bench@example.com", full_name="Bench",
+        password_hash=get_password_hash("benchpassword")
+    )
+    db.add(author)
+    db.flush()
+    db.add_all([
+        BlogPost(title=f"文章 {i}", slug=f"post-{i}", content="正文", author_id=author.id, is_published=True)
+        for i in range(50)
+    ])
+    db.commit()
+    db.close()
+
+
+async def mixed_load(base_url: str, logins: int, readers: int, reads: int):
+    stop = asyncio.Event()
+    login_task = asyncio.create_task(run_http_load(
+        base_url, ["/api/auth/login/json"], 10 ** 9, logins, stop=stop,
+        json={"username": "bench", "password": "benchpassword"}
+    ))
+    await asyncio.sleep(1)
+    read_stats = await run_http_load(base_url, ["/api/blog/posts?size=10"], reads, readers)
+    stop.set()
+    login_stats = await login_task
+    return read_stats, login_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=40, help="并发登录连接数")
+    parser.add_argument("--readers", type=int, default=10, help="并发读取连接数")
+    parser.add_argument("--reads", type=int, default=400)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    seed()
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    results = {}
+    login_results = {}
+    scenarios = (
+        ("线程池计算", {"PASSWORD_HASH_WORKERS": "0", "PASSWORD_HASH_QUEUE_LIMIT": "100000"}),
+        ("进程池+排队上限", {}),
+    )
+    for name, env in scenarios:
+        server = start_server(args.port, RESPONSE_CACHE_ENABLED="false", **env)
+        try:
+            results[f"{name} 仅读取"] = asyncio.run(
+                run_http_load(base_url, ["/api/blog/posts?size=10"], args.reads, args.readers)
+            )
+            read_stats, login_stats = asyncio.run(mixed_load(base_url, args.logins, args.readers, args.reads))
+            results[f"{name} 读取+登录"] = read_stats
+            login_results[f"{name} 登录"] = login_stats
+        finally:
+            server.terminate()
+            server.wait()
+
+    print_results(f"GET /api/blog/posts 读取延迟（并发读取{args.readers}，并发登录{args.logins}）", results)
+    print_results("POST /api/auth/login/json", login_results)
+    for name, stats in login_results.items():
+        print(f"{name} 状态码: {stats['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""指标采集单次开销微基准
+
+直接以ASGI调用驱动一个最简应用，对比加与不加MetricsMiddleware时每个请求的耗时，
+以及一条SQL在加与不加track_queries事件钩子时的执行耗时，差值即为指标采集的开销。
+
+用法: python -m benchmarks.bench_metrics_overhead [--iterations 50000]
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.utils.metrics import MetricsMiddleware, track_queries
+
+# 每种场景分多轮执行取最快一轮，减少调度抖动的影响
+ROUNDS = 5
+
+
+class FakeRoute:
+    path = "/bench/{item}"
+
+
+async def plain_app(scope, receive, send):
+    scope["route"] = FakeRoute
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b'{"ok":true}'})
+
+
+async def per_request_us(asgi_app, iterations: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/bench/1"}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    for _ in range(1000):
+        await asgi_app(dict(scope), receive, send)
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for _ in range(iterations // ROUNDS):
+            await asgi_app(dict(scope), receive, send)
+        best = min(best, time.perf_counter() - start)
+    return best / (iterations // ROUNDS) * 1e6
+
+
+def per_query_us(engine, iterations: int) -> float:
+    with engine.connect() as conn:
+        statement = text("SELECT 1")
+        for _ in range(1000):
+            conn.execute(statement)
+        best = float("inf")
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            for _ in range(iterations // ROUNDS):
+                conn.execute(statement)
+            best = min(best, time.perf_counter() - start)
+        return best / (iterations // ROUNDS) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=50000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    bare = asyncio.run(per_request_us(plain_app, n))
+    instrumented = asyncio.run(per_request_us(MetricsMiddleware(plain_app), n))
+
+    plain_engine = create_engine("sqlite://")
+    tracked_engine = create_engine("sqlite://")
+    track_queries(tracked_engine)
+    query_plain = per_query_us(plain_engine, n)
+    query_tracked = per_query_us(tracked_engine, n)
+
+    print("\n=== 指标采集开销（微秒/次） ===")
+    print(f"{'场景':<28}{'无指标':>10}{'有指标':>10}{'开销':>10}")
+    print(f"{'HTTP请求（中间件）':<28}{bare:>10.2f}{instrumented:>10.2f}{instrumented - bare:>10.2f}")
+    print(f"{'SQL语句（事件钩子）':<28}{query_plain:>10.2f}{query_tracked:>10.2f}{query_tracked - query_plain:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
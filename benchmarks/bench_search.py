@@ -0,0 +1,129 @@
+"""全文搜索基准：倒排索引 vs 原有的 LIKE 扫描
+
+在合成语料（默认10万篇中文文章）上比较每次查询的延迟，并报告索引构建耗时与内存占用。
+
+用法: python -m benchmarks.bench_search [--posts 100000] [--content-words 60] [--repeat 5]
+"""
+
+import argparse
+import random
+import resource
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import use_temp_database
+
+use_temp_database()
+
+from sqlalchemy import func, insert, or_, update  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models.blog import BlogPost  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.core.search import SearchIndex  # noqa: E402
+
+VOCABULARY = (
+    "性能 优化 数据库 索引 缓存 架构 设计 分布式 并发 线程 协程 网络 协议 算法 数据 结构 "
+    "服务 接口 部署 容器 监控 日志 测试 重构 代码 质量 生活 旅行 读书 笔记 随笔 电影 音乐 "
+    "摄影 美食 城市 季节 工作 学习 成长 思考 方法 经验 总结 实践 原理 源码 分析 问题 排查 "
+    "python fastapi mysql redis docker kubernetes linux nginx sqlalchemy pydantic"
+).split()
+
+QUERIES = ["性能优化", "数据库索引", "读书笔记", "fastapi", "分布式缓存架构"]
+
+
+def words(rng, count):
+    return "".join(rng.choice(VOCABULARY) for _ in range(count))
+
+
+def seed(posts, content_words):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    author = User(username="bench", email="bench@example.com", full_name="Bench", password_hash="x")
+    db.add(author)
+    db.commit()
+
+    rng = random.Random(42)
+    # 文章按每分钟一篇依次更新过，增量同步只读取水位线附近与之后修改的文章
+    updated_at = datetime.utcnow() - timedelta(days=1)
+    batch = []
+    for i in range(posts):
+        batch.append({
+            "title": words(rng, 4),
+            "slug": f"post-{i}",
+            "summary": words(rng, 12),
+            "content": words(rng, content_words),
+            "author_id": author.id,
+            "is_published": True,
+            "view_count": 0,
+            "updated_at": updated_at - timedelta(minutes=posts - i),
+        })
+        if len(batch) == 5000:
+            db.execute(insert(BlogPost), batch)
+            batch = []
+    if batch:
+        db.execute(insert(BlogPost), batch)
+    db.commit()
+    db.close()
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return min(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--content-words", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"正在生成 {args.posts} 篇合成文章...")
+    seed(args.posts, args.content_words)
+    db = SessionLocal()
+
+    index = SearchIndex()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    index.build(db)
+    build_seconds = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"索引构建: {build_seconds:.1f}s，常驻内存增长约 {(rss_after - rss_before) / 1024:.0f}MB")
+
+    # 其他进程修改100篇文章后的增量同步
+    db.execute(update(BlogPost).where(BlogPost.id <= 100).values(title=BlogPost.title + "更新", updated_at=func.now()))
+    db.commit()
+    start = time.perf_counter()
+    index.refresh(db)
+    db.commit()
+    print(f"增量同步100篇修改: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    def like_title(q):
+        query = db.query(BlogPost.id).filter(BlogPost.is_published == True, BlogPost.title.ilike(f"%{q}%"))
+        return query.count(), query.order_by(BlogPost.published_at.desc()).limit(10).all()
+
+    def like_all_fields(q):
+        pattern = f"%{q}%"
+        query = db.query(BlogPost.id).filter(
+            BlogPost.is_published == True,
+            or_(BlogPost.title.ilike(pattern), BlogPost.summary.ilike(pattern), BlogPost.content.ilike(pattern))
+        )
+        return query.count(), query.order_by(BlogPost.published_at.desc()).limit(10).all()
+
+    print(f"\n{'查询':<14}{'LIKE标题(ms)':>14}{'LIKE全字段(ms)':>16}{'倒排索引(ms)':>14}{'索引命中数':>12}")
+    for q in QUERIES:
+        like_ms, _ = timed(lambda: like_title(q), args.repeat)
+        like_all_ms, _ = timed(lambda: like_all_fields(q), args.repeat)
+        index_ms, (_, total) = timed(lambda: index.search(q, limit=10), args.repeat)
+        print(f"{q:<14}{like_ms:>14.2f}{like_all_ms:>16.2f}{index_ms:>14.2f}{total:>12}")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""访问统计查询基准：一年的post_daily_views及累计访问量数据上热门文章、每日访问量与汇总写入的耗时
+
+默认10000篇文章、365天，每天约1500篇文章有访问、每篇1-3个来源（长尾分布）。
+
+用法: python -m benchmarks.bench_view_analytics [--posts 10000] [--days 365] [--active 1500] [--requests 200]
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from benchmarks.common import use_temp_database, run_load, print_results
+
+use_temp_database()
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from app.models.analytics import PostDailyView  # noqa: E402
+from app.models.blog import BlogPost  # noqa: E402
+from app.core.view_analytics import (  # noqa: E402
+    REFERRERS, SITE_TOTAL, ViewAnalytics, daily_views, trending_posts
+)
+
+
+def seed(posts: int, days: int, active: int, rng: random.Random) -> int:
+    """按长尾分布生成每日访问量及对应的累计访问量，返回写入的每日访问量行数"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    post_ids = range(1, posts + 1)
+    # 少数文章占大部分访问
+    weights = [1 / rank for rank in post_ids]
+    today = date.today()
+    table = PostDailyView.__table__
+    total = 0
+    db = SessionLocal()
+    db.execute(BlogPost.__table__.insert(), [
+        {"id": post_id, "title": f"文章{post_id}", "slug": f"post-{post_id}", "content": "正文",
+         "is_published": True, "author_id": 1}
+        for post_id in post_ids
+    ])
+    for offset in range(days):
+        day = today - timedelta(days=offset)
+        views = Counter()
+        for post_id in set(rng.choices(post_ids, weights, k=active)):
+            for referrer in rng.sample(REFERRERS, rng.randint(1, 3)):
+                views[(post_id, referrer)] = rng.randint(1, 50)
+        site = Counter()
+        for (post_id, referrer), count in views.items():
+            site[referrer] += count
+        rows = [{"post_id": p, "day": day, "referrer": r, "views": v} for (p, r), v in views.items()]
+        rows += [{"post_id": SITE_TOTAL, "day": day, "referrer": r, "views": v} for r, v in site.items()]
+        db.execute(table.insert(), rows)
+        total += len(rows)
+    # 与迁移0006相同的回填
+    db.execute(text(
+        "INSERT INTO post_view_totals (post_id, total) "
+        "SELECT post_id, SUM(views) FROM post_daily_views WHERE post_id != 0 GROUP BY post_id"
+    ))
+    db.execute(text(
+        "INSERT INTO post_cumulative_views (post_id, day, total) "
+        "SELECT post_id, day, SUM(SUM(views)) OVER (PARTITION BY post_id ORDER BY day) "
+        "FROM post_daily_views WHERE post_id != 0 GROUP BY post_id, day"
+    ))
+    db.commit()
+    db.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--active", type=int, default=1500, help="每天有访问的文章数（抽样次数）")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    start = time.perf_counter()
+    rows = seed(args.posts, args.days, args.active, rng)
+    print(f"写入 {rows} 行每日访问量，耗时 {time.perf_counter() - start:.1f}s")
+
+    today = date.today()
+    db = SessionLocal()
+
+    def window(days):
+        return today - timedelta(days=days - 1), today
+
+    scenarios = {}
+    for days in (1, 7, 30, 365):
+        scenarios[f"热门文章 {days}天"] = lambda d=days: trending_posts(db, *window(d))
+    # 起止日期都不在当天，确认长范围不依赖最近的访问
+    scenarios["热门文章 90天（半年前）"] = lambda: trending_posts(db, today - timedelta(days=179), today - timedelta(days=90))
+    for days in (30, 365):
+        scenarios[f"全站每日访问 {days}天"] = lambda d=days: daily_views(db, *window(d))
+    scenarios["单篇每日访问 365天"] = lambda: daily_views(db, *window(365), post_id=rng.randint(1, args.posts))
+
+    results = {name: run_load(fn, args.requests) for name, fn in scenarios.items()}
+    db.close()
+
+    # 汇总写入：一个刷新周期内约active篇文章、每篇最多3个来源的访问
+    analytics = ViewAnalytics()
+
+    def rollup():
+        for _ in range(args.active * 2):
+            analytics.record(rng.randint(1, args.posts), rng.choice(["", "https://www.bing.com/", "https://t.co/x"]))
+        analytics.flush()
+
+    results[f"汇总写入 {args.active * 2}次访问"] = run_load(rollup, 20)
+
+    print_results(f"post_daily_views {args.posts}篇文章 × {args.days}天", results)
+
+
+if __name__ == "__main__":
+    main()
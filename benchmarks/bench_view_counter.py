@@ -0,0 +1,63 @@
+"""文章详情读取吞吐基准：每次访问直接写库 vs 访问计数写缓冲
+
+用法: python -m benchmarks.bench_view_counter [--requests 2000] [--concurrency 8]
+"""
+
+import argparse
+
+from benchmarks.common import use_temp_database, run_load, print_results
+
+use_temp_database()
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.blog import BlogPost  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.core.view_counter import view_counter  # noqa: E402
+
+
+def seed():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    author = User(username="bench", email="bench@example.com", full_name="Bench", password_hash="x")
+    db.add(author)
+    db.flush()
+    db.add(BlogPost(
+        title="热门文章", slug="hot-post", content="正文" * 2000,
+        author_id=author.id, is_published=True
+    ))
+    db.commit()
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    seed()
+    client = TestClient(app)
+
+    def read_post():
+        assert client.get("/api/blog/posts/hot-post").status_code == 200
+
+    results = {}
+    for name, buffered in (("直接写库 (UPDATE+COMMIT)", False), ("写缓冲 (批量写回)", True)):
+        settings.view_count_buffer = buffered
+        results[name] = run_load(read_post, args.requests, args.concurrency)
+        view_counter.flush()
+
+    print_results(f"GET /api/blog/posts/{{slug}} 并发 {args.concurrency}", results)
+
+    db = SessionLocal()
+    total = db.query(BlogPost.view_count).filter(BlogPost.slug == "hot-post").scalar()
+    db.close()
+    print(f"\n最终view_count: {total}（期望 {args.requests * 2}）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""基准测试公共工具
+
+基准脚本在导入app之前调用use_temp_database()，默认使用临时SQLite文件；
+设置DATABASE_URL环境变量即可改为对MySQL等真实数据库测试。
+"""
+
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Sequence
+
+import httpx
+
+
+def use_temp_database() -> str:
+    """未指定DATABASE_URL时使用临时SQLite数据库，返回实际使用的连接串"""
+    if "DATABASE_URL" not in os.environ:
+        fd, path = tempfile.mkstemp(prefix="myblog-bench-", suffix=".db")
+        os.close(fd)
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return os.environ["DATABASE_URL"]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """计算百分位数（最近秩法）"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_load(fn: Callable[[], None], requests: int, concurrency: int = 1) -> Dict[str, float]:
+    """以指定并发执行fn共requests次，返回吞吐量与延迟分布（毫秒）"""
+    latencies: List[float] = []
+
+    def timed_call(_):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        for i in range(requests):
+            timed_call(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(timed_call, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput": requests / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def start_server(port: int, **env: str) -> subprocess.Popen:
+    """以附加的环境变量（配置项）启动uvicorn子进程，等待健康检查通过后返回"""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--log-level", "warning", "--backlog", "4096"],
+        env=dict(os.environ, **env),
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn启动超时")
+
+
+async def run_http_load(
+    base_url: str,
+    paths: Sequence[str],
+    requests: int,
+    concurrency: int,
+    stop: asyncio.Event = None,
+    json: dict = None,
+    headers: dict = None
+) -> Dict[str, float]:
+    """用concurrency个连接并发请求共requests次（或直到stop被设置），返回吞吐量、延迟分布（毫秒）与状态码计数
+
+    指定json时发送POST请求，否则发送GET请求；headers附加到每个请求（如认证头）。
+    """
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    remaining = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120, headers=headers) as client:
+        async def worker():
+            for i in remaining:
+                if stop is not None and stop.is_set():
+                    return
+                start = time.perf_counter()
+                try:
+                    path = paths[i % len(paths)]
+                    if json is None:
+                        response = await client.get(path)
+                    else:
+                        response = await client.post(path, json=json)
+                except httpx.TransportError:
+                    statuses[0] = statuses.get(0, 0) + 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    completed = sum(statuses.values())
+    return {
+        "requests": completed,
+        "concurrency": concurrency,
+        "throughput": completed / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "statuses": statuses,
+        "errors": completed - statuses.get(200, 0),
+    }
+
+
+def print_results(title: str, results: Dict[str, Dict[str, float]]):
+    """以表格形式输出多组结果"""
+    print(f"\n=== {title} ===")
+    print(f"{'场景':<28}{'吞吐(req/s)':>14}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}")
+    for name, stats in results.items():
+        print(
+            f"{name:<28}{stats['throughput']:>14.1f}{stats['p50_ms']:>10.2f}"
+            f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+        )
@@ -0,0 +1,176 @@
+"""基线：引入迁移之前由create_tables（init_db）创建的原始表结构
+
+在此之前创建的数据库执行 alembic stamp 0001_baseline 标记为该版本，再 alembic upgrade head；
+空数据库也可以直接 alembic upgrade head 建出全部表。
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _timestamps():
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    ]
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String(50), nullable=False),
+        sa.Column("email", sa.String(100), nullable=False),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("full_name", sa.String(100), nullable=False),
+        sa.Column("is_active", sa.Boolean()),
+        *_timestamps(),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "blog_categories",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("slug", sa.String(100), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("color", sa.String(7)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_blog_categories_id", "blog_categories", ["id"])
+    op.create_index("ix_blog_categories_slug", "blog_categories", ["slug"], unique=True)
+
+    op.create_table(
+        "blog_posts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(200), nullable=False),
+        sa.Column("slug", sa.String(200), nullable=False),
+        sa.Column("summary", sa.Text()),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("category_id", sa.Integer(), sa.ForeignKey("blog_categories.id")),
+        sa.Column("author_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("featured_image", sa.String(500)),
+        sa.Column("is_published", sa.Boolean()),
+        sa.Column("view_count", sa.Integer()),
+        *_timestamps(),
+        sa.Column("published_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_blog_posts_id", "blog_posts", ["id"])
+    op.create_index("ix_blog_posts_slug", "blog_posts", ["slug"], unique=True)
+    op.create_index("ix_blog_posts_is_published", "blog_posts", ["is_published"])
+
+    op.create_table(
+        "comments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("post_id", sa.Integer(), sa.ForeignKey("blog_posts.id"), nullable=False),
+        sa.Column("author_name", sa.String(100), nullable=False),
+        sa.Column("author_email", sa.String(100), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("is_approved", sa.Boolean()),
+        sa.Column("ip_address", sa.String(45)),
+        sa.Column("user_agent", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_comments_id", "comments", ["id"])
+    op.create_index("ix_comments_is_approved", "comments", ["is_approved"])
+
+    op.create_table(
+        "messages",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("email", sa.String(100), nullable=False),
+        sa.Column("subject", sa.String(200)),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("is_read", sa.Boolean()),
+        sa.Column("ip_address", sa.String(45)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_messages_id", "messages", ["id"])
+    op.create_index("ix_messages_is_read", "messages", ["is_read"])
+
+    op.create_table(
+        "resume_sections",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "section_type",
+            sa.Enum("personal_info", "education", "experience", "skills", "projects", name="sectiontype"),
+            nullable=False
+        ),
+        sa.Column("title", sa.String(200), nullable=False),
+        sa.Column("content", sa.Text()),
+        sa.Column("order_index", sa.Integer()),
+        sa.Column("is_visible", sa.Boolean()),
+        *_timestamps(),
+    )
+    op.create_index("ix_resume_sections_id", "resume_sections", ["id"])
+    op.create_index("ix_resume_sections_section_type", "resume_sections", ["section_type"])
+    op.create_index("ix_resume_sections_order_index", "resume_sections", ["order_index"])
+
+    op.create_table(
+        "personal_info",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("email", sa.String(255)),
+        sa.Column("telephone", sa.String(50)),
+        sa.Column("address", sa.String(500)),
+        sa.Column("avatar_url", sa.String(500)),
+        sa.Column("bio", sa.Text()),
+        sa.Column("website", sa.String(255)),
+        sa.Column("github", sa.String(255)),
+        sa.Column("linkedin", sa.String(255)),
+        sa.Column("is_visible", sa.Boolean()),
+        *_timestamps(),
+    )
+    op.create_index("ix_personal_info_id", "personal_info", ["id"])
+
+    op.create_table(
+        "education",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("school_name", sa.String(200), nullable=False),
+        sa.Column("degree", sa.String(100), nullable=False),
+        sa.Column("major", sa.String(200), nullable=False),
+        sa.Column("start_date", sa.String(20), nullable=False),
+        sa.Column("end_date", sa.String(20)),
+        sa.Column("gpa", sa.String(20)),
+        sa.Column("description", sa.Text()),
+        sa.Column("order_index", sa.Integer()),
+        sa.Column("is_visible", sa.Boolean()),
+        *_timestamps(),
+    )
+    op.create_index("ix_education_id", "education", ["id"])
+    op.create_index("ix_education_order_index", "education", ["order_index"])
+
+    op.create_table(
+        "experience",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("company", sa.String(200), nullable=False),
+        sa.Column("position", sa.String(200), nullable=False),
+        sa.Column("start_date", sa.String(20), nullable=False),
+        sa.Column("end_date", sa.String(20)),
+        sa.Column("description", sa.Text()),
+        sa.Column("order_index", sa.Integer()),
+        sa.Column("is_visible", sa.Boolean()),
+        *_timestamps(),
+    )
+    op.create_index("ix_experience_id", "experience", ["id"])
+    op.create_index("ix_experience_order_index", "experience", ["order_index"])
+
+
+def downgrade():
+    for table in (
+        "experience", "education", "personal_info", "resume_sections",
+        "messages", "comments", "blog_posts", "blog_categories", "users",
+    ):
+        op.drop_table(table)
+    sa.Enum(name="sectiontype").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,49 @@
+"""文章计数表、内容版本号表、简历快照表与游标分页索引
+
+计数行与版本号行在首次读写时按实际数据初始化，快照缺失时读取简历按实时数据生成；
+升级后可执行 python -m app.scripts.rebuild_counters 与 python -m app.scripts.rebuild_resume_snapshot 预先写入。
+
+Revision ID: 0002_counters_versions_snapshots
+Revises: 0001_baseline
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+
+revision = "0002_counters_versions_snapshots"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "blog_post_counters",
+        sa.Column("category_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("published_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_table(
+        "content_versions",
+        sa.Column("key", sa.String(50), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_table(
+        "resume_snapshots",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("data", sa.Text().with_variant(MEDIUMTEXT(), "mysql"), nullable=False),
+        sa.Column("built_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    # 游标分页的(published_at, id)定位索引
+    op.create_index("ix_blog_posts_published_at_id", "blog_posts", ["published_at", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_blog_posts_published_at_id", table_name="blog_posts")
+    op.drop_table("resume_snapshots")
+    op.drop_table("content_versions")
+    op.drop_table("blog_post_counters")
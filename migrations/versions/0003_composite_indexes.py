@@ -0,0 +1,54 @@
+"""评论、留言与文章列表的组合索引
+
+按接口的筛选与排序条件建立组合索引，避免按单列索引取出后再filesort；
+被组合索引前缀覆盖的单列索引随之删除。
+
+Revision ID: 0003_composite_indexes
+Revises: 0002_counters_versions_snapshots
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = "0003_composite_indexes"
+down_revision = "0002_counters_versions_snapshots"
+branch_labels = None
+depends_on = None
+
+# (索引名, 表名, 列)
+INDEXES = [
+    # GET /api/blog/posts/{post_id}/comments、文章详情：post_id + is_approved，按created_at倒序
+    ("ix_comments_post_id_is_approved_created_at", "comments", ["post_id", "is_approved", "created_at"]),
+    # 待审批评论列表与仪表板
+    ("ix_comments_is_approved_created_at", "comments", ["is_approved", "created_at"]),
+    # 仪表板未读留言
+    ("ix_messages_is_read_created_at", "messages", ["is_read", "created_at"]),
+    # 留言列表
+    ("ix_messages_created_at", "messages", ["created_at"]),
+    # 已发布文章列表（偏移与游标分页）
+    ("ix_blog_posts_is_published_published_at", "blog_posts", ["is_published", "published_at"]),
+    # 按分类的已发布文章列表与分类计数
+    ("ix_blog_posts_is_published_category_id_published_at", "blog_posts",
+     ["is_published", "category_id", "published_at"]),
+]
+
+# 被上面的组合索引覆盖的单列索引
+REPLACED = [
+    ("ix_comments_is_approved", "comments", ["is_approved"]),
+    ("ix_messages_is_read", "messages", ["is_read"]),
+    ("ix_blog_posts_is_published", "blog_posts", ["is_published"]),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+    for name, table, _ in REPLACED:
+        op.drop_index(name, table_name=table)
+
+
+def downgrade():
+    for name, table, columns in REPLACED:
+        op.create_index(name, table, columns)
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
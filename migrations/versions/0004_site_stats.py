@@ -0,0 +1,29 @@
+"""仪表板统计表site_stats
+
+统计行在首次写操作或首次核对（rebuild_counters、定期核对任务）时按实际数据初始化。
+
+Revision ID: 0004_site_stats
+Revises: 0003_composite_indexes
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_site_stats"
+down_revision = "0003_composite_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "site_stats",
+        sa.Column("key", sa.String(50), primary_key=True),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade():
+    op.drop_table("site_stats")
@@ -0,0 +1,33 @@
+"""文章每日访问量表post_daily_views
+
+Revision ID: 0005_post_daily_views
+Revises: 0004_site_stats
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_post_daily_views"
+down_revision = "0004_site_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "post_daily_views",
+        sa.Column("post_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("referrer", sa.String(16), primary_key=True),
+        sa.Column("views", sa.Integer(), nullable=False),
+        sqlite_with_rowid=False,
+    )
+    op.create_index(
+        "ix_post_daily_views_day_post_id_views", "post_daily_views", ["day", "post_id", "views"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_post_daily_views_day_post_id_views", table_name="post_daily_views")
+    op.drop_table("post_daily_views")
@@ -0,0 +1,49 @@
+"""文章累计访问量表post_cumulative_views与总访问量表post_view_totals
+
+按已有的每日访问量回填，之后由访问统计汇总写入时在同一事务中维护。
+
+Revision ID: 0006_view_rollups
+Revises: 0005_post_daily_views
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_view_rollups"
+down_revision = "0005_post_daily_views"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "post_cumulative_views",
+        sa.Column("post_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("total", sa.BigInteger(), nullable=False),
+        sqlite_with_rowid=False,
+    )
+    op.create_table(
+        "post_view_totals",
+        sa.Column("post_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("total", sa.BigInteger(), nullable=False),
+    )
+    op.create_index("ix_post_view_totals_total_post_id", "post_view_totals", ["total", "post_id"])
+
+    # post_id为0的全站合计行不计入
+    op.execute(
+        "INSERT INTO post_view_totals (post_id, total) "
+        "SELECT post_id, SUM(views) FROM post_daily_views WHERE post_id != 0 GROUP BY post_id"
+    )
+    op.execute(
+        "INSERT INTO post_cumulative_views (post_id, day, total) "
+        "SELECT post_id, day, SUM(SUM(views)) OVER (PARTITION BY post_id ORDER BY day) "
+        "FROM post_daily_views WHERE post_id != 0 GROUP BY post_id, day"
+    )
+
+
+def downgrade():
+    op.drop_index("ix_post_view_totals_total_post_id", table_name="post_view_totals")
+    op.drop_table("post_view_totals")
+    op.drop_table("post_cumulative_views")
@@ -0,0 +1,156 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.pool import NullPool
+from app.main import app
+from app.api import blog as blog_api
+from app.api import auth_router, async_blog_router, async_resume_router, async_admin_router
+from app.database import Base, engine, get_async_db, create_async_db_engine
+from app.core.security import get_password_hash
+from app.core.cache import response_cache
+from app.core.search import search_index
+from app.core.resume_snapshot import resume_snapshot
+from app.models.user import User
+from app.models.blog import BlogCategory, BlogPost
+
+# 同步栈与异步栈的测试客户端
+client = TestClient(app)
+
+async_app = FastAPI()
+async_app.include_router(auth_router)
+async_app.include_router(async_blog_router)
+async_app.include_router(async_resume_router)
+async_app.include_router(async_admin_router)
+async_client = TestClient(async_app)
+
+
+# 测试数据库设置
+@pytest.fixture(scope="module")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    response_cache.clear()
+    search_index.clear()
+    resume_snapshot.clear()
+
+    # TestClient每个请求使用新的事件循环，异步连接不能跨请求复用
+    async_engine = create_async_db_engine(str(engine.url), poolclass=NullPool)
+    AsyncTestingSession = async_sessionmaker(bind=async_engine, autoflush=False)
+
+    async def override_get_async_db():
+        async with AsyncTestingSession() as db:
+            yield db
+
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+
+    from sqlalchemy.orm import sessionmaker
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+
+    author = User(
+        username="asyncuser",
+        email="async@example.com",
+        full_name="Async User",
+        password_hash=get_password_hash("asyncpassword")
+    )
+    category = BlogCategory(name="异步", slug="async")
+    db.add_all([author, category])
+    db.commit()
+    db.add_all([
+        BlogPost(
+            title=f"异步文章 {i}",
+            slug=f"async-post-{i}",
+            content=f"正文 {i}",
+            author_id=author.id,
+            category_id=category.id,
+            is_published=True
+        )
+        for i in range(3)
+    ])
+    db.commit()
+
+    yield db
+
+    async_app.dependency_overrides.clear()
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def _auth_headers():
+    """登录并返回认证头"""
+    response = async_client.post("/api/auth/login", data={
+        "username": "asyncuser",
+        "password": "asyncpassword"
+    })
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_async_routes_match_sync_routes(test_db):
+    """测试异步路由与同步路由的路径与响应一致"""
+    assert {route.path for route in async_blog_router.routes} >= {"/api/blog/posts", "/api/blog/posts/{slug}"}
+
+    response_cache.clear()
+    async_listing = async_client.get("/api/blog/posts")
+    response_cache.clear()
+    sync_listing = client.get("/api/blog/posts")
+    assert async_listing.status_code == 200
+    assert async_listing.json() == sync_listing.json()
+
+    response = async_client.get("/api/blog/posts/async-post-0")
+    assert response.status_code == 200
+    assert response.json()["category"]["slug"] == "async"
+
+    assert async_client.get("/api/blog/posts/missing").status_code == 404
+    assert async_client.get("/api/resume").status_code == 200
+
+
+def test_async_writes_and_auth(test_db):
+    """测试异步栈的认证依赖与写操作"""
+    assert async_client.get("/api/admin/dashboard").status_code == 401
+
+    headers = _auth_headers()
+    response = async_client.post("/api/blog/posts", headers=headers, json={
+        "title": "异步写入",
+        "content": "正文",
+        "category_id": test_db.query(BlogCategory.id).scalar(),
+        "is_published": True
+    })
+    assert response.status_code == 200
+    assert response.json()["category"]["slug"] == "async"
+
+    dashboard = async_client.get("/api/admin/dashboard", headers=headers)
+    assert dashboard.status_code == 200
+    assert dashboard.json()["stats"]["total_posts"] == 4
+
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def test_async_stack_offloads_blocking_calls(test_db, monkeypatch):
+    """测试异步栈中的全文检索移到线程池执行，不在事件循环线程上计算"""
+    on_loop = []
+    search = search_index.search
+
+    def recording_search(*args, **kwargs):
+        on_loop.append(_on_event_loop())
+        return search(*args, **kwargs)
+
+    monkeypatch.setattr(search_index, "search", recording_search)
+    response = async_client.get("/api/blog/search", params={"q": "异步文章"})
+    assert response.status_code == 200
+    assert response.json()["total"] == 3
+    assert client.get("/api/blog/search", params={"q": "异步文章"}).json()["total"] == 3
+    assert on_loop == [False, False]
+
+    # 对照：处理函数中未经run_blocking的代码（高亮前的分词）运行在事件循环线程上
+    tokenize = blog_api.tokenize
+    monkeypatch.setattr(blog_api, "tokenize", lambda text: on_loop.append(_on_event_loop()) or tokenize(text))
+    async_client.get("/api/blog/search", params={"q": "异步文章"})
+    assert on_loop[-2:] == [False, True]
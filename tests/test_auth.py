@@ -1,9 +1,13 @@
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
 from app.database import get_db, Base, engine
 from app.core.security import get_password_hash
 from app.models.user import User
+from app.core.hashing import PasswordHasher, password_hasher
+from app.core.principals import principal_cache
+from tests.utils import assert_num_queries
 
 # 测试客户端
 client = TestClient(app)
@@ -13,6 +17,7 @@ client = TestClient(app)
 def test_db():
     # 创建测试表
     Base.metadata.create_all(bind=engine)
+    principal_cache.clear()
     
     # 创建测试数据
     from sqlalchemy.orm import sessionmaker
@@ -85,4 +90,80 @@ def test_protected_endpoint_with_token(test_db):
     
     assert response.status_code == 200
     data = response.json()
-    assert data["username"] == "testuser"
\ No newline at end of file
+    assert data["username"] == "testuser"
+
+
+def test_login_json_wrong_password(test_db):
+    """测试JSON登录密码错误"""
+    response = client.post("/api/auth/login/json", json={
+        "username": "testuser",
+        "password": "wrongpassword"
+    })
+    
+    assert response.status_code == 401
+
+
+def test_login_rejected_when_hasher_saturated(test_db, monkeypatch):
+    """测试密码校验执行器饱和时登录立即返回429"""
+    monkeypatch.setattr(password_hasher, "_in_flight", password_hasher.capacity)
+    
+    response = client.post("/api/auth/login", data={
+        "username": "testuser",
+        "password": "testpassword"
+    })
+    
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_hasher_pool_uses_spawned_workers():
+    """测试密码校验进程池以spawn方式启动工作进程，不复制父进程中后台线程持有的锁"""
+    hasher = PasswordHasher(workers=1)
+    hasher.start()
+    try:
+        assert hasher._executor._mp_context.get_start_method() == "spawn"
+        hashed = get_password_hash("spawnpassword")
+        assert asyncio.run(hasher.verify("spawnpassword", hashed))
+        assert not asyncio.run(hasher.verify("wrongpassword", hashed))
+    finally:
+        hasher.shutdown()
+
+
+def _login(username: str, password: str) -> dict:
+    """登录并返回认证头"""
+    response = client.post("/api/auth/login", data={"username": username, "password": password})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_principal_cache_skips_user_query(test_db):
+    """测试已认证用户缓存：首次认证查询users表，之后的请求不再查询"""
+    principal_cache.clear()
+    headers = _login("testuser", "testpassword")
+    
+    with assert_num_queries(1):
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+    with assert_num_queries(0):
+        response = client.get("/api/auth/me", headers=headers)
+    assert response.json()["username"] == "testuser"
+
+
+def test_toggle_user_invalidates_principal(test_db):
+    """测试禁用用户后缓存立即失效"""
+    other = User(
+        username="otheruser",
+        email="other@example.com",
+        full_name="Other User",
+        password_hash=get_password_hash("otherpassword")
+    )
+    test_db.add(other)
+    test_db.commit()
+    
+    other_headers = _login("otheruser", "otherpassword")
+    assert client.get("/api/auth/me", headers=other_headers).status_code == 200
+    
+    response = client.post(f"/api/admin/users/{other.id}/toggle-active", headers=_login("testuser", "testpassword"))
+    assert response.status_code == 200
+    assert client.get("/api/auth/me", headers=other_headers).status_code == 400
+    
+    test_db.delete(other)
+    test_db.commit()
@@ -0,0 +1,405 @@
+import time
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import Base, engine
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.models.blog import BlogCategory, BlogPost, BlogPostCounter
+from app.core import counters
+from app.core.counters import rebuild_published_counts
+from app.core.site_stats import rebuild_site_stats
+from app.core.view_counter import view_counter
+from app.core.search import SearchIndex, search_index
+from app.core.cache import response_cache
+from app.core.principals import principal_cache
+from tests.utils import assert_num_queries
+
+# 测试客户端
+client = TestClient(app)
+
+
+# 测试数据库设置
+@pytest.fixture(scope="module")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    search_index.clear()
+    response_cache.clear()
+    principal_cache.clear()
+
+    from sqlalchemy.orm import sessionmaker
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+
+    author = User(
+        username="blogger",
+        email="blogger@example.com",
+        full_name="Blogger",
+        password_hash=get_password_hash("bloggerpassword")
+    )
+    category = BlogCategory(name="技术文章", slug="technology")
+    db.add_all([author, category])
+    db.commit()
+
+    # 部分文章共用同一发布时间，用于验证游标的id兜底排序
+    base_time = datetime(2024, 1, 1, 12, 0, 0)
+    posts = [
+        BlogPost(
+            title=f"文章 {i}",
+            slug=f"post-{i}",
+            summary=f"摘要 {i}",
+            content=f"正文 {i}",
+            author_id=author.id,
+            category_id=category.id if i % 2 == 0 else None,
+            is_published=i != 24,
+            published_at=base_time + timedelta(hours=i // 3) if i != 24 else None
+        )
+        for i in range(25)
+    ]
+    db.add_all(posts)
+    db.commit()
+
+    yield db
+
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_offset_pagination(test_db):
+    """测试页码分页"""
+    response = client.get("/api/blog/posts", params={"page": 2, "size": 10})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 24
+    assert data["pages"] == 3
+    assert len(data["items"]) == 10
+
+
+def test_cursor_pagination_walks_all_posts(test_db):
+    """测试游标分页可以无重复、无遗漏地遍历全部文章"""
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        response = client.get("/api/blog/posts", params={"cursor": cursor, "size": 7})
+        assert response.status_code == 200
+        data = response.json()
+        assert "total" not in data
+        seen.extend(item["id"] for item in data["items"])
+        cursor = data["next_cursor"]
+
+    assert len(seen) == 24
+    assert len(set(seen)) == 24
+
+    expected = test_db.query(BlogPost.id)\
+                      .filter(BlogPost.is_published == True)\
+                      .order_by(BlogPost.published_at.desc(), BlogPost.id.desc())\
+                      .all()
+    assert seen == [row.id for row in expected]
+
+
+def test_cursor_pagination_includes_unpublished_last(test_db):
+    """测试未设置发布时间的文章排在游标分页末尾"""
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        data = client.get("/api/blog/posts", params={
+            "cursor": cursor, "size": 10, "published_only": False
+        }).json()
+        seen.extend(item["slug"] for item in data["items"])
+        cursor = data["next_cursor"]
+
+    assert len(seen) == 25
+    assert seen[-1] == "post-24"
+
+
+def test_invalid_cursor(test_db):
+    """测试无效游标返回400"""
+    response = client.get("/api/blog/posts", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+def _auth_headers():
+    """登录并返回认证头"""
+    response = client.post("/api/auth/login", data={
+        "username": "blogger",
+        "password": "bloggerpassword"
+    })
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_published_counters_follow_writes(test_db):
+    """测试文章增删改后列表总数与计数表保持一致"""
+    headers = _auth_headers()
+    category_id = test_db.query(BlogCategory.id).scalar()
+
+    response = client.post("/api/blog/posts", headers=headers, json={
+        "title": "计数测试",
+        "content": "正文",
+        "category_id": category_id,
+        "is_published": True
+    })
+    assert response.status_code == 200
+    assert response.json()["published_at"] is not None
+    assert response.json()["content"] == "正文"
+    post_id = response.json()["id"]
+
+    assert client.get("/api/blog/posts").json()["total"] == 25
+    assert client.get("/api/blog/posts", params={"category": category_id}).json()["total"] == 13
+
+    client.put(f"/api/blog/posts/{post_id}", headers=headers, json={"category_id": None, "is_published": False})
+    assert client.get("/api/blog/posts").json()["total"] == 24
+    assert client.get("/api/blog/posts", params={"category": category_id}).json()["total"] == 12
+
+    client.put(f"/api/blog/posts/{post_id}", headers=headers, json={"is_published": True})
+    assert client.get("/api/blog/posts").json()["total"] == 25
+
+    client.delete(f"/api/blog/posts/{post_id}", headers=headers)
+    assert client.get("/api/blog/posts").json()["total"] == 24
+    assert client.get("/api/blog/posts", params={"category": category_id}).json()["total"] == 12
+
+    # 计数没有偏差，重建不应产生修正
+    assert rebuild_published_counts(test_db) == {}
+
+
+def test_counter_first_insert_race(test_db, monkeypatch):
+    """测试并发的首次写入：计数行已由另一事务插入时改为增量更新，而不是主键冲突"""
+    scope = 9999
+    insert_ignore = counters.insert_ignore
+
+    def concurrent_insert(db, table, row):
+        # 模拟另一事务在本事务发现计数行缺失之后抢先插入并提交
+        db.execute(table.insert().values(category_id=scope, published_count=5))
+        return insert_ignore(db, table, row)
+
+    monkeypatch.setattr(counters, "insert_ignore", concurrent_insert)
+    counters.track_published_change(test_db, None, (True, scope))
+    test_db.commit()
+    assert test_db.get(BlogPostCounter, scope).published_count == 6
+
+    test_db.query(BlogPostCounter).filter(BlogPostCounter.category_id == scope).delete()
+    test_db.commit()
+
+
+def test_view_count_buffered_until_flush(test_db):
+    """测试访问计数先进入缓冲区，刷新后批量写回；命中响应缓存的访问同样计数"""
+    view_counter.flush()
+    response_cache.clear()
+
+    def stored_view_count():
+        return test_db.query(BlogPost.view_count).filter(BlogPost.slug == "post-0").scalar()
+
+    before = stored_view_count()
+    response = client.get("/api/blog/posts/post-0")
+    assert response.json()["view_count"] == before + 1
+    assert client.get("/api/blog/posts/post-0").headers["X-Cache"] == "HIT"
+    assert stored_view_count() == before
+
+    assert view_counter.flush() == 1
+    assert stored_view_count() == before + 2
+
+
+def test_search_ranks_and_highlights(test_db):
+    """测试全文搜索覆盖正文、按相关度排序并高亮命中词"""
+    headers = _auth_headers()
+    client.post("/api/blog/posts", headers=headers, json={
+        "title": "FastAPI性能优化实践",
+        "slug": "fastapi-tuning",
+        "content": "本文介绍数据库索引与缓存的性能优化方法。",
+        "is_published": True
+    })
+    client.post("/api/blog/posts", headers=headers, json={
+        "title": "读书笔记",
+        "slug": "reading-notes",
+        "content": "最近读了一本关于系统性能优化的书。",
+        "is_published": True
+    })
+
+    response = client.get("/api/blog/search", params={"q": "性能优化"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert data["items"][0]["post"]["slug"] == "fastapi-tuning"
+    assert data["items"][0]["title_highlight"] == "FastAPI<mark>性能优化</mark>实践"
+    assert "<mark>性能优化</mark>" in data["items"][1]["snippet"]
+
+    listing = client.get("/api/blog/posts", params={"search": "fastapi"}).json()
+    assert [item["slug"] for item in listing["items"]] == ["fastapi-tuning"]
+
+    # 更新与删除增量同步到索引
+    post_id = listing["items"][0]["id"]
+    client.put(f"/api/blog/posts/{post_id}", headers=headers, json={"title": "缓存设计"})
+    assert client.get("/api/blog/search", params={"q": "fastapi"}).json()["total"] == 0
+    client.delete(f"/api/blog/posts/{post_id}", headers=headers)
+    assert client.get("/api/blog/search", params={"q": "缓存"}).json()["total"] == 0
+
+
+
+def test_search_index_syncs_other_workers(test_db):
+    """测试后台线程构建索引，并按更新时间增量同步其他进程的新增、修改与删除"""
+    index = SearchIndex(refresh_interval=3600)
+    index.start()
+    try:
+        for _ in range(100):
+            if index.built:
+                break
+            time.sleep(0.05)
+        assert index.ensure_fresh()
+
+        # 模拟其他进程直接写入数据库
+        post = BlogPost(title="消息队列入门", slug="queue-intro", content="介绍消息队列。", is_published=True, author_id=1)
+        test_db.add(post)
+        test_db.commit()
+        assert index.search("消息队列")[1] == 0
+        index.sync()
+        assert index.search("消息队列")[0][0][0] == post.id
+
+        post.title = "事件总线入门"
+        test_db.commit()
+        index.sync()
+        assert index.search("事件总线")[0][0][0] == post.id
+
+        test_db.delete(post)
+        test_db.commit()
+        index.sync()
+        assert index.search("消息队列")[1] == 0
+        assert len(index) == test_db.query(BlogPost).count()
+    finally:
+        index.stop()
+
+
+def test_post_endpoints_query_counts(test_db):
+    """测试文章相关接口的SQL语句数量固定，分类随文章JOIN取回而不是逐条懒加载"""
+    rebuild_published_counts(test_db)
+    response_cache.clear()
+
+    # 版本号 + 计数表 + 当前页，列表查询不取正文
+    with assert_num_queries(3) as statements:
+        response = client.get("/api/blog/posts", params={"size": 20})
+    assert any(item["category"] for item in response.json()["items"])
+    assert not any("blog_posts.content" in statement for statement in statements)
+
+    with assert_num_queries(2):
+        client.get("/api/blog/posts", params={"cursor": "", "size": 20})
+
+    # 版本号 + 文章（含分类）+ 已批准评论
+    with assert_num_queries(3):
+        response = client.get("/api/blog/posts/post-0")
+    assert response.json()["category"]["slug"] == "technology"
+
+    with assert_num_queries(2):
+        client.get("/api/blog/categories")
+
+
+def test_admin_dashboard_query_count(test_db):
+    """测试管理后台仪表板的SQL语句数量"""
+    headers = _auth_headers()
+    principal_cache.clear()
+    rebuild_site_stats(test_db)
+
+    # 用户认证 + 统计表 + 2个列表 + 热门文章 + 每日访问量（没有热门文章时不再加载文章）
+    with assert_num_queries(6):
+        response = client.get("/api/admin/dashboard", headers=headers)
+    assert response.status_code == 200
+
+    # 已认证用户缓存命中后不再查询users表
+    with assert_num_queries(5):
+        client.get("/api/admin/dashboard", headers=headers)
+
+
+def test_response_cache_hits_and_invalidation(test_db):
+    """测试公开读接口命中缓存时不访问数据库，写操作按标签精确失效"""
+    response_cache.clear()
+    headers = _auth_headers()
+
+    first = client.get("/api/blog/posts", params={"size": 5})
+    assert first.headers["X-Cache"] == "MISS"
+    # 命中缓存时按间隔读取一次版本号，间隔内的命中不访问数据库
+    client.get("/api/blog/posts", params={"size": 5})
+    with assert_num_queries(0):
+        second = client.get("/api/blog/posts", params={"size": 5})
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+
+    client.get("/api/blog/categories")
+    client.get("/api/blog/posts/post-2")
+    category_id = test_db.query(BlogCategory.id).scalar()
+
+    # 修改分类：分类列表、文章列表与详情中嵌套的分类都需要失效
+    client.put(f"/api/blog/categories/{category_id}", headers=headers, json={"name": "技术"})
+    assert client.get("/api/blog/categories").json()[0]["name"] == "技术"
+    assert client.get("/api/blog/posts/post-2").json()["category"]["name"] == "技术"
+
+    # 修改文章不影响分类列表；内存后端按文章版本号失效全部文章列表与详情
+    client.get("/api/blog/posts/post-4")
+    post_id = test_db.query(BlogPost.id).filter(BlogPost.slug == "post-2").scalar()
+    client.put(f"/api/blog/posts/{post_id}", headers=headers, json={"title": "新标题"})
+    assert client.get("/api/blog/posts/post-2").json()["title"] == "新标题"
+    assert client.get("/api/blog/categories").headers["X-Cache"] == "HIT"
+    assert client.get("/api/blog/posts/post-4").headers["X-Cache"] == "MISS"
+    assert client.get("/api/blog/posts", params={"size": 5}).headers["X-Cache"] == "MISS"
+
+    stats = client.get("/api/admin/cache/stats", headers=headers).json()
+    assert stats["hits"] >= 2
+    assert stats["invalidations"] >= 3
+
+
+def test_conditional_requests(test_db):
+    """测试条件请求：ETag未变时返回304，命中缓存时不访问数据库，写操作后ETag变化"""
+    response_cache.clear()
+    headers = _auth_headers()
+
+    # 未命中缓存时只查询版本号即可返回304
+    listing = client.get("/api/blog/posts", params={"size": 5})
+    etag = listing.headers["ETag"]
+    response_cache.clear()
+    with assert_num_queries(1):
+        response = client.get("/api/blog/posts", params={"size": 5}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    client.get("/api/blog/posts", params={"size": 5})
+    with assert_num_queries(0):
+        response = client.get("/api/blog/posts", params={"size": 5}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # 不同查询参数的响应使用不同的ETag
+    assert client.get("/api/blog/posts", params={"size": 6}).headers["ETag"] != etag
+
+    detail = client.get("/api/blog/posts/post-3")
+    response = client.get("/api/blog/posts/post-3", headers={"If-None-Match": detail.headers["ETag"]})
+    assert response.status_code == 304
+
+    categories = client.get("/api/blog/categories")
+    response = client.get("/api/blog/categories", headers={"If-Modified-Since": categories.headers["Last-Modified"]})
+    assert response.status_code == 304
+
+    post_id = test_db.query(BlogPost.id).filter(BlogPost.slug == "post-3").scalar()
+    client.put(f"/api/blog/posts/{post_id}", headers=headers, json={"summary": "新摘要"})
+
+    response = client.get("/api/blog/posts", params={"size": 5}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    response = client.get("/api/blog/posts/post-3", headers={"If-None-Match": detail.headers["ETag"]})
+    assert response.status_code == 200
+    assert response.json()["summary"] == "新摘要"
+
+    # 文章修改不影响分类列表的校验器
+    response = client.get("/api/blog/categories", headers={"If-None-Match": categories.headers["ETag"]})
+    assert response.status_code == 304
+
+
+def test_pool_metrics_by_endpoint(test_db):
+    """测试连接池指标按接口记录连接借出"""
+    headers = _auth_headers()
+    response_cache.clear()
+    client.get("/api/blog/posts/post-1")
+
+    metrics = client.get("/api/admin/metrics/pool", headers=headers).json()
+    pool = metrics["pools"]["primary"]
+    assert pool["size"] == 5
+    assert pool["checkouts"] >= 1
+    assert pool["timeouts"] == 0
+    assert metrics["endpoints"]["primary GET /api/blog/posts/{slug}"]["checkouts"] >= 1
@@ -0,0 +1,108 @@
+import time
+import pytest
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, engine
+from app.core.cache import CacheEntry, MemoryCacheBackend, ResponseCache, load_versions
+from app.core import versions
+from app.core.versions import CATEGORIES, POSTS, bump_versions, get_versions
+from app.schemas.blog import BlogCategoryList
+
+
+def test_memory_backend_lru_eviction():
+    """测试超出容量时淘汰最久未使用的条目"""
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set("a", CacheEntry(b"1"), ttl=60, tags=["t"])
+    backend.set("b", CacheEntry(b"2"), ttl=60, tags=["t"])
+    assert backend.get("a").body == b"1"
+
+    backend.set("c", CacheEntry(b"3"), ttl=60, tags=["t"])
+
+    assert backend.get("b") is None
+    assert backend.get("a") is not None
+    assert backend.get("c") is not None
+
+
+def test_memory_backend_ttl():
+    """测试过期条目不再返回"""
+    backend = MemoryCacheBackend()
+    backend.set("a", CacheEntry(b"1"), ttl=0, tags=[])
+    time.sleep(0.01)
+
+    assert backend.get("a") is None
+
+
+def test_memory_backend_tag_invalidation():
+    """测试按标签失效只影响带该标签的条目"""
+    backend = MemoryCacheBackend()
+    backend.set("list", CacheEntry(b"1"), ttl=60, tags=["posts", "categories"])
+    backend.set("detail", CacheEntry(b"2"), ttl=60, tags=["post:1", "categories"])
+    backend.set("other", CacheEntry(b"3"), ttl=60, tags=["post:2"])
+
+    assert backend.invalidate_tags(["posts", "post:1"]) == 2
+
+    assert backend.get("list") is None
+    assert backend.get("detail") is None
+    assert backend.get("other") is not None
+
+
+def test_replica_reads_not_cached_right_after_invalidation():
+    """测试标签刚失效时从库读到的结果不写入缓存，主库结果照常缓存"""
+    cache = ResponseCache(MemoryCacheBackend(), ttl=60, replica_lag_window=60)
+    cache.invalidate("categories")
+
+    cache.store("replica", BlogCategoryList([]), tags=["categories"], from_replica=True)
+    cache.store("primary", BlogCategoryList([]), tags=["categories"])
+    cache.store("other", BlogCategoryList([]), tags=["posts"], from_replica=True)
+
+    assert cache.get("replica") is None
+    assert cache.get("primary") is not None
+    assert cache.get("other") is not None
+
+
+@pytest.fixture
+def versions_db():
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_memory_caches_in_other_processes_follow_content_versions(versions_db):
+    """测试两个进程的内存缓存共享数据库：一个进程写入并失效后，另一个进程的旧条目按版本号失效"""
+    workers = [
+        ResponseCache(MemoryCacheBackend(), ttl=60, versions_loader=load_versions, version_check_interval=0)
+        for _ in range(2)
+    ]
+    snapshot = get_versions(versions_db, [POSTS, CATEGORIES])
+    current = {key: version for key, (version, _) in snapshot.items()}
+    for cache in workers:
+        cache.store("/api/blog/posts?", BlogCategoryList([]), tags=["posts"], versions=current)
+        assert cache.get("/api/blog/posts?") is not None
+
+    # 第一个进程写入文章：递增版本号并失效本进程的条目
+    bump_versions(versions_db, POSTS)
+    versions_db.commit()
+    workers[0].invalidate("posts")
+
+    assert workers[0].get("/api/blog/posts?") is None
+    assert workers[1].get("/api/blog/posts?") is None
+
+    # 不带版本号的结果无法校验，不写入缓存
+    workers[1].store("/api/blog/categories?", BlogCategoryList([]), tags=["categories"])
+    assert workers[1].get("/api/blog/categories?") is None
+
+
+def test_version_first_insert_race(versions_db, monkeypatch):
+    """测试并发的首次写入：版本行已由另一事务插入时改为递增，而不是主键冲突"""
+    insert_ignore = versions.insert_ignore
+
+    def concurrent_insert(db, table, row):
+        # 模拟另一事务在本事务发现版本行缺失之后抢先插入并提交
+        db.execute(table.insert().values(key=row["key"], version=1, updated_at=row["updated_at"]))
+        return insert_ignore(db, table, row)
+
+    monkeypatch.setattr(versions, "insert_ignore", concurrent_insert)
+    bump_versions(versions_db, POSTS)
+    versions_db.commit()
+    assert get_versions(versions_db, [POSTS])[POSTS][0] == 2
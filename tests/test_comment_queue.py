@@ -0,0 +1,113 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.config import settings
+from app.database import Base, engine
+from app.core.comment_queue import CommentIngestQueue, MemoryCommentStore, comment_queue
+from app.models.user import User
+from app.models.blog import BlogPost, Comment
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    author = User(username="queue", email="queue@example.com", full_name="Queue", password_hash="x")
+    db.add(author)
+    db.commit()
+    db.add_all([
+        BlogPost(title="公开", slug="queue-public", content="正文", author_id=author.id, is_published=True),
+        BlogPost(title="下线", slug="queue-hidden", content="正文", author_id=author.id, is_published=True),
+    ])
+    db.commit()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def queue_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "comment_queue_enabled", True)
+    yield
+    comment_queue.drain()
+
+
+def _comment(post_id, i=0):
+    return {"post_id": post_id, "author_name": f"读者{i}", "author_email": f"r{i}@example.com", "content": "评论"}
+
+
+def test_comment_queued_then_written_in_batch(test_db, queue_enabled):
+    """测试启用队列时返回202与工单号，评论在批量写入后入库"""
+    post = test_db.query(BlogPost).filter(BlogPost.slug == "queue-public").one()
+    before = comment_queue.stats()
+
+    tickets = set()
+    for i in range(5):
+        response = client.post("/api/blog/comments", json=_comment(post.id, i))
+        assert response.status_code == 202
+        tickets.add(response.json()["ticket"])
+    assert len(tickets) == 5
+    assert test_db.query(Comment).filter(Comment.post_id == post.id).count() == 0
+
+    # 不存在的文章仍同步返回404
+    assert client.post("/api/blog/comments", json=_comment(99999)).status_code == 404
+
+    assert comment_queue.drain() == 5
+    test_db.expire_all()
+    assert test_db.query(Comment).filter(Comment.post_id == post.id).count() == 5
+    stats = comment_queue.stats()
+    assert stats["stored"] - before["stored"] == 5
+    assert stats["batches"] - before["batches"] == 1
+
+
+def test_full_queue_returns_503(test_db, queue_enabled, monkeypatch):
+    """测试队列已满时拒绝新评论"""
+    post = test_db.query(BlogPost).filter(BlogPost.slug == "queue-public").one()
+    monkeypatch.setattr(comment_queue, "store", MemoryCommentStore(max_size=1))
+
+    assert client.post("/api/blog/comments", json=_comment(post.id)).status_code == 202
+    response = client.post("/api/blog/comments", json=_comment(post.id))
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert comment_queue.drain() == 1
+
+
+def test_batch_drops_comments_of_unpublished_posts(test_db):
+    """测试入队后文章下线的评论在写入时丢弃，其余评论正常写入"""
+    public = test_db.query(BlogPost).filter(BlogPost.slug == "queue-public").one()
+    hidden = test_db.query(BlogPost).filter(BlogPost.slug == "queue-hidden").one()
+    queue = CommentIngestQueue(MemoryCommentStore(max_size=10), batch_size=10, max_latency_ms=0)
+    queue.submit(_comment(public.id))
+    queue.submit(_comment(hidden.id))
+
+    hidden.is_published = False
+    test_db.commit()
+
+    assert queue.write(queue.collect(timeout=0)) == 1
+    stats = queue.stats()
+    assert stats["stored"] == 1 and stats["dropped"] == 1 and stats["queued"] == 0
+
+
+def test_failing_row_does_not_block_batch(test_db):
+    """测试整批写入失败时逐条写入，失败的评论重试max_attempts次后转入死信"""
+    public = test_db.query(BlogPost).filter(BlogPost.slug == "queue-public").one()
+    before = test_db.query(Comment).filter(Comment.post_id == public.id).count()
+    queue = CommentIngestQueue(MemoryCommentStore(max_size=10), batch_size=10, max_latency_ms=0, max_attempts=2)
+    queue.submit(_comment(public.id, 1))
+    queue.submit({**_comment(public.id, 2), "author_name": None})
+    queue.submit(_comment(public.id, 3))
+
+    assert queue.write(queue.collect(timeout=0)) == 2
+    assert queue.stats()["queued"] == 1
+    # 第二次仍失败，达到max_attempts后转入死信
+    assert queue.write(queue.collect(timeout=0)) == 0
+
+    stats = queue.stats()
+    assert (stats["stored"], stats["retried"], stats["failed"]) == (2, 1, 1)
+    assert stats["queued"] == 0 and stats["dead_letters"] == 1
+    assert queue.store.dead_letters[0][2]["content"] == "评论"
+    test_db.expire_all()
+    assert test_db.query(Comment).filter(Comment.post_id == public.id).count() == before + 2
@@ -0,0 +1,86 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import Base, engine
+from app.core.cache import response_cache
+from app.models.user import User
+from app.models.blog import BlogPost
+from app.utils.compression import Compressor, compressor
+
+# 测试客户端
+client = TestClient(app)
+
+
+# 测试数据库设置
+@pytest.fixture(scope="module")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    response_cache.clear()
+
+    from sqlalchemy.orm import sessionmaker
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+
+    author = User(username="zipper", email="zipper@example.com", full_name="Zipper", password_hash="x")
+    db.add(author)
+    db.commit()
+    db.add(BlogPost(
+        title="长文", slug="long-post", content="压缩测试正文。" * 2000,
+        author_id=author.id, is_published=True
+    ))
+    db.commit()
+
+    yield db
+
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_negotiate_encoding():
+    """测试按权重与服务端偏好协商编码"""
+    gzip_only = Compressor()
+    gzip_only.encodings = ("gzip",)
+    assert gzip_only.negotiate("gzip, deflate, br") == "gzip"
+    assert gzip_only.negotiate("br") is None
+    assert gzip_only.negotiate("gzip;q=0, *") is None
+    assert gzip_only.negotiate("*") == "gzip"
+
+    both = Compressor()
+    both.encodings = ("br", "gzip")
+    assert both.negotiate("gzip, br") == "br"
+    assert both.negotiate("gzip, br;q=0.5") == "gzip"
+    assert both.negotiate("identity") is None
+
+
+def test_cached_response_compressed_once(test_db, monkeypatch):
+    """测试缓存填充时压缩一次，命中缓存时直接发送预压缩结果"""
+    calls = []
+    original = compressor.compress
+    monkeypatch.setattr(compressor, "compress", lambda body, encoding: calls.append(encoding) or original(body, encoding))
+    headers = {"Accept-Encoding": "gzip"}
+
+    first = client.get("/api/blog/posts/long-post", headers=headers)
+    assert first.headers["x-cache"] == "MISS"
+    assert first.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in first.headers["vary"]
+    assert len(calls) == len(compressor.encodings)
+
+    second = client.get("/api/blog/posts/long-post", headers=headers)
+    assert second.headers["x-cache"] == "HIT"
+    assert second.headers["content-encoding"] == "gzip"
+    assert second.json()["content"] == first.json()["content"]
+    assert len(calls) == len(compressor.encodings)
+
+    identity = client.get("/api/blog/posts/long-post", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.json()["slug"] == "long-post"
+
+
+def test_middleware_compresses_uncached_responses(test_db):
+    """测试未缓存的大响应由中间件压缩，小响应原样返回"""
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(response.content)
+
+    small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
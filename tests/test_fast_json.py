@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+from typing import List
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.exceptions import ResponseValidationError
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from app.core.fast_json import FastJSONRoute
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+
+
+router = APIRouter(route_class=FastJSONRoute)
+
+
+@router.get("/items", response_model=List[Item])
+def read_items():
+    # 返回ORM风格的对象，由from_attributes校验
+    return [SimpleNamespace(id=1, name="a", secret="x"), SimpleNamespace(id=2, name="b", secret="y")]
+
+
+@router.post("/items", response_model=Item, status_code=201)
+async def create_item():
+    return Item(id=3, name="c")
+
+
+@router.get("/broken", response_model=Item)
+def read_broken():
+    return {"id": "not-a-number"}
+
+
+app = FastAPI()
+app.include_router(router)
+client = TestClient(app)
+
+
+def test_fast_json_serializes_response_model():
+    """测试按响应模型过滤字段并直接编码，保留状态码"""
+    response = client.get("/items")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+
+    created = client.post("/items")
+    assert created.status_code == 201
+    assert created.json() == {"id": 3, "name": "c"}
+
+
+def test_fast_json_rejects_invalid_response():
+    """测试返回值不符合响应模型时与默认路径一样抛出ResponseValidationError"""
+    with pytest.raises(ResponseValidationError):
+        client.get("/broken")
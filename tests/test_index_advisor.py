@@ -0,0 +1,69 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from app.main import app
+from app.database import Base, engine
+from app.core.cache import response_cache
+from app.utils.index_advisor import IndexAdvisor, mysql_issues, sqlite_issues
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    response_cache.clear()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_plan_parsers_flag_scans_and_filesorts():
+    """测试从MySQL与SQLite执行计划中识别全表扫描与filesort"""
+    assert mysql_issues([
+        {"table": "comments", "type": "ref", "key": "ix_comments_is_approved", "rows": 10, "Extra": "Using filesort"},
+        {"table": "messages", "type": "ALL", "key": None, "rows": 2000, "Extra": "Using where"},
+    ]) == ["filesort comments", "全表扫描 messages（约2000行）"]
+    assert sqlite_issues([
+        "SEARCH comments USING INDEX ix_comments_is_approved (is_approved=?)",
+        "USE TEMP B-TREE FOR ORDER BY",
+        "SCAN messages",
+    ]) == ["filesort（ORDER BY）", "全表扫描 messages"]
+
+
+def test_advisor_explains_each_statement_once(tmp_path):
+    """测试同一语句模板只EXPLAIN一次，并累计执行次数"""
+    scratch = create_engine(f"sqlite:///{tmp_path / 'advisor.db'}")
+    advisor = IndexAdvisor()
+    advisor.install(scratch)
+    with scratch.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        for i in range(3):
+            conn.execute(text("SELECT * FROM items WHERE name = :name"), {"name": f"item-{i}"})
+        conn.execute(text("SELECT * FROM items WHERE id = :id"), {"id": 1})
+
+    plans = {plan.statement: plan for plan in advisor.plans()}
+    by_name = plans["SELECT * FROM items WHERE name = ?"]
+    assert by_name.executions == 3
+    assert by_name.issues == ["全表扫描 items"]
+    assert plans["SELECT * FROM items WHERE id = ?"].issues == []
+
+
+@pytest.mark.parametrize("path", [
+    "/api/blog/posts/1/comments",
+    "/api/blog/posts?category=1",
+    "/api/blog/posts?cursor=",
+])
+def test_hot_queries_use_composite_indexes(test_db, path):
+    """测试评论列表与文章列表的查询由组合索引完成筛选与排序"""
+    advisor = IndexAdvisor()
+    advisor.install(engine)
+    try:
+        assert client.get(path).status_code == 200
+    finally:
+        event.remove(engine, "after_cursor_execute", advisor._after_cursor_execute)
+
+    flagged = [
+        plan for plan in advisor.plans()
+        if plan.issues and ("FROM comments" in plan.statement or "FROM blog_posts" in plan.statement)
+    ]
+    assert flagged == []
@@ -0,0 +1,68 @@
+import threading
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import Base, engine
+from app.core.cache import response_cache
+from app.utils.metrics import Histogram
+
+# 测试客户端
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    response_cache.clear()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+def _sample(text: str, prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_metrics_endpoint_reports_routes_and_queries(test_db):
+    """测试/metrics按路由模板输出请求数、耗时与单请求SQL统计"""
+    before = client.get("/metrics").text
+    labels = '{method="GET",route="/api/blog/posts/{slug}"}'
+    requests_before = _sample(before, 'http_requests_total{method="GET",route="/api/blog/posts/{slug}",status="404"}')
+    queries_before = _sample(before, f"http_request_db_queries_sum{labels}")
+
+    assert client.get("/api/blog/posts/missing-1").status_code == 404
+    assert client.get("/api/blog/posts/missing-2").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert _sample(
+        text, 'http_requests_total{method="GET",route="/api/blog/posts/{slug}",status="404"}'
+    ) == requests_before + 2
+    assert _sample(text, f"http_request_db_queries_sum{labels}") > queries_before
+    assert _sample(text, "http_requests_in_flight") == 1  # 只有/metrics请求本身
+
+
+def test_histogram_merges_thread_shards():
+    """测试各线程分片的观测值汇总后输出累计桶计数"""
+    histogram = Histogram("test_seconds", "测试", ("route",), buckets=(0.1, 1.0))
+
+    def observe():
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(("/a",), value)
+
+    threads = [threading.Thread(target=observe) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    lines = histogram.render()
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 4' in lines
+    assert 'test_seconds_bucket{route="/a",le="1"} 8' in lines
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 12' in lines
+    assert 'test_seconds_count{route="/a"} 12' in lines
+    assert 'test_seconds_sum{route="/a"} 22.2' in lines
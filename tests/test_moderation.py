@@ -0,0 +1,119 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.database import Base, engine
+from app.api import admin
+from app.core.security import get_password_hash
+from app.core.cache import response_cache
+from app.core.principals import principal_cache
+from app.models.user import User
+from app.models.blog import BlogPost, Comment
+from tests.utils import count_queries
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    response_cache.clear()
+    principal_cache.clear()
+    db = sessionmaker(bind=engine)()
+    author = User(
+        username="moderator",
+        email="moderator@example.com",
+        full_name="Moderator",
+        password_hash=get_password_hash("moderatorpassword")
+    )
+    db.add(author)
+    db.commit()
+    db.add_all([
+        BlogPost(title=f"文章 {i}", slug=f"moderation-{i}", content="正文", author_id=author.id, is_published=True)
+        for i in range(2)
+    ])
+    db.commit()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="module")
+def auth_headers(test_db):
+    response = client.post("/api/auth/login/json", json={"username": "moderator", "password": "moderatorpassword"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def comments(test_db):
+    """每个用例重新生成评论：两篇文章各3条，spam@example.com的评论创建于30天前"""
+    test_db.query(Comment).delete()
+    posts = test_db.query(BlogPost).order_by(BlogPost.id).all()
+    old = datetime.now() - timedelta(days=30)
+    rows = [
+        Comment(
+            post_id=post.id, author_name="读者", content="评论", is_approved=False,
+            author_email="spam@example.com" if i == 0 else f"r{i}@example.com",
+            created_at=old if i == 0 else datetime.now()
+        )
+        for post in posts for i in range(3)
+    ]
+    test_db.add_all(rows)
+    test_db.commit()
+    return [comment.id for comment in rows]
+
+
+def _pending(db):
+    db.expire_all()
+    return db.query(Comment).filter(Comment.is_approved == False).count()
+
+
+def test_bulk_approve_in_chunks(test_db, auth_headers, comments, monkeypatch):
+    """测试按ID批量审批时每批只执行一条UPDATE，重复或已审批的ID不计入"""
+    monkeypatch.setattr(admin, "MODERATION_CHUNK_SIZE", 2)
+    with count_queries() as statements:
+        response = client.post(
+            "/api/admin/comments/bulk/approve",
+            json={"ids": comments[:5] + comments[:1]},
+            headers=auth_headers
+        )
+    assert response.status_code == 200
+    assert response.json() == {"affected": 5, "posts": 2}
+    # 5个不同ID分3批，每批一条UPDATE comments
+    assert sum(statement.startswith("UPDATE comments") for statement in statements) == 3
+    assert _pending(test_db) == 1
+
+    response = client.post("/api/admin/comments/bulk/approve", json={"ids": comments}, headers=auth_headers)
+    assert response.json() == {"affected": 1, "posts": 1}
+
+
+def test_bulk_delete(test_db, auth_headers, comments):
+    """测试按ID批量删除，不存在的ID忽略"""
+    response = client.post(
+        "/api/admin/comments/bulk/delete", json={"ids": comments[:2] + [999999]}, headers=auth_headers
+    )
+    assert response.json() == {"affected": 2, "posts": 1}
+    assert test_db.query(Comment).count() == len(comments) - 2
+
+
+def test_bulk_filter_actions(test_db, auth_headers, comments):
+    """测试按邮箱审批、删除N天前仍未审批的评论，且必须指定筛选条件"""
+    response = client.post(
+        "/api/admin/comments/bulk/filter",
+        json={"action": "approve", "author_email": "r1@example.com"},
+        headers=auth_headers
+    )
+    assert response.json() == {"affected": 2, "posts": 2}
+
+    response = client.post(
+        "/api/admin/comments/bulk/filter",
+        json={"action": "delete", "is_approved": False, "older_than_days": 7},
+        headers=auth_headers
+    )
+    assert response.json() == {"affected": 2, "posts": 2}
+    assert test_db.query(Comment).filter(Comment.author_email == "spam@example.com").count() == 0
+    assert _pending(test_db) == 2
+
+    response = client.post("/api/admin/comments/bulk/filter", json={"action": "delete"}, headers=auth_headers)
+    assert response.status_code == 400
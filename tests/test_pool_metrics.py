@@ -0,0 +1,31 @@
+import pytest
+from sqlalchemy import create_engine, exc
+from app.utils.pool_metrics import pool_metrics, instrumented_pool_class
+
+
+def test_pool_overflow_and_timeout_recorded(tmp_path):
+    """测试连接池溢出与借出超时被记录"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=instrumented_pool_class("pool-test"),
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.1
+    )
+    first = engine.connect()
+    second = engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    stats = pool_metrics.snapshot()["pools"]["pool-test"]
+    assert stats["checkouts"] == 2
+    assert stats["overflow_checkouts"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["in_use"] == 2
+    assert stats["peak_in_use"] == 2
+    assert stats["wait_ms_max"] >= 100
+
+    first.close()
+    second.close()
+    engine.dispose()
+    assert pool_metrics.snapshot()["endpoints"]["pool-test <background>"]["timeouts"] == 1
@@ -0,0 +1,52 @@
+import json
+import logging
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from app.utils.profiling import ProfilingMiddleware, SQLProfiler, normalize_statement
+from app.utils.request_context import RequestContextMiddleware
+
+
+def test_normalize_statement():
+    """测试字面量、占位符与IN列表归一化"""
+    assert normalize_statement(
+        "SELECT * FROM blog_posts\n  WHERE id IN (%s, %s, %s) AND slug = 'a''b' LIMIT 10"
+    ) == "SELECT * FROM blog_posts WHERE id IN (?...) AND slug = ? LIMIT ?"
+    assert normalize_statement("SELECT * FROM t WHERE id = :id_1") == "SELECT * FROM t WHERE id = ?"
+
+
+def test_server_timing_and_query_logs(tmp_path, caplog):
+    """测试Server-Timing响应头以及慢查询、重复查询日志"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    profiler = SQLProfiler(slow_query_ms=0.000001, repeat_threshold=10)
+    profiler.install(engine)
+
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        with engine.connect() as conn:
+            for i in range(12):
+                conn.execute(text("SELECT :value"), {"value": i})
+        return {"id": item_id}
+
+    with caplog.at_level(logging.WARNING, logger="app.sql"):
+        response = TestClient(app).get("/items/1")
+
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert 'desc="12 queries"' in timing
+    assert "serialize;dur=" in timing and "total;dur=" in timing
+
+    slow = [json.loads(r.message) for r in caplog.records if r.name == "app.sql.slow"]
+    assert len(slow) == 12
+    assert slow[0]["endpoint"] == "GET /items/{item_id}"
+    assert slow[0]["statement"] == "SELECT ?"
+
+    repeated = [json.loads(r.message) for r in caplog.records if r.name == "app.sql.repeated"]
+    assert repeated == [{
+        "event": "repeated_query", "endpoint": "GET /items/{item_id}", "count": 12, "statement": "SELECT ?"
+    }]
+    engine.dispose()
@@ -0,0 +1,112 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.database import Base, engine, configure_replicas, replica_set, query_counter
+from app.core.security import get_password_hash
+from app.core.cache import response_cache
+from app.core.principals import principal_cache
+from app.models.user import User
+from app.models.blog import BlogCategory
+from app.utils.replicas import PRIMARY_PIN_COOKIE
+
+
+def _add_category(bind, name):
+    db = sessionmaker(bind=bind)()
+    db.add(BlogCategory(name=name, slug=name))
+    db.commit()
+    db.close()
+
+
+# 两个SQLite文件充当从库，数据与主库不同以便区分请求落到了哪个库
+@pytest.fixture(scope="module")
+def test_db(tmp_path_factory):
+    Base.metadata.create_all(bind=engine)
+    response_cache.clear()
+    principal_cache.clear()
+
+    db = sessionmaker(bind=engine)()
+    db.add(User(
+        username="replicaadmin",
+        email="replicaadmin@example.com",
+        full_name="Replica Admin",
+        password_hash=get_password_hash("adminpassword")
+    ))
+    db.commit()
+    _add_category(engine, "primary")
+
+    directory = tmp_path_factory.mktemp("replicas")
+    configure_replicas([f"sqlite:///{directory / 'replica0.db'}", f"sqlite:///{directory / 'replica1.db'}"])
+    for replica in replica_set.engines:
+        Base.metadata.create_all(bind=replica)
+        _add_category(replica, "replica")
+
+    yield db
+
+    configure_replicas([])
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def no_response_cache(monkeypatch):
+    monkeypatch.setattr(response_cache, "enabled", False)
+
+
+def _query_delta(before):
+    after = query_counter.snapshot()
+    return {name: after[name] - before.get(name, 0) for name in after}
+
+
+def test_reads_round_robin_across_replicas(test_db, no_response_cache):
+    """测试匿名读请求轮询落到各从库，主库不执行查询"""
+    client = TestClient(app)
+    before = query_counter.snapshot()
+
+    for _ in range(4):
+        response = client.get("/api/blog/categories")
+        assert response.status_code == 200
+        assert [c["name"] for c in response.json()] == ["replica"]
+
+    delta = _query_delta(before)
+    assert delta["primary"] == 0
+    assert delta["replica0"] == delta["replica1"] > 0
+
+
+def test_write_pins_client_to_primary(test_db, no_response_cache):
+    """测试写请求后该客户端读主库，其他客户端仍读从库"""
+    writer = TestClient(app)
+    login = writer.post("/api/auth/login/json", json={"username": "replicaadmin", "password": "adminpassword"})
+    token = login.json()["access_token"]
+    response = writer.post(
+        "/api/blog/categories",
+        json={"name": "new", "slug": "new"},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    assert PRIMARY_PIN_COOKIE in response.cookies
+
+    names = [c["name"] for c in writer.get("/api/blog/categories").json()]
+    assert names == ["new", "primary"]
+
+    reader = TestClient(app)
+    assert [c["name"] for c in reader.get("/api/blog/categories").json()] == ["replica"]
+
+
+def test_unhealthy_replica_skipped(test_db, no_response_cache, tmp_path):
+    """测试健康检查失败的从库不再参与轮询，全部不可用时回退到主库"""
+    healthy = replica_set.engines[0].url.render_as_string()
+    configure_replicas([healthy, f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"])
+    replica_set.check_health()
+    assert replica_set.status() == {"replica0": True, "replica1": False}
+
+    client = TestClient(app)
+    before = query_counter.snapshot()
+    for _ in range(3):
+        assert client.get("/api/blog/categories").status_code == 200
+    delta = _query_delta(before)
+    assert delta["replica1"] == 0
+    assert delta["replica0"] > 0
+
+    replica_set.mark(replica_set.engines[0], False)
+    assert [c["name"] for c in client.get("/api/blog/categories").json()] == ["new", "primary"]
@@ -0,0 +1,101 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import Base, engine
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.models.resume import ResumeSnapshot
+from app.core.resume_snapshot import resume_snapshot
+from tests.utils import assert_num_queries
+
+# 测试客户端
+client = TestClient(app)
+
+
+# 测试数据库设置
+@pytest.fixture(scope="module")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    resume_snapshot.clear()
+
+    from sqlalchemy.orm import sessionmaker
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+
+    owner = User(
+        username="resumeowner",
+        email="owner@example.com",
+        full_name="Resume Owner",
+        password_hash=get_password_hash("ownerpassword")
+    )
+    db.add(owner)
+    db.commit()
+
+    yield db
+
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def _auth_headers():
+    """登录并返回认证头"""
+    response = client.post("/api/auth/login", data={
+        "username": "resumeowner",
+        "password": "ownerpassword"
+    })
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_resume_conditional_requests(test_db):
+    """测试简历接口的条件请求：校验器未变时只查询版本号并返回304，修改简历后校验器随之变化"""
+    response = client.get("/api/resume")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    with assert_num_queries(1):
+        response = client.get("/api/resume", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    created = client.post("/api/resume/personal-info", headers=_auth_headers(), json={"name": "张三"})
+    assert created.status_code == 200
+
+    response = client.get("/api/resume", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["personal_info"]["name"] == "张三"
+    assert response.headers["ETag"] != etag
+
+    last_modified = response.headers["Last-Modified"]
+    response = client.get("/api/resume", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+
+def test_resume_served_from_snapshot(test_db):
+    """测试简历由快照直接返回：写操作后快照随之重建，快照缺失时现场重建"""
+    headers = _auth_headers()
+    response = client.post("/api/resume/education", headers=headers, json={
+        "degree": "本科",
+        "major": "计算机科学",
+        "school_name": "某大学",
+        "start_date": "2015-09"
+    })
+    assert response.status_code == 200
+
+    snapshot = test_db.query(ResumeSnapshot).one()
+    test_db.expire_all()
+
+    # 版本号一次查询，内容取自内存快照
+    with assert_num_queries(1):
+        response = client.get("/api/resume")
+    assert response.status_code == 200
+    assert response.content == snapshot.data.encode()
+    assert response.json()["education"][0]["school_name"] == "某大学"
+    assert not response.headers["ETag"].startswith("W/")
+
+    # 内存与快照表都不可用时从各表重建，内容一致
+    resume_snapshot.clear()
+    test_db.delete(snapshot)
+    test_db.commit()
+    rebuilt = client.get("/api/resume")
+    assert rebuilt.content == response.content
+    assert rebuilt.headers["ETag"] == response.headers["ETag"]
@@ -0,0 +1,47 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.database import Base, engine
+from app.core.cache import response_cache
+from app.models.blog import BlogPost, Comment
+from app.models.user import User
+from app.scripts.seed_data import seed, SEED_PASSWORD
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    response_cache.clear()
+    db = sessionmaker(bind=engine)()
+    counts = seed(db, users=3, categories=2, posts=30, comments_per_post=2, messages=5, median_kb=1, batch_size=7)
+    yield db, counts
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_seed_inserts_requested_rows(test_db):
+    """测试按批次写入的行数与参数一致"""
+    db, counts = test_db
+    prefix = counts["prefix"]
+    assert counts["users"] == 3 and counts["messages"] == 5
+    assert db.query(BlogPost).filter(BlogPost.slug.like(f"{prefix}-%")).count() == 30
+    assert db.query(Comment).count() == counts["comments"]
+
+
+def test_seeded_data_served_by_api(test_db):
+    """测试生成的数据可通过接口读取，生成的用户可以登录"""
+    db, counts = test_db
+    published = db.query(BlogPost).filter(BlogPost.is_published == True).count()
+    username = db.query(User.username).filter(User.is_active == True).first().username
+
+    response = client.get("/api/blog/posts")
+    assert response.status_code == 200
+    assert response.json()["total"] == published
+
+    response = client.post("/api/auth/login/json", json={
+        "username": username, "password": SEED_PASSWORD
+    })
+    assert response.status_code == 200
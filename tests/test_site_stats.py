@@ -0,0 +1,122 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.database import Base, engine
+from app.core.security import get_password_hash
+from app.core.cache import response_cache
+from app.core.principals import principal_cache
+from app.core.view_counter import view_counter
+from app.core import site_stats
+from app.core.site_stats import StatsReconciler, get_stats, rebuild_site_stats
+from app.models.user import User
+from app.models.blog import BlogPost, Comment
+from app.models.message import Message
+from app.models.stats import SiteStat
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    response_cache.clear()
+    principal_cache.clear()
+    db = sessionmaker(bind=engine)()
+    db.add(User(
+        username="statsadmin",
+        email="statsadmin@example.com",
+        full_name="Stats Admin",
+        password_hash=get_password_hash("adminpassword")
+    ))
+    db.add_all([Message(name=f"访客{i}", email=f"v{i}@example.com", content="留言") for i in range(3)])
+    db.commit()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="module")
+def auth_headers(test_db):
+    response = client.post("/api/auth/login/json", json={"username": "statsadmin", "password": "adminpassword"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def _dashboard_stats(headers):
+    response = client.get("/api/admin/dashboard", headers=headers)
+    assert response.status_code == 200
+    return response.json()["stats"]
+
+
+def test_stats_maintained_on_writes(test_db, auth_headers):
+    """测试文章、评论、留言的增删与访问计数写回时增量更新统计值，结果与实时统计一致"""
+    # 丢弃其他测试模块留下的待写回访问次数
+    view_counter.store.drain()
+    rebuild_site_stats(test_db)
+    assert _dashboard_stats(auth_headers) == {
+        "total_posts": 0, "total_comments": 0, "total_messages": 3, "total_views": 0
+    }
+
+    post = client.post(
+        "/api/blog/posts",
+        json={"title": "统计", "slug": "stats-post", "content": "正文", "is_published": True},
+        headers=auth_headers
+    ).json()
+    for i in range(2):
+        client.post("/api/blog/comments", json={
+            "post_id": post["id"], "author_name": f"读者{i}", "author_email": "r@example.com", "content": "评论"
+        })
+    client.get("/api/blog/posts/stats-post")
+    view_counter.flush()
+    message_id = test_db.query(Message.id).first().id
+    client.delete(f"/api/admin/messages/{message_id}", headers=auth_headers)
+
+    expected = {"total_posts": 1, "total_comments": 2, "total_messages": 2, "total_views": 1}
+    assert _dashboard_stats(auth_headers) == expected
+    test_db.expire_all()
+    assert rebuild_site_stats(test_db) == {}
+
+    # 删除文章时级联删除的评论与该文章的访问量一并扣除
+    client.delete(f"/api/blog/posts/{post['id']}", headers=auth_headers)
+    assert _dashboard_stats(auth_headers) == {
+        "total_posts": 0, "total_comments": 0, "total_messages": 2, "total_views": 0
+    }
+
+
+def test_reconciler_fixes_drift(test_db):
+    """测试绕过接口写入数据造成的偏差由核对任务修正"""
+    rebuild_site_stats(test_db)
+    test_db.add(Message(name="导入", email="import@example.com", content="批量导入的留言"))
+    test_db.commit()
+    assert get_stats(test_db)["total_messages"] == 2
+
+    drift = StatsReconciler(sessionmaker(bind=engine)).reconcile()
+    assert drift == {"total_messages": (2, 3)}
+    test_db.expire_all()
+    assert get_stats(test_db)["total_messages"] == 3
+
+
+def test_missing_rows_fall_back_to_live_counts(test_db):
+    """测试统计行缺失时读取回退为实时统计，首次增量更新时按实际数据初始化"""
+    test_db.query(SiteStat).delete()
+    test_db.commit()
+    assert get_stats(test_db)["total_messages"] == test_db.query(Message).count()
+    assert test_db.query(Comment).count() == get_stats(test_db)["total_comments"]
+    assert test_db.query(BlogPost).count() == get_stats(test_db)["total_posts"]
+
+
+def test_first_insert_race(test_db, monkeypatch):
+    """测试并发的首次写入：统计行已由另一事务插入时改为增量更新，而不是主键冲突"""
+    test_db.query(SiteStat).delete()
+    test_db.commit()
+    insert_ignore = site_stats.insert_ignore
+
+    def concurrent_insert(db, table, row):
+        # 模拟另一事务在本事务发现统计行缺失之后抢先插入并提交
+        db.execute(table.insert().values(key=row["key"], value=10))
+        return insert_ignore(db, table, row)
+
+    monkeypatch.setattr(site_stats, "insert_ignore", concurrent_insert)
+    site_stats.adjust_stats(test_db, {"total_messages": 1})
+    test_db.commit()
+    assert test_db.get(SiteStat, "total_messages").value == 11
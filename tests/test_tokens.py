@@ -0,0 +1,65 @@
+import time
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import JWTError
+from app.core.tokens import TokenCodec
+
+
+def _pem_pair(private_key):
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return private_pem, public_pem
+
+
+def test_verified_tokens_are_cached_until_expiry():
+    """测试已校验令牌命中缓存，过期后拒绝"""
+    codec = TokenCodec("HS256", secret_key="secret")
+    token = codec.encode({"sub": "alice", "exp": int(time.time()) + 60})
+
+    assert codec.decode(token)["sub"] == "alice"
+    assert len(codec._verified) == 1
+    assert codec.decode(token)["sub"] == "alice"
+
+    # 篡改后的令牌哈希不同，仍然走签名校验
+    with pytest.raises(JWTError):
+        codec.decode(token[:-2] + ("AA" if not token.endswith("AA") else "BB"))
+
+    expired = codec.encode({"sub": "alice", "exp": int(time.time()) + 1})
+    codec.decode(expired)
+    codec._verified[next(reversed(codec._verified))] = ({"sub": "alice"}, time.time() - 1)
+    with pytest.raises(JWTError):
+        codec.decode(expired)
+
+
+def test_cache_is_bounded():
+    """测试缓存条数受限"""
+    codec = TokenCodec("HS256", secret_key="secret", cache_size=2)
+    for i in range(5):
+        codec.decode(codec.encode({"sub": f"user{i}", "exp": int(time.time()) + 60}))
+    assert len(codec._verified) == 2
+
+
+@pytest.mark.parametrize("algorithm, private_key", [
+    ("RS256", rsa.generate_private_key(public_exponent=65537, key_size=2048)),
+    ("ES256", ec.generate_private_key(ec.SECP256R1())),
+])
+def test_asymmetric_algorithms(algorithm, private_key):
+    """测试非对称算法：私钥签发、公钥校验，只有公钥时不能签发"""
+    private_pem, public_pem = _pem_pair(private_key)
+    codec = TokenCodec(algorithm, private_key=private_pem, public_key=public_pem)
+    token = codec.encode({"sub": "alice", "exp": int(time.time()) + 60})
+
+    verifier = TokenCodec(algorithm, public_key=public_pem)
+    assert verifier.decode(token)["sub"] == "alice"
+    with pytest.raises(RuntimeError):
+        verifier.encode({"sub": "alice"})
+    with pytest.raises(JWTError):
+        TokenCodec("HS256", secret_key="secret").decode(token)
@@ -0,0 +1,142 @@
+import pytest
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.database import Base, engine
+from app.core.security import get_password_hash
+from app.core.cache import response_cache
+from app.core.principals import principal_cache
+from app.core.view_analytics import ViewAnalytics, view_analytics, referrer_bucket
+from app.models.user import User
+from app.models.blog import BlogPost
+from app.models.analytics import PostDailyView, PostCumulativeView, PostViewTotal
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    response_cache.clear()
+    principal_cache.clear()
+    db = sessionmaker(bind=engine)()
+    db.add(User(
+        username="analyticsadmin",
+        email="analyticsadmin@example.com",
+        full_name="Analytics Admin",
+        password_hash=get_password_hash("adminpassword")
+    ))
+    db.add_all([
+        BlogPost(title=f"文章{i}", slug=f"trend-{i}", content="正文", is_published=True, author_id=1)
+        for i in range(3)
+    ])
+    db.commit()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="module")
+def auth_headers(test_db):
+    response = client.post("/api/auth/login/json", json={"username": "analyticsadmin", "password": "adminpassword"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.parametrize("referrer,expected", [
+    (None, "direct"),
+    ("http://testserver/api/blog/posts", "internal"),
+    ("https://www.google.com.hk/search?q=fastapi", "search"),
+    ("https://www.baidu.com/s?wd=fastapi", "search"),
+    ("https://t.co/abc", "social"),
+    ("https://www.zhihu.com/question/1", "social"),
+    ("https://example.org/links", "other"),
+])
+def test_referrer_bucket(referrer, expected):
+    """测试按Referer归类访问来源"""
+    assert referrer_bucket(referrer, "testserver") == expected
+
+
+def test_views_rolled_up_per_day_and_referrer(test_db, auth_headers):
+    """测试文章访问在内存中聚合，汇总写入后热门文章与每日访问量接口返回按来源分布的结果"""
+    # 丢弃其他测试模块留下的待汇总访问
+    view_analytics.drain()
+    for _ in range(3):
+        client.get("/api/blog/posts/trend-1", headers={"Referer": "https://www.bing.com/search?q=blog"})
+    client.get("/api/blog/posts/trend-1")
+    client.get("/api/blog/posts/trend-2", headers={"Referer": "https://weibo.com/123"})
+    assert test_db.query(PostDailyView).count() == 0
+    view_analytics.flush()
+
+    trending = client.get("/api/admin/analytics/trending", headers=auth_headers).json()
+    assert [(item["post"]["slug"], item["views"]) for item in trending["items"]] == [("trend-1", 4), ("trend-2", 1)]
+
+    post_id = test_db.query(BlogPost.id).filter(BlogPost.slug == "trend-1").scalar()
+    response = client.get("/api/admin/analytics/daily", params={"post_id": post_id, "days": 7}, headers=auth_headers)
+    series = response.json()
+    assert series["total"] == 4
+    assert len(series["series"]) == 7
+    assert series["series"][-1] == {"day": date.today().isoformat(), "views": 4, "referrers": {"search": 3, "direct": 1}}
+
+    # 全站合计
+    site = client.get("/api/admin/analytics/daily", params={"days": 1}, headers=auth_headers).json()
+    assert site["series"][0]["referrers"] == {"direct": 1, "search": 3, "social": 1}
+
+    dashboard = client.get("/api/admin/dashboard", headers=auth_headers).json()
+    assert dashboard["recent_posts"][0]["post"]["slug"] == "trend-1"
+    assert dashboard["recent_views"][-1]["views"] == 5
+
+
+def test_rollups_accumulate_and_windows_filter(test_db, auth_headers):
+    """测试多个聚合实例的写入累加，日期范围只统计范围内的访问"""
+    post_id = test_db.query(BlogPost.id).filter(BlogPost.slug == "trend-0").scalar()
+    last_month = date.today() - timedelta(days=30)
+    for _ in range(2):
+        # 模拟多个进程各自汇总写入同一行
+        analytics = ViewAnalytics(sessionmaker(bind=engine))
+        for _ in range(5):
+            analytics.record(post_id, day=last_month)
+        assert analytics.flush() == 1
+
+    week = client.get("/api/admin/analytics/trending", headers=auth_headers).json()
+    assert "trend-0" not in [item["post"]["slug"] for item in week["items"]]
+
+    window = {"start": last_month.isoformat(), "end": last_month.isoformat()}
+    month = client.get("/api/admin/analytics/trending", params=window, headers=auth_headers).json()
+    assert [(item["post"]["slug"], item["views"]) for item in month["items"]] == [("trend-0", 10)]
+
+    # 长范围：按总访问量查找候选文章，用累计访问量之差得到范围内的访问量
+    params = {"days": 40, "limit": 2}
+    ranked = client.get("/api/admin/analytics/trending", params=params, headers=auth_headers).json()["items"]
+    assert [(item["post"]["slug"], item["views"]) for item in ranked] == [("trend-0", 10), ("trend-1", 4)]
+    trend_2 = test_db.query(BlogPost.id).filter(BlogPost.slug == "trend-2").scalar()
+    for _ in range(20):
+        view_analytics.record(trend_2)
+    view_analytics.flush()
+    ranked = client.get("/api/admin/analytics/trending", params=params, headers=auth_headers).json()["items"]
+    assert [(item["post"]["slug"], item["views"]) for item in ranked] == [("trend-2", 21), ("trend-0", 10)]
+    assert test_db.get(PostViewTotal, post_id).total == 10
+    assert [(row.day, row.total) for row in test_db.query(PostCumulativeView).filter_by(post_id=trend_2)] == [
+        (date.today(), 21)
+    ]
+
+    # 补写更早日期的访问时之后日期的累计值一并增加
+    view_analytics.record(trend_2, day=last_month)
+    view_analytics.flush()
+    test_db.expire_all()
+    assert [(row.day, row.total) for row in test_db.query(PostCumulativeView).filter_by(post_id=trend_2)] == [
+        (last_month, 1), (date.today(), 22)
+    ]
+    window = {"start": (last_month + timedelta(days=1)).isoformat(), "end": date.today().isoformat()}
+    ranked = client.get("/api/admin/analytics/trending", params=window, headers=auth_headers).json()["items"]
+    assert [(item["post"]["slug"], item["views"]) for item in ranked] == [("trend-2", 21), ("trend-1", 4)]
+
+    # 删除的文章不再参与排名，其余文章补足limit
+    assert client.delete(f"/api/blog/posts/{post_id}", headers=auth_headers).status_code == 200
+    assert test_db.query(PostCumulativeView).filter_by(post_id=post_id).count() == 0
+    ranked = client.get("/api/admin/analytics/trending", params=params, headers=auth_headers).json()["items"]
+    assert [(item["post"]["slug"], item["views"]) for item in ranked] == [("trend-2", 22), ("trend-1", 4)]
+
+    invalid = {"start": date.today().isoformat(), "end": last_month.isoformat()}
+    assert client.get("/api/admin/analytics/trending", params=invalid, headers=auth_headers).status_code == 400
+    assert client.get("/api/admin/analytics/daily", params={"post_id": 9999}, headers=auth_headers).status_code == 404
@@ -0,0 +1,28 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from app.database import engine
+
+
+@contextmanager
+def count_queries(bind=engine):
+    """记录代码块内执行的全部SQL语句"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", before_cursor_execute)
+
+
+@contextmanager
+def assert_num_queries(expected, bind=engine):
+    """断言代码块内执行的SQL语句数量恰好为expected"""
+    with count_queries(bind) as statements:
+        yield statements
+    assert len(statements) == expected, (
+        f"期望执行 {expected} 条SQL，实际执行 {len(statements)} 条:\n" + "\n".join(statements)
+    )